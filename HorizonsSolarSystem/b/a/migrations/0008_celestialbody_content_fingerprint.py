@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0007_celestialbody_absolute_magnitude_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='celestialbody',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, help_text='Revised date plus hash of the parsed Horizons data', max_length=64, null=True),
+        ),
+    ]
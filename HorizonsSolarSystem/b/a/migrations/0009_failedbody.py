@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0008_celestialbody_content_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FailedBody',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body_id', models.CharField(help_text='Horizons body ID that failed to ingest', max_length=50, unique=True)),
+                ('stage', models.CharField(choices=[('fetch', 'Fetch'), ('parse', 'Parse'), ('store', 'Store')], max_length=10)),
+                ('reason', models.TextField(help_text='Error from the most recent failed attempt')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('first_failed', models.DateTimeField(auto_now_add=True)),
+                ('last_failed', models.DateTimeField()),
+                ('next_attempt', models.DateTimeField(db_index=True, help_text='Earliest time the retry pass picks this body up again')),
+                ('quarantined', models.BooleanField(db_index=True, default=False, help_text='Excluded from sweeps and retries until released')),
+            ],
+            options={
+                'verbose_name_plural': 'Failed Bodies',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0009_failedbody'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_id', models.IntegerField(help_text='First body ID in the shard')),
+                ('end_id', models.IntegerField(help_text='Last body ID in the shard, inclusive')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('leased', 'Leased'), ('done', 'Done')], db_index=True, default='pending', max_length=10)),
+                ('owner', models.CharField(blank=True, help_text='Worker holding the lease', max_length=100, null=True)),
+                ('lease_expires', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('claims', models.PositiveIntegerField(default=0, help_text='Number of times the shard has been leased')),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('start_id', 'end_id'), name='unique_ingest_shard_range')],
+            },
+        ),
+    ]
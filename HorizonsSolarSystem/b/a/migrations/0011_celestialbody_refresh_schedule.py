@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0010_ingestshard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='celestialbody',
+            name='horizons_id',
+            field=models.CharField(blank=True, db_index=True, help_text='Horizons COMMAND used to fetch this body', max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='celestialbody',
+            name='last_checked',
+            field=models.DateTimeField(blank=True, help_text='Last time Horizons was queried for this body, changed or not', null=True),
+        ),
+        migrations.AddField(
+            model_name='celestialbody',
+            name='refresh_priority',
+            field=models.FloatField(default=0, help_text='Manual boost to the refresh scheduler ranking'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0011_celestialbody_refresh_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_id', models.IntegerField()),
+                ('end_id', models.IntegerField()),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed')], default='running', max_length=10)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IngestRunEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body_id', models.IntegerField()),
+                ('status', models.CharField(choices=[('done', 'Done'), ('absent', 'No unique object'), ('failed', 'Failed')], max_length=10)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='a.ingestrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'body_id'), name='unique_ingest_run_entry')],
+            },
+        ),
+    ]
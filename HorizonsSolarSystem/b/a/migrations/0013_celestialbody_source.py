@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0012_ingestrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='celestialbody',
+            name='source_parser',
+            field=models.CharField(blank=True, help_text='Ingest path whose parser produced this row', max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='celestialbody',
+            name='source_responses',
+            field=models.TextField(blank=True, help_text='profile:cache key of each archived Horizons response the row was parsed from', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0013_celestialbody_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='celestialbody',
+            name='fallback_fields',
+            field=models.TextField(blank=True, help_text='Comma-separated fields only the tolerant fallback rules could parse', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0014_celestialbody_fallback_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='celestialbody',
+            name='element_table',
+            field=models.BinaryField(blank=True, help_text='Every osculating-elements record as packed horizons_elements.ELEMENT_DTYPE rows', null=True),
+        ),
+    ]
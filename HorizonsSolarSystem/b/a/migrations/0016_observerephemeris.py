@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0015_celestialbody_element_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ObserverEphemeris',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('time', models.DateTimeField(help_text='Time of the table row (UT)')),
+                ('ra', models.FloatField(blank=True, help_text='Astrometric right ascension, ICRF (degrees)', null=True)),
+                ('dec', models.FloatField(blank=True, help_text='Astrometric declination, ICRF (degrees)', null=True)),
+                ('apparent_magnitude', models.FloatField(blank=True, help_text='Apparent visual magnitude (APmag, or T-mag for comets)', null=True)),
+                ('nuclear_magnitude', models.FloatField(blank=True, help_text='Comet nuclear magnitude (N-mag)', null=True)),
+                ('surface_brightness', models.FloatField(blank=True, help_text='Surface brightness (mag/arcsec^2)', null=True)),
+                ('delta', models.FloatField(blank=True, help_text='Range from the observer (AU)', null=True)),
+                ('deldot', models.FloatField(blank=True, help_text='Range rate from the observer (km/s)', null=True)),
+                ('elongation', models.FloatField(blank=True, help_text='Sun-Observer-Target elongation angle (degrees)', null=True)),
+                ('elongation_flag', models.CharField(blank=True, help_text='T if the target trails the Sun, L if it leads', max_length=1)),
+                ('phase_angle', models.FloatField(blank=True, help_text='Sun-Target-Observer angle (degrees)', null=True)),
+                ('constellation', models.CharField(blank=True, help_text='IAU constellation abbreviation', max_length=3)),
+                ('body', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='observer_ephemeris', to='a.celestialbody')),
+            ],
+            options={
+                'verbose_name_plural': 'Observer Ephemerides',
+                'constraints': [models.UniqueConstraint(fields=('body', 'time'), name='unique_observer_ephemeris_time')],
+            },
+        ),
+    ]
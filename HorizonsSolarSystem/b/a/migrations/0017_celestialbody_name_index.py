@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0016_observerephemeris'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='celestialbody',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0017_celestialbody_name_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='celestialbody',
+            name='source_responses',
+            field=models.TextField(blank=True, help_text='profile:payload digest of each Horizons response the row was parsed from, kept in the source archive', null=True),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Rows written before the field registry (0014) have no fallback_fields and still hold the old parsers' units
+
+from django.db import migrations
+
+# The horizons path printed-value * 24 for every mean solar day label; values printed in days are below this
+DAYS_LIMIT = 1000.0
+
+
+def convert_legacy_units(body):
+    """Bring one pre-registry row to the model's units in place; returns the changed field names.
+
+    - flattening: the populate path stored 1/f. A value of exactly 1 is the
+      fallback path's capture of the "1" in "1/169.779" and is dropped.
+    - mass (horizons path): 10^24 kg from "Mass x10^N (kg)" lines, which
+      major bodies print next to a GM line; without a stored ``gm``, the
+      mass came from a small-body "GM=" line as GM / G with GM in km^3/s^2.
+    - mean_solar_day (horizons path): the printed value times 24, since
+      every label contains a 'd'. Printed values below ``DAYS_LIMIT`` are
+      in days, the rest in seconds.
+    """
+    changed = []
+    if body.flattening is not None and body.flattening >= 1:
+        body.flattening = 1 / body.flattening if body.flattening > 1 else None
+        changed.append('flattening')
+    if body.source_parser == 'horizons':
+        if body.mass is not None:
+            body.mass *= 10 if body.gm is not None else 1e9 / 1e23
+            changed.append('mass')
+        if body.mean_solar_day is not None:
+            printed = body.mean_solar_day / 24
+            body.mean_solar_day = printed * 86400 if printed < DAYS_LIMIT else printed
+            changed.append('mean_solar_day')
+    return changed
+
+
+def convert_rows(apps, schema_editor):
+    CelestialBody = apps.get_model('a', 'CelestialBody')
+    legacy = CelestialBody.objects.filter(fallback_fields__isnull=True).exclude(source_parser='mpcorb').only(
+        'pk', 'source_parser', 'flattening', 'mass', 'gm', 'mean_solar_day'
+    )
+    bodies, fields = [], set()
+    for body in legacy.iterator(chunk_size=2000):
+        changed = convert_legacy_units(body)
+        if changed:
+            bodies.append(body)
+            fields.update(changed)
+    if bodies:
+        CelestialBody.objects.bulk_update(bodies, sorted(fields), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0018_celestialbody_source_responses_digest'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('a', '0019_convert_legacy_units'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestshard',
+            name='run',
+            field=models.ForeignKey(blank=True, help_text="Journal of the shard's ingest, resumed by the next worker if the lease expires", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shards', to='a.ingestrun'),
+        ),
+    ]
@@ -19,7 +19,7 @@ class CelestialBody(models.Model):
         ('unknown', 'Unknown Object'),
     ]
     
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, db_index=True)
     body_type = models.CharField(max_length=50, choices=BODY_TYPE_CHOICES, default='unknown')
     
     # Physical characteristics
@@ -135,9 +135,124 @@ class CelestialBody(models.Model):
 
     # Metadata
     last_updated = models.DateTimeField(auto_now=True)
+    content_fingerprint = models.CharField(max_length=64, help_text="Revised date plus hash of the parsed Horizons data", null=True, blank=True)
+    horizons_id = models.CharField(max_length=50, help_text="Horizons COMMAND used to fetch this body", null=True, blank=True, db_index=True)
+    last_checked = models.DateTimeField(help_text="Last time Horizons was queried for this body, changed or not", null=True, blank=True)
+    refresh_priority = models.FloatField(default=0, help_text="Manual boost to the refresh scheduler ranking")
+    source_parser = models.CharField(max_length=20, help_text="Ingest path whose parser produced this row", null=True, blank=True)
+    source_responses = models.TextField(help_text="profile:payload digest of each Horizons response the row was parsed from, kept in the source archive", null=True, blank=True)
+    fallback_fields = models.TextField(help_text="Comma-separated fields only the tolerant fallback rules could parse", null=True, blank=True)
+    element_table = models.BinaryField(help_text="Every osculating-elements record as packed horizons_elements.ELEMENT_DTYPE rows", null=True, blank=True)
 
     def __str__(self):
         return self.name
 
     class Meta:
-        verbose_name_plural = "Celestial Bodies"
\ No newline at end of file
+        verbose_name_plural = "Celestial Bodies"
+
+class ObserverEphemeris(models.Model):
+    body = models.ForeignKey(CelestialBody, on_delete=models.CASCADE, related_name='observer_ephemeris')
+    time = models.DateTimeField(help_text="Time of the table row (UT)")
+    ra = models.FloatField(help_text="Astrometric right ascension, ICRF (degrees)", null=True, blank=True)
+    dec = models.FloatField(help_text="Astrometric declination, ICRF (degrees)", null=True, blank=True)
+    apparent_magnitude = models.FloatField(help_text="Apparent visual magnitude (APmag, or T-mag for comets)", null=True, blank=True)
+    nuclear_magnitude = models.FloatField(help_text="Comet nuclear magnitude (N-mag)", null=True, blank=True)
+    surface_brightness = models.FloatField(help_text="Surface brightness (mag/arcsec^2)", null=True, blank=True)
+    delta = models.FloatField(help_text="Range from the observer (AU)", null=True, blank=True)
+    deldot = models.FloatField(help_text="Range rate from the observer (km/s)", null=True, blank=True)
+    elongation = models.FloatField(help_text="Sun-Observer-Target elongation angle (degrees)", null=True, blank=True)
+    elongation_flag = models.CharField(max_length=1, help_text="T if the target trails the Sun, L if it leads", blank=True)
+    phase_angle = models.FloatField(help_text="Sun-Target-Observer angle (degrees)", null=True, blank=True)
+    constellation = models.CharField(max_length=3, help_text="IAU constellation abbreviation", blank=True)
+
+    def __str__(self):
+        return f"{self.body} at {self.time:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        verbose_name_plural = "Observer Ephemerides"
+        constraints = [
+            models.UniqueConstraint(fields=['body', 'time'], name='unique_observer_ephemeris_time'),
+        ]
+
+class FailedBody(models.Model):
+    STAGE_CHOICES = [
+        ('fetch', 'Fetch'),
+        ('parse', 'Parse'),
+        ('store', 'Store'),
+    ]
+
+    body_id = models.CharField(max_length=50, unique=True, help_text="Horizons body ID that failed to ingest")
+    stage = models.CharField(max_length=10, choices=STAGE_CHOICES)
+    reason = models.TextField(help_text="Error from the most recent failed attempt")
+    attempts = models.PositiveIntegerField(default=0)
+    first_failed = models.DateTimeField(auto_now_add=True)
+    last_failed = models.DateTimeField()
+    next_attempt = models.DateTimeField(db_index=True, help_text="Earliest time the retry pass picks this body up again")
+    quarantined = models.BooleanField(default=False, db_index=True, help_text="Excluded from sweeps and retries until released")
+
+    def __str__(self):
+        return f"{self.body_id} ({self.stage}, {self.attempts} attempts)"
+
+    class Meta:
+        verbose_name_plural = "Failed Bodies"
+
+
+class IngestShard(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('leased', 'Leased'),
+        ('done', 'Done'),
+    ]
+
+    start_id = models.IntegerField(help_text="First body ID in the shard")
+    end_id = models.IntegerField(help_text="Last body ID in the shard, inclusive")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    owner = models.CharField(max_length=100, null=True, blank=True, help_text="Worker holding the lease")
+    lease_expires = models.DateTimeField(null=True, blank=True, db_index=True)
+    claims = models.PositiveIntegerField(default=0, help_text="Number of times the shard has been leased")
+    completed_at = models.DateTimeField(null=True, blank=True)
+    run = models.ForeignKey(
+        'IngestRun', on_delete=models.SET_NULL, null=True, blank=True, related_name='shards',
+        help_text="Journal of the shard's ingest, resumed by the next worker if the lease expires",
+    )
+
+    def __str__(self):
+        return f"{self.start_id}-{self.end_id} ({self.status})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['start_id', 'end_id'], name='unique_ingest_shard_range'),
+        ]
+
+
+class IngestRun(models.Model):
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+    ]
+
+    start_id = models.IntegerField()
+    end_id = models.IntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running')
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Run {self.pk}: {self.start_id}-{self.end_id} ({self.status})"
+
+
+class IngestRunEntry(models.Model):
+    STATUS_CHOICES = [
+        ('done', 'Done'),
+        ('absent', 'No unique object'),
+        ('failed', 'Failed'),
+    ]
+
+    run = models.ForeignKey(IngestRun, on_delete=models.CASCADE, related_name='entries')
+    body_id = models.IntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'body_id'], name='unique_ingest_run_entry'),
+        ]
@@ -1,3 +1,982 @@
-from django.test import TestCase
+import importlib
+import io
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import requests
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+import horizons
+import horizons_batch
+import horizons_scheduler
+import horizons_shards
+import populate_celestial_bodies
+from a.models import CelestialBody, FailedBody, IngestRun, IngestRunEntry, IngestShard
+from horizons_core import parse_fallback_responses, parse_ingest_data, parse_jpl_horizons_object, parse_jpl_horizons_object_fallback
+from horizons_core.cache import NegativeCache, ResponseCache, SourceArchive
+from horizons_core.client import HorizonsClient, HorizonsRequestError, parse_response_source, response_encoding, source_fields
+from horizons_core.concurrency import AdaptiveLimiter
+from horizons_core.elements import load_element_table, parse_elements_table
+from horizons_core.fallback import FALLBACK_FIELDS
+from horizons_core.fields import FALLBACK, FIELDS, STRICT
+from horizons_core.header import tokenize_header
+from horizons_bench import PARSERS, bench_parsers, fixture_documents
+from horizons_core.mpcorb import decode_mpcorb, iter_mpcorb_chunks
+from horizons_core.observer import parse_observer_table
+from horizons_mpcorb import load_mpcorb_chunk, mpcorb_rows
+from horizons_pipeline import run_pipeline
+from horizons_journal import incomplete_runs, remaining_ids
+from horizons_replay import write_replayed
+from horizons_retry import QUARANTINE_AFTER, has_failed, record_failure, record_success
+from horizons_shards import claim_shard, complete_shard, heartbeat, plan_shards, run_worker, shard_run
+from horizons_synthetic import synthetic_body
+from horizons_upsert import CelestialBodyWriter
+from populate_celestial_bodies import store_ingest_responses
+
+legacy_units = importlib.import_module("a.migrations.0019_convert_legacy_units")
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(PROJECT_DIR, "bench_fixtures")
+URL = "https://example.invalid/api/horizons.api"
+PARAMS = {"COMMAND": "'499'", "format": "text"}
+TEXT = "Target body name: Mars (499)\r\n$$SOE\n 2460000.5 = A.D. 2023-Feb-25\n$$EOE\nCafé"
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.directory.name)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def damage_archive(self):
+        with open(self.cache.archive_path, "r+b") as archive:
+            archive.seek(os.path.getsize(self.cache.archive_path) // 2)
+            byte = archive.read(1)[0]
+            archive.seek(-1, os.SEEK_CUR)
+            archive.write(bytes([byte ^ 0xFF]))
+
+    def test_iter_lines_matches_get(self):
+        self.cache.put(URL, PARAMS, TEXT)
+        self.assertEqual(list(self.cache.iter_lines(URL, PARAMS)), TEXT.replace("\r", "").split("\n"))
+        self.assertEqual(self.cache.get(URL, PARAMS), TEXT)
+
+    def test_damaged_entry_is_a_miss_for_iter_lines(self):
+        self.cache.put(URL, PARAMS, TEXT)
+        self.damage_archive()
+        self.assertIsNone(self.cache.iter_lines(URL, PARAMS))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        # The payload row went with the entry, so storing the same text again writes a good copy
+        self.cache.put(URL, PARAMS, TEXT)
+        self.assertEqual(self.cache.get(URL, PARAMS), TEXT)
+
+    def test_damaged_entry_is_a_miss_for_get(self):
+        self.cache.put(URL, PARAMS, TEXT)
+        self.damage_archive()
+        self.assertIsNone(self.cache.get(URL, PARAMS))
+        self.assertEqual(self.cache.stats()["payloads"], 0)
+
+
+class ResponseEncodingTests(SimpleTestCase):
+    def response(self, content_type):
+        response = requests.Response()
+        response.headers["Content-Type"] = content_type
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def test_text_without_charset_is_utf8(self):
+        # requests would pick ISO-8859-1 here, which cached hits never used
+        self.assertEqual(response_encoding(self.response("text/plain")), "utf-8")
+
+    def test_declared_charset_is_kept(self):
+        self.assertEqual(response_encoding(self.response("text/plain; charset=ISO-8859-1")), "ISO-8859-1")
+
+
+class RefreshBypassTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.directory.name)
+        self.client = HorizonsClient(base_url=URL, cache=self.cache)
+        self.cache.put(URL, PARAMS, "stale")
+
+    def tearDown(self):
+        self.client.session.close()
+        self.cache.close()
+        self.directory.cleanup()
+
+    def fresh_response(self, params, stream=False):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "text/plain; charset=utf-8"
+        response._content = b"fresh"
+        response._content_consumed = True
+        return response
+
+    def test_refresh_skips_and_replaces_the_cached_text(self):
+        with mock.patch.object(self.client, "_request", side_effect=self.fresh_response) as request:
+            self.assertEqual(self.client.get_text(PARAMS), "stale")
+            request.assert_not_called()
+            self.assertEqual(self.client.get_text(PARAMS, refresh=True), "fresh")
+        self.assertEqual(self.cache.get(URL, PARAMS), "fresh")
+
+    def test_refresh_skips_the_cached_stream(self):
+        with mock.patch.object(self.client, "_request", side_effect=self.fresh_response):
+            self.assertEqual(list(self.client.iter_lines(PARAMS)), ["stale"])
+            self.assertEqual(list(self.client.iter_lines(PARAMS, refresh=True)), ["fresh"])
+
+
+class SingleFlightTests(SimpleTestCase):
+    CALLERS = 8
+
+    def setUp(self):
+        self.client = HorizonsClient(base_url=URL)
+        self.gate = threading.Event()
+        self.requests = 0
+
+    def tearDown(self):
+        self.client.session.close()
+
+    def held_request(self, outcome):
+        # Every caller is in get_text before the one request is let through
+        def request(params, stream=False):
+            self.requests += 1
+            self.gate.wait(5)
+            if isinstance(outcome, Exception):
+                raise outcome
+            response = requests.Response()
+            response.status_code = 200
+            response._content = outcome.encode("utf-8")
+            response._content_consumed = True
+            return response
+        return request
+
+    def call_together(self):
+        results = [None] * self.CALLERS
+
+        def call(index):
+            try:
+                results[index] = self.client.get_text(PARAMS)
+            except Exception as e:
+                results[index] = e
+
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(self.CALLERS)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while self.client.flight.coalesced < self.CALLERS - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.gate.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_concurrent_calls_make_one_request(self):
+        with mock.patch.object(self.client, "_request", side_effect=self.held_request("shared")):
+            results = self.call_together()
+        self.assertEqual(self.requests, 1)
+        self.assertEqual(results, ["shared"] * self.CALLERS)
+        # The same string object reaches every waiter
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_exception_reaches_every_waiter(self):
+        error = HorizonsRequestError("Horizons returned HTTP 500", status_code=500)
+        with mock.patch.object(self.client, "_request", side_effect=self.held_request(error)):
+            results = self.call_together()
+        self.assertEqual(self.requests, 1)
+        self.assertTrue(all(result is error for result in results))
+        # Nothing is kept once the call finishes, so the next call runs again
+        with mock.patch.object(self.client, "_request", side_effect=self.held_request("later")):
+            self.gate.set()
+            self.assertEqual(self.client.get_text(PARAMS), "later")
+
+
+class AdaptiveLimiterTests(SimpleTestCase):
+    def finish(self, limiter, **outcome):
+        limiter.release(limiter.acquire(), **outcome)
+
+    def test_success_adds_one_per_window(self):
+        limiter = AdaptiveLimiter(initial=4, maximum=64)
+        self.finish(limiter, status=200)
+        self.assertAlmostEqual(limiter.limit, 4.25)
+        for _ in range(4):
+            self.finish(limiter, status=200)
+        self.assertEqual(int(limiter.limit), 5)
+
+    def test_throttling_and_timeouts_halve_the_limit(self):
+        for outcome in ({"status": 429}, {"status": 503}, {"failed": True}):
+            with self.subTest(**outcome):
+                limiter = AdaptiveLimiter(initial=16, maximum=64)
+                self.finish(limiter, **outcome)
+                self.assertEqual(limiter.limit, 8)
+
+    def test_limit_stays_within_bounds(self):
+        self.assertEqual(AdaptiveLimiter(initial=100, maximum=10).limit, 10)
+        low = AdaptiveLimiter(initial=2, minimum=2)
+        self.finish(low, status=429)
+        self.assertEqual(low.limit, 2)
+        high = AdaptiveLimiter(initial=10, maximum=10)
+        self.finish(high, status=200)
+        self.assertEqual(high.limit, 10)
+
+
+class RefreshScheduleTests(TestCase):
+    def setUp(self):
+        for horizons_id in ("1", "2", "3"):
+            CelestialBody.objects.create(name=f"Body {horizons_id}", horizons_id=horizons_id, refresh_priority=5)
+        # The developer's negative cache in horizons_cache/ must not be read or written
+        self.directory = tempfile.TemporaryDirectory()
+        self.negative_cache = NegativeCache(self.directory.name)
+        patcher = mock.patch.object(horizons_scheduler, "get_negative_cache", return_value=self.negative_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.negative_cache.close()
+        self.directory.cleanup()
+
+    def test_only_stored_bodies_drop_down_the_ranking(self):
+        now = timezone.now()
+        FailedBody.objects.create(body_id="3", stage="fetch", reason="timeout", attempts=1, last_failed=now, next_attempt=now)
+        with mock.patch.object(horizons_scheduler, "ingest_body_ids", return_value=["1"]) as ingest:
+            self.assertEqual(horizons_scheduler.refresh_most_stale(3), 2)
+        # The queued body is left to the retry pass, and the cache is bypassed for the rest
+        [(horizons_ids, _), kwargs] = ingest.call_args
+        self.assertEqual(sorted(horizons_ids), ["1", "2"])
+        self.assertEqual(kwargs, {"refresh": True})
+        priorities = dict(CelestialBody.objects.values_list("horizons_id", "refresh_priority"))
+        self.assertEqual(priorities, {"1": 0, "2": 5, "3": 5})
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+        return file.read()
+
+
+class SourceArchiveTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive = SourceArchive(self.directory.name)
+
+    def tearDown(self):
+        self.archive.close()
+        self.directory.cleanup()
+
+    def test_source_names_the_archived_text(self):
+        fields = source_fields(("observer",), [TEXT])
+        [(profile, digest)] = parse_response_source(fields['source_responses'])
+        self.assertEqual(profile, "observer")
+        self.assertEqual(self.archive.put_text(TEXT), digest)
+        self.assertEqual(self.archive.get_text(digest), TEXT)
+
+    def test_fingerprint_ignores_the_response_digest(self):
+        text = fixture("planet-mars.txt")
+        parsed_data, fingerprint = parse_fallback_responses(499, [text, ""])
+        # A response that differs only outside the parsed fields, such as its run timestamp
+        stamped_data, stamped_fingerprint = parse_fallback_responses(499, [text + "\n", ""])
+        self.assertEqual(fingerprint, stamped_fingerprint)
+        self.assertNotEqual(parsed_data['source_responses'], stamped_data['source_responses'])
+        self.assertEqual(stamped_data['source_texts'], [text + "\n", ""])
+
+
+class RetryQueueTests(TestCase):
+    def test_success_clears_a_failure_queued_by_another_process(self):
+        self.assertFalse(has_failed("499"))
+        now = timezone.now()
+        # As a sharded worker or the scheduler would, from its own process
+        FailedBody.objects.create(body_id="499", stage="fetch", reason="timeout", attempts=1, last_failed=now, next_attempt=now)
+        self.assertTrue(has_failed("499"))
+        record_success("499")
+        self.assertFalse(FailedBody.objects.filter(body_id="499").exists())
+
+    def test_failures_count_up_to_quarantine(self):
+        for _ in range(QUARANTINE_AFTER):
+            entry = record_failure(499, "parse", "No name found")
+        self.assertEqual(entry.attempts, QUARANTINE_AFTER)
+        self.assertTrue(entry.quarantined)
+        record_success(499)
+        self.assertFalse(has_failed(499))
+
+
+class ShardLeaseTests(TestCase):
+    def setUp(self):
+        plan_shards(1, 20, shard_size=10)
+
+    def expire(self, shard):
+        IngestShard.objects.filter(pk=shard.pk).update(lease_expires=timezone.now() - timedelta(seconds=1))
+
+    def test_each_shard_goes_to_one_worker(self):
+        first, second = claim_shard("a"), claim_shard("b")
+        self.assertEqual([(first.start_id, first.owner), (second.start_id, second.owner)], [(1, "a"), (11, "b")])
+        self.assertIsNone(claim_shard("c"))
+
+    def test_claim_lost_to_a_racing_worker_moves_on(self):
+        claimable = horizons_shards._claimable
+        calls = []
+
+        def racing(now):
+            calls.append(now)
+            if len(calls) == 2:
+                # Worker "a" claims shard 1-10 between worker "b" reading it and updating it
+                IngestShard.objects.filter(start_id=1).update(
+                    status="leased", owner="a", lease_expires=now + timedelta(minutes=5), claims=1
+                )
+            return claimable(now)
+
+        with mock.patch.object(horizons_shards, "_claimable", side_effect=racing):
+            shard = claim_shard("b")
+        self.assertEqual((shard.start_id, shard.owner), (11, "b"))
+        self.assertEqual(IngestShard.objects.get(start_id=1).owner, "a")
+
+    def test_stale_owner_is_fenced_off(self):
+        stale = claim_shard("a")
+        self.assertTrue(heartbeat(stale, "a"))
+        self.expire(stale)
+        fresh = claim_shard("b")
+        self.assertEqual(fresh.pk, stale.pk)
+        self.assertFalse(heartbeat(stale, "a"))
+        self.assertFalse(complete_shard(stale, "a"))
+        self.assertIsNone(shard_run(stale, "a"))
+        self.assertTrue(heartbeat(fresh, "b"))
+
+    def test_reclaim_resumes_the_crashed_run(self):
+        crashed = claim_shard("a")
+        run = shard_run(crashed, "a")
+        IngestRunEntry.objects.bulk_create([IngestRunEntry(run=run, body_id=body_id, status="done") for body_id in range(1, 5)])
+        # Worker "a" dies without releasing its lease
+        self.expire(crashed)
+        self.assertNotIn(run, incomplete_runs())
+        calls = []
+
+        def ingest_range(start_id, end_id, guard, shard_run):
+            calls.append((shard_run.pk, list(guard(remaining_ids(shard_run)))))
+
+        with mock.patch("builtins.print"):
+            self.assertEqual(run_worker(ingest_range, "b", max_shards=1), 1)
+        self.assertEqual(calls, [(run.pk, list(range(5, 11)))])
+        self.assertEqual(IngestShard.objects.get(pk=crashed.pk).status, "done")
+
+
+class JournalResumeTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.negative_cache = NegativeCache(self.directory.name)
+        patcher = mock.patch.object(populate_celestial_bodies, "get_negative_cache", return_value=self.negative_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.fetched = []
+
+    def tearDown(self):
+        self.negative_cache.close()
+        self.directory.cleanup()
+
+    def ingest(self, stop_at=None):
+        def ingest_body_ids(body_ids, concurrency, journal):
+            for body_id in body_ids:
+                if body_id == stop_at:
+                    raise RuntimeError("interrupted")
+                self.fetched.append(body_id)
+                journal.record(body_id, "done")
+        return mock.patch.object(populate_celestial_bodies, "ingest_body_ids", side_effect=ingest_body_ids)
+
+    def test_resumed_run_fetches_only_the_remaining_ids(self):
+        with self.ingest(stop_at=15), mock.patch("builtins.print"), self.assertRaises(RuntimeError):
+            populate_celestial_bodies.populate_celestial(10, 20)
+        run = IngestRun.objects.get()
+        self.assertEqual(self.fetched, [10, 11, 12, 13, 14])
+        self.assertEqual(run.status, "running")
+        self.assertEqual(remaining_ids(run), list(range(15, 21)))
+        self.assertIn(run, incomplete_runs())
+
+        # Found to be absent since; journaled on resume without a request
+        self.negative_cache.add(18, "no_match")
+        self.fetched.clear()
+        with self.ingest(), mock.patch("builtins.print"):
+            populate_celestial_bodies.resume_celestial(run.pk)
+        self.assertEqual(self.fetched, [15, 16, 17, 19, 20])
+        run.refresh_from_db()
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(run.entries.get(body_id=18).status, "absent")
+        self.assertEqual(run.entries.count(), 11)
+
+
+class EmptyResponseTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.negative_cache = NegativeCache(self.directory.name)
+        for target in ("horizons_core.probe.get_negative_cache", "horizons.get_negative_cache"):
+            patcher = mock.patch(target, return_value=self.negative_cache)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.negative_cache.close()
+        self.directory.cleanup()
+
+    def test_empty_response_is_a_fetch_failure(self):
+        writer = mock.Mock()
+        self.assertFalse(store_ingest_responses("499", ["", ""], writer))
+        writer.add.assert_not_called()
+        self.assertEqual(FailedBody.objects.get(body_id="499").stage, "fetch")
+        self.assertNotIn("499", self.negative_cache)
+
+    def test_lookup_failure_is_cached_and_clears_the_queue(self):
+        record_failure("499", "fetch", "timeout")
+        self.assertFalse(store_ingest_responses("499", ["No matches found.", ""], mock.Mock()))
+        self.assertFalse(has_failed("499"))
+        self.assertIn("499", self.negative_cache)
+
+    def test_pipeline_writer_sorts_empty_from_lookup_failures(self):
+        with mock.patch("builtins.print"):
+            horizons.write_parsed_bodies([
+                ("499", {"status": "empty"}, None, None), ("599", {"status": "no_match"}, None, None),
+            ])
+        self.assertEqual(FailedBody.objects.get(body_id="499").stage, "fetch")
+        self.assertNotIn("499", self.negative_cache)
+        self.assertFalse(has_failed("599"))
+        self.assertIn("599", self.negative_cache)
+
+
+def pipeline_parse(body_id, responses):
+    # Module level so the parse pool can pickle it
+    if responses[0] == "garbled":
+        raise ValueError(f"cannot parse body {body_id}")
+    return {"status": "no_match", "text": responses[0]}
+
+
+def failing_ids(count):
+    yield from range(1, count + 1)
+    raise RuntimeError("body list unavailable")
+
+
+class PipelineTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch("builtins.print")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_in_thread(self, body_ids, write_batch):
+        # A pipeline that fails to shut down would hang the test run, so give it a deadline instead
+        outcome = {}
+
+        def target():
+            try:
+                outcome["stats"] = run_pipeline(body_ids, [lambda body_id: f"text {body_id}"], pipeline_parse, write_batch,
+                                                concurrency=2, parse_workers=2, batch_size=4, report_seconds=0)
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(60)
+        self.assertFalse(thread.is_alive(), "pipeline did not shut down")
+        self.assertFalse([thread.name for thread in threading.enumerate() if thread.name.startswith("horizons-")])
+        return outcome
+
+    def test_results_reach_the_writer_in_order(self):
+        batches = []
+        stats = run_pipeline(range(1, 11), [lambda body_id: f"text {body_id}"], pipeline_parse, batches.append,
+                             concurrency=1, parse_workers=3, batch_size=4, report_seconds=0)
+        items = [item for batch in batches for item in batch]
+        self.assertEqual([body_id for body_id, *_ in items], list(range(1, 11)))
+        self.assertEqual([result["text"] for _, result, _, _ in items], [f"text {body_id}" for body_id in range(1, 11)])
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        self.assertEqual([stage["items"] for stage in stats], [10, 10, 10])
+
+    def test_errors_go_to_the_retry_path(self):
+        def fetch(body_id):
+            if body_id == 2:
+                raise HorizonsRequestError("connection reset")
+            return "garbled" if body_id == 3 else f"text {body_id}"
+
+        with tempfile.TemporaryDirectory() as directory, mock.patch("horizons.get_negative_cache") as get_cache:
+            get_cache.return_value = negative_cache = NegativeCache(directory)
+            try:
+                run_pipeline(range(1, 5), [fetch], pipeline_parse, horizons.write_parsed_bodies,
+                             concurrency=1, parse_workers=2, report_seconds=0)
+                self.assertEqual(dict(FailedBody.objects.values_list("body_id", "stage")), {"2": "fetch", "3": "parse"})
+                self.assertIn("cannot parse body 3", FailedBody.objects.get(body_id="3").reason)
+                self.assertIn("1", negative_cache)
+                self.assertIn("4", negative_cache)
+            finally:
+                negative_cache.close()
+
+    def test_writer_error_drains_the_queues(self):
+        calls = []
+
+        def write_batch(batch):
+            calls.append(batch)
+            raise RuntimeError("database is locked")
+
+        # Far more bodies than the queues hold, so the upstream stages are blocked when the writer fails
+        outcome = self.run_in_thread(range(1, 501), write_batch)
+        self.assertIsInstance(outcome.get("error"), RuntimeError)
+        self.assertEqual(len(calls), 1)
+
+    def test_fetch_stage_error_stops_the_pipeline(self):
+        batches = []
+        outcome = self.run_in_thread(failing_ids(6), batches.append)
+        self.assertEqual(str(outcome.get("error")), "body list unavailable")
+        self.assertTrue({body_id for batch in batches for body_id, *_ in batch} <= set(range(1, 7)))
+
+
+# What parse_jpl_horizons_object reads from each fixture, element table aside
+FIXTURE_OUTPUTS = {
+    "planet-mars.txt": {
+        'name': 'Mars', 'vol_mean_radius': 3389.92, 'vol_mean_radius_uncertainty': 0.04,
+        'density': 3.933, 'density_uncertainty': 0.0004, 'mass': 6.4171, 'flattening': 1 / 169.779,
+        'volume': 16.318, 'equatorial_radius': 3396.19, 'sidereal_rot_period': 24.622962,
+        'sid_rot_rate': 7.08822e-05, 'mean_solar_day': 88775.24415, 'polar_gravity': 3.758,
+        'core_radius': 1700.0, 'equatorial_gravity': 3.71, 'geometric_albedo': 0.15,
+        'gm': 42828.375214, 'gm_uncertainty': 0.00028, 'mass_ratio_to_sun': 3098703.59,
+        'atmosphere_mass': 2.5e+16, 'mean_temperature': 210.0, 'surface_pressure': 0.0056,
+        'obliquity_to_orbit': 25.19, 'max_angular_diameter': 25.5,
+        'mean_sidereal_orbit_period_years': 1.88081578, 'mean_sidereal_orbit_period_days': 686.98,
+        'visual_magnitude': -1.52, 'orbital_speed': 24.13, 'hill_sphere_radius': 319.8, 'escape_speed': 5.027,
+        'solar_constant_perihelion': 717.0, 'solar_constant_aphelion': 493.0, 'solar_constant_mean': 589.0,
+        'max_planetary_ir_perihelion': 470.0, 'max_planetary_ir_aphelion': 315.0, 'max_planetary_ir_mean': 390.0,
+        'min_planetary_ir': 30.0, 'fallback_fields': '',
+        'epoch': 2459945.5, 'eccentricity': 0.0933918628, 'perihelion_distance': 1.381399804134685,
+        'inclination': 1.847858, 'longitude_of_ascending_node': 49.4912711, 'argument_of_perihelion': 286.5645803,
+        'time_of_perihelion_passage': 2459784.765049894, 'mean_motion': 0.5240278973169146,
+        'semi_major_axis': 1.523701087, 'aphelion_distance': 1.666002369865315,
+        'orbital_period': 686.9863261922562 / 365.25, 'mean_longitude': 60.2869921, 'longitude_of_periapsis': 336.0558514,
+    },
+    "moon-moon.txt": {
+        'name': 'Moon', 'vol_mean_radius': 1737.53, 'vol_mean_radius_uncertainty': 0.03, 'density': 3.3437,
+        'mass': 0.7349, 'sid_rot_rate': 2.6617e-06, 'mean_solar_day': 29.5306 * 86400, 'geometric_albedo': 0.12,
+        'gm': 4902.800066, 'gm_uncertainty': 0.0001, 'obliquity_to_orbit': 6.67,
+        'max_planetary_ir_perihelion': 1314.0, 'max_planetary_ir_aphelion': 1226.0, 'max_planetary_ir_mean': 1268.0,
+        'min_planetary_ir': 5.2, 'fallback_fields': 'vol_mean_radius,density,mass,mean_solar_day,gm,gm_uncertainty',
+        'epoch': 2459945.5, 'eccentricity': 0.0171093, 'perihelion_distance': 0.9832189854938,
+        'inclination': 0.0050212, 'longitude_of_ascending_node': 172.3916, 'argument_of_perihelion': 290.3044,
+        'time_of_perihelion_passage': 2459948.937, 'mean_motion': 0.9851140852348209, 'semi_major_axis': 1.000334,
+        'aphelion_distance': 1.0174490145062, 'orbital_period': 365.439907312042 / 365.25,
+        'mean_longitude': 100.2831, 'longitude_of_periapsis': 102.696,
+    },
+    "asteroid-ceres.txt": {
+        'name': '1 Ceres', 'vol_mean_radius': 469.7, 'mass': 62.6284 * 1e9 / 6.67430e-11 / 1e23,
+        'sidereal_rot_period': 9.07417, 'geometric_albedo': 0.09,
+        'fallback_fields': 'vol_mean_radius,mass,sidereal_rot_period,geometric_albedo',
+        'epoch': 2459945.5, 'eccentricity': 0.0785889, 'perihelion_distance': 2.5501489593816,
+        'inclination': 10.5883, 'longitude_of_ascending_node': 80.2542, 'argument_of_perihelion': 73.4213,
+        'time_of_perihelion_passage': 2458236.3985, 'mean_motion': 0.2140601915774605, 'semi_major_axis': 2.767656,
+        'aphelion_distance': 2.9851630406184, 'orbital_period': 1681.769960809033 / 365.25,
+        'mean_longitude': 339.8062, 'longitude_of_periapsis': 153.6755,
+    },
+    "comet-halley.txt": {
+        'name': '1P/Halley', 'vol_mean_radius': 5.5, 'fallback_fields': 'name,vol_mean_radius',
+        'epoch': 2459945.5, 'eccentricity': 0.9671429, 'perihelion_distance': 0.5859782528223995,
+        'inclination': 162.26269, 'longitude_of_ascending_node': 58.42008, 'argument_of_perihelion': 111.33249,
+        'time_of_perihelion_passage': 2446467.3953, 'mean_motion': 0.01308656511443734, 'semi_major_axis': 17.834144,
+        'aphelion_distance': 35.0823097471776, 'orbital_period': 27509.12839633077 / 365.25,
+        'mean_longitude': 342.34427, 'longitude_of_periapsis': 169.75257,
+    },
+}
+
+# How the ingest path classifies each fixture
+FIXTURE_BODIES = {
+    "planet-mars.txt": {'body_type': 'terrestrial_planet', 'parent_body_name': 'Sun', 'is_planet': True, 'is_moon': False},
+    "moon-moon.txt": {'body_type': 'major_moon', 'parent_body_name': 'Earth', 'is_planet': False, 'is_moon': True},
+    "asteroid-ceres.txt": {'body_type': 'main_belt_asteroid', 'parent_body_name': 'Sun', 'is_planet': False, 'is_moon': False},
+    "comet-halley.txt": {'body_type': 'long_period_comet', 'parent_body_name': 'Sun', 'is_planet': False, 'is_moon': False},
+}
+
+
+class FixtureParserTests(SimpleTestCase):
+    def assertFields(self, parsed, expected):
+        for field, value in expected.items():
+            with self.subTest(field=field):
+                if isinstance(value, float):
+                    self.assertTrue(math.isclose(parsed.get(field), value, rel_tol=1e-9), f"{parsed.get(field)} != {value}")
+                else:
+                    self.assertEqual(parsed.get(field), value)
+
+    def test_horizons_parser(self):
+        for name, expected in FIXTURE_OUTPUTS.items():
+            with self.subTest(fixture=name):
+                parsed = parse_jpl_horizons_object(fixture(name))
+                self.assertEqual(set(parsed) - {'element_table'}, set(expected))
+                self.assertFields(parsed, expected)
+                self.assertEqual(len(load_element_table(parsed['element_table'])), 3)
+
+    def test_ingest_parser_agrees_with_horizons_parser(self):
+        for name, expected in FIXTURE_OUTPUTS.items():
+            with self.subTest(fixture=name):
+                text = fixture(name)
+                parsed, _ = parse_ingest_data(name, text, text)
+                # The ingest path also reads the observer preamble, so more fields may come from the fallback tier
+                self.assertFields(parsed, {field: value for field, value in expected.items() if field != 'fallback_fields'})
+                self.assertFields(parsed, FIXTURE_BODIES[name])
+                self.assertEqual(len(parsed['observer_ephemeris']), 3)
+
+    def test_fallback_parser_reads_the_physical_fields(self):
+        for name, expected in FIXTURE_OUTPUTS.items():
+            with self.subTest(fixture=name):
+                parsed = parse_jpl_horizons_object_fallback(fixture(name))
+                # It reads fewer fields, so its fallback_fields list is shorter
+                outputs = {key for keys in FALLBACK_FIELDS.outputs.values() for key in keys}
+                physical = {field: value for field, value in expected.items() if field in outputs}
+                self.assertEqual(set(parsed) - {'body_type', 'fallback_fields'}, set(physical))
+                self.assertFields(parsed, physical)
+
+    def test_elements_table(self):
+        elements = parse_elements_table(fixture("planet-mars.txt"))
+        self.assertEqual(len(elements), 3)
+        np.testing.assert_allclose(elements['jd'], [2459945.5, 2459946.5, 2459947.5])
+        self.assertAlmostEqual(elements['ec'][0], 0.0933918628)
+        self.assertAlmostEqual(elements['tp'][0], 2459784.765049894)
+        self.assertAlmostEqual(elements['pr'][0], 686.9863261922562)
+
+    def test_elements_table_skips_the_observer_table(self):
+        # Negative values run into their keys in this record, so it goes through the per-record path
+        text = fixture("comet-halley.txt").replace("TA= 1.795129348511776E+02", "TA=-1.795129348511776E+02")
+        elements = parse_elements_table(text)
+        self.assertEqual(len(elements), 3)
+        self.assertFalse(np.isnan(elements['ec']).any())
+
+    def test_observer_table(self):
+        table = parse_observer_table(fixture("planet-mars.txt"))
+        self.assertEqual(len(table), 3)
+        first = table[0]
+        self.assertEqual(str(first['time']), '2006-01-01T00:00:00')
+        self.assertAlmostEqual(first['ra'], (2 + 33 / 60 + 14.40 / 3600) * 15)
+        self.assertAlmostEqual(first['dec'], 16 + 11 / 60 + 24.0 / 3600)
+        self.assertEqual(first['apparent_magnitude'], -0.64)
+        self.assertTrue(np.isnan(first['nuclear_magnitude']))
+        self.assertEqual(first['elongation_flag'], 'T')
+        self.assertEqual(first['constellation'], 'Ari')
+
+    def test_observer_table_reads_comet_magnitudes(self):
+        table = parse_observer_table(fixture("comet-halley.txt"))
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table[0]['apparent_magnitude'], 27.71)
+        self.assertEqual(table[0]['nuclear_magnitude'], 24.18)
+        self.assertTrue(np.isnan(table[0]['surface_brightness']))
+
+
+class BenchFixtureTests(SimpleTestCase):
+    def test_every_parser_names_every_fixture(self):
+        documents = list(fixture_documents())
+        report = bench_parsers(documents, repeat=1)
+        for name in PARSERS:
+            with self.subTest(parser=name):
+                self.assertEqual(report[name]["failed"], 0)
+                self.assertEqual(report[name]["fields"].get("name"), len(documents))
+
+    def test_captured_fixtures_match_the_stub_bodies(self):
+        # Recorded from horizons_stub_server.py, so the body behind each response is known
+        captured = [(name, text) for name, _, text in fixture_documents() if "-synthetic-" in name]
+        self.assertTrue(captured)
+        for name, text in captured:
+            with self.subTest(fixture=name):
+                body = synthetic_body(int(name[:-len(".txt")].rsplit("-", 1)[1]))
+                parsed = parse_jpl_horizons_object(text)
+                self.assertEqual(parsed['name'], body['name'])
+                self.assertAlmostEqual(parsed['vol_mean_radius'], body['radius'], places=2)
+                self.assertAlmostEqual(parsed['geometric_albedo'], body['albedo'], places=3)
+                self.assertAlmostEqual(parsed['eccentricity'], body['e'], places=6)
+                self.assertTrue(math.isclose(parsed['semi_major_axis'], body['a'], rel_tol=1e-9))
+                self.assertTrue(math.isclose(parsed['inclination'], body['i'], rel_tol=1e-9))
+
+
+def hang_on_moon(body_id, text):
+    if body_id == "301":
+        time.sleep(600)
+    return horizons_batch._parse_horizons(body_id, text)
+
+
+class BatchParseTests(SimpleTestCase):
+    def test_hung_document_times_out_and_the_rest_are_parsed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("comet-halley.txt", "moon-moon.txt", "planet-mars.txt"):
+                with open(os.path.join(directory, name), "w", encoding="utf-8") as handle:
+                    handle.write(fixture(name))
+            output = io.StringIO()
+            # One worker, so the documents after the hung one can only be parsed by its replacement
+            with mock.patch.dict(horizons_batch.PARSERS, {"horizons": hang_on_moon}), mock.patch("sys.stderr", io.StringIO()) as stderr:
+                started = time.monotonic()
+                counts = horizons_batch.batch_parse(directory, workers=1, timeout=1, output=output)
+        self.assertLess(time.monotonic() - started, 60)
+        self.assertEqual((counts["documents"], counts["parsed"], counts["timeout"]), (3, 2, 1))
+        records = {record["document"]: record for record in map(json.loads, output.getvalue().splitlines())}
+        self.assertEqual(records["moon-moon.txt"]["status"], "timeout")
+        self.assertEqual(records["planet-mars.txt"]["fields"]["name"], "Mars")
+        self.assertEqual(records["comet-halley.txt"]["status"], "parsed")
+        self.assertIn("moon-moon.txt: no result after 1s", stderr.getvalue())
+
+    def test_ndjson_output_does_not_load_django(self):
+        # In a fresh interpreter, since this one has Django set up already
+        script = (
+            "import io, sys, horizons_batch\n"
+            f"output = io.StringIO()\nhorizons_batch.batch_parse({FIXTURES!r}, workers=1, output=output)\n"
+            "print(len(output.getvalue().splitlines()), 'a.models' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=PROJECT_DIR, capture_output=True, text=True, check=True, timeout=120,
+        )
+        lines, loaded = result.stdout.splitlines()[-1].split()
+        self.assertEqual(int(lines), len(os.listdir(FIXTURES)))
+        self.assertEqual(loaded, "False")
+
+
+class TokenizerTests(SimpleTestCase):
+    def test_side_by_side_pairs(self):
+        line = " Vol. mean radius (km) = 3389.92+-0.04   Density (g/cm^3)      =  3.933(5+-4)"
+        self.assertEqual(tokenize_header(line), [
+            ("Vol. mean radius (km)=", "3389.92+-0.04"), ("Density (g/cm^3)=", "3.933(5+-4)"),
+        ])
+
+    def test_key_after_a_single_space(self):
+        self.assertEqual(tokenize_header("EC= .0785889 QR= 2.55 W= 73.42"), [
+            ("EC=", ".0785889"), ("QR=", "2.55"), ("W=", "73.42"),
+        ])
+
+    def test_colon_rows_hold_one_value(self):
+        self.assertEqual(tokenize_header("Target body name: Mars (499)     {source: mar097}"), [
+            ("Target body name:", "Mars (499)     {source: mar097}"),
+        ])
+
+    def test_rows_without_delimiter_split_at_the_first_gap(self):
+        self.assertEqual(tokenize_header(" Solar Constant (W/m^2)         717         493         589"), [
+            ("Solar Constant (W/m^2)", "717         493         589"),
+        ])
+
+    def test_tables_and_rules_are_skipped(self):
+        text = "****\nA = 1\n$$SOE\n EC= 0.1 QR= 2\n$$EOE\nB = 2\n"
+        self.assertEqual(tokenize_header(text), [("A=", "1"), ("B=", "2")])
+
+
+class FieldTierTests(SimpleTestCase):
+    parser = FIELDS.parser(['vol_mean_radius', 'mass', 'density'])
+
+    def test_strict_layout(self):
+        parsed, served = self.parser.parse(" Vol. mean radius (km) = 3389.92+-0.04   Mass x10^23 (kg)      = 6.4171")
+        self.assertEqual(parsed, {'vol_mean_radius': 3389.92, 'vol_mean_radius_uncertainty': 0.04, 'mass': 6.4171})
+        self.assertEqual(served, {'vol_mean_radius': STRICT, 'mass': STRICT})
+        self.assertEqual(self.parser.fallback_fields(served), "")
+
+    def test_fallback_only_fills_what_strict_left_empty(self):
+        parsed, served = self.parser.parse(
+            " Vol. mean radius (km) = 3389.92   Density, g/cm^3 = 3.3437\n Mass, x10^22 kg = 7.349"
+        )
+        self.assertEqual(served, {'vol_mean_radius': STRICT, 'density': FALLBACK, 'mass': FALLBACK})
+        self.assertAlmostEqual(parsed['mass'], 0.7349)
+        self.assertEqual(self.parser.fallback_fields(served), "mass,density")
+
+    def test_strict_rule_wins_over_an_earlier_fallback_match(self):
+        parsed, served = self.parser.parse("Vol. Mean Radius (km) = 10\nVol. mean radius (km) = 20")
+        self.assertEqual(parsed['vol_mean_radius'], 20.0)
+        self.assertEqual(served['vol_mean_radius'], STRICT)
+
+
+class LegacyUnitTests(SimpleTestCase):
+    def convert(self, **fields):
+        body = CelestialBody(name="Body", **fields)
+        return body, legacy_units.convert_legacy_units(body)
+
+    def test_populate_flattening_was_its_inverse(self):
+        body, changed = self.convert(source_parser="populate", flattening=169.779)
+        self.assertAlmostEqual(body.flattening, 1 / 169.779)
+        self.assertEqual(changed, ['flattening'])
+
+    def test_truncated_flattening_is_dropped(self):
+        body, _ = self.convert(source_parser="fallback", flattening=1.0)
+        self.assertIsNone(body.flattening)
+
+    def test_flattening_already_f_is_kept(self):
+        body, changed = self.convert(source_parser="horizons", flattening=0.00589)
+        self.assertEqual(body.flattening, 0.00589)
+        self.assertEqual(changed, [])
+
+    def test_horizons_mass_was_in_ten_to_the_24_kg(self):
+        body, _ = self.convert(source_parser="horizons", mass=0.64171, gm=42828.375214)
+        self.assertAlmostEqual(body.mass, 6.4171)
+
+    def test_horizons_mass_from_gm_was_gm_over_g(self):
+        body, _ = self.convert(source_parser="horizons", mass=62.6284 / 6.67430e-11)
+        self.assertAlmostEqual(body.mass, 62.6284 * 1e9 / 6.67430e-11 / 1e23)
+
+    def test_populate_mass_is_kept(self):
+        body, _ = self.convert(source_parser="populate", mass=6.4171)
+        self.assertEqual(body.mass, 6.4171)
+
+    def test_horizons_mean_solar_day_in_seconds(self):
+        # Mars prints "Mean solar day (sol) = 88775.24415 s"
+        body, _ = self.convert(source_parser="horizons", mean_solar_day=88775.24415 * 24)
+        self.assertAlmostEqual(body.mean_solar_day, 88775.24415)
+
+    def test_horizons_mean_solar_day_in_days(self):
+        # The Moon prints "Mean solar day = 29.5306 d"
+        body, _ = self.convert(source_parser="horizons", mean_solar_day=29.5306 * 24)
+        self.assertAlmostEqual(body.mean_solar_day, 29.5306 * 86400)
+
+    def test_populate_mean_solar_day_is_kept(self):
+        body, _ = self.convert(source_parser="populate", mean_solar_day=88775.24415)
+        self.assertEqual(body.mean_solar_day, 88775.24415)
+
+
+class CelestialBodyWriterTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive = SourceArchive(self.directory.name)
+        patcher = mock.patch("horizons_upsert.get_source_archive", return_value=self.archive)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.outcomes = []
+
+    def tearDown(self):
+        self.archive.close()
+        self.directory.cleanup()
+
+    def writer(self, batch_size=10):
+        return CelestialBodyWriter(
+            batch_size,
+            on_written=lambda key, body, status: self.outcomes.append((key, status)),
+            on_failed=lambda key, error: self.outcomes.append((key, type(error).__name__)),
+        )
+
+    def test_entries_are_written_a_batch_at_a_time(self):
+        writer = self.writer(batch_size=2)
+        writer.add("499", {"name": "Mars", "mass": 6.4171}, "fp-mars")
+        self.assertFalse(CelestialBody.objects.exists())
+        with self.assertNumQueries(4):
+            # The batch is full: one read of the existing rows and one upsert, inside a savepoint
+            writer.add("299", {"name": "Venus", "mass": 48.685}, "fp-venus")
+        self.assertEqual(self.outcomes, [("499", "created"), ("299", "created")])
+        writer.add("599", {"name": "Jupiter", "mass": 18981.8}, "fp-jupiter")
+        self.assertEqual(CelestialBody.objects.count(), 2)
+        self.assertEqual([key for key, _, _ in writer.flush()], ["599"])
+        self.assertEqual(CelestialBody.objects.get(name="Jupiter").content_fingerprint, "fp-jupiter")
+
+    def test_a_failed_batch_is_retried_one_row_at_a_time(self):
+        with self.writer() as writer:
+            writer.add("499", {"name": "Mars", "mass": 6.4171}, "fp-mars")
+            writer.add("299", {"name": "Venus", "mass": 48.685}, "fp-venus")
+        self.outcomes.clear()
+        with self.writer() as writer:
+            writer.add("499", {"name": "Mars", "mass": 6.4171}, "fp-mars")
+            writer.add("299", {"name": "Venus", "mass": 48.69}, "fp-venus-2")
+            writer.add("599", {"name": "Jupiter", "mass": 18981.8}, "fp-jupiter")
+            writer.add("999", {"name": "Broken", "mass": "heavy"}, "fp-broken")
+        self.assertEqual(self.outcomes, [
+            ("499", "unchanged"), ("299", "updated"), ("599", "created"), ("999", "ValueError"),
+        ])
+        self.assertEqual(CelestialBody.objects.get(name="Venus").mass, 48.69)
+        self.assertFalse(CelestialBody.objects.filter(name="Broken").exists())
+
+    def test_retry_inside_the_callers_transaction(self):
+        # write_parsed_bodies holds one transaction around the writer, so the failed batch only rolls back to a savepoint
+        batch = [
+            (name, {"status": "valid", "parsed_data": {"name": name, "mass": mass}, "fingerprint": f"fp-{name}"}, None, None)
+            for name, mass in (("Mars", 6.4171), ("Broken", "heavy"), ("Venus", 48.685))
+        ]
+        with mock.patch("builtins.print"):
+            horizons.write_parsed_bodies(batch)
+        self.assertEqual(set(CelestialBody.objects.values_list("name", flat=True)), {"Mars", "Venus"})
+        self.assertEqual(dict(FailedBody.objects.values_list("body_id", "stage")), {"Broken": "store"})
+
+
+class ReplayForceTests(TestCase):
+    def test_force_rewrites_values_behind_a_matching_fingerprint(self):
+        parsed_data, fingerprint = parse_fallback_responses(499, [fixture("planet-mars.txt"), ""])
+        body = CelestialBody.objects.create(name="Mars", mass=0.64171, content_fingerprint=fingerprint)
+        results = [(body.pk, "parsed", dict(parsed_data), fingerprint)]
+        self.assertEqual(write_replayed(results), 0)
+        self.assertEqual(write_replayed(results, force=True), 1)
+        body.refresh_from_db()
+        self.assertAlmostEqual(body.mass, 6.4171)
+        self.assertEqual(body.content_fingerprint, fingerprint)
+        # Nothing left to rewrite
+        self.assertEqual(write_replayed(results, force=True), 0)
+
+
+def mpcorb_line(packed, absolute_magnitude, mean_anomaly, eccentricity, mean_motion, semi_major_axis, flags, readable):
+    """One 202-column MPCORB record at epoch K2555 with fixed angles."""
+    record = bytearray(b" " * 202)
+    for (start, end), text in (
+        ((0, 7), packed), ((8, 13), f"{absolute_magnitude:5.2f}"), ((14, 19), " 0.15"), ((20, 25), "K2555"),
+        ((26, 35), f"{mean_anomaly:9.5f}"), ((37, 46), " 73.27343"), ((48, 57), " 80.25221"), ((59, 68), " 10.58780"),
+        ((70, 79), f"{eccentricity:9.7f}"), ((80, 91), f"{mean_motion:11.8f}"), ((92, 103), f"{semi_major_axis:11.7f}"),
+        ((161, 165), flags), ((166, 194), readable.ljust(28)),
+    ):
+        record[start:end] = text.encode("ascii")
+    return bytes(record) + b"\n"
+
+
+MPCORB_LINES = [
+    # Numbered and named, provisional, survey, and numbered from 620000 on in the extended "~" form
+    mpcorb_line("00001", 3.34, 188.70269, 0.0794013, 0.21424651, 2.7660512, "0000", "(1) Ceres"),
+    mpcorb_line("K07Tf8A", 6.1, 12.3, 0.1, 0.003, 45.2, "000a", "2007 TA418"),
+    mpcorb_line("PLS2040", 16.5, 100.0, 0.15, 0.25, 2.6, "0002", "2040 P-L"),
+    mpcorb_line("~0000", 18.1, 300.0, 0.55, 0.6, 1.4, "0803", "(620000) 2019 AB1"),
+]
+
+
+class MpcorbNameTests(SimpleTestCase):
+    def test_catalog_and_horizons_names_agree(self):
+        cases = [
+            ("04179", "(4179) 1989 AC", "4179 (1989 AC)              {source: JPL#245}"),
+            ("00001", "(1) Ceres", "1 Ceres (A801 AA)               {source: JPL#48}"),
+            ("K07Tf8A", "2007 TA418", "(2007 TA418)                 {source: JPL#12}"),
+        ]
+        parser = FIELDS.parser(['name'])
+        for packed, readable, target in cases:
+            with self.subTest(packed=packed):
+                [record] = decode_mpcorb([mpcorb_line(packed, 15.0, 10.0, 0.1, 0.2, 2.5, "0000", readable)])
+                parsed, _ = parser.parse(f"Target body name: {target}\n")
+                self.assertEqual(parsed['name'], record['name'])
+
+
+class MpcorbLoadTests(TestCase):
+    def load(self, lines):
+        (chunk, table), = iter_mpcorb_chunks(lines, len(lines))
+        return chunk, table, load_mpcorb_chunk(chunk, table)
+
+    @staticmethod
+    def columns(body):
+        # Everything but the key, the name it was stored under and the write time
+        values = {}
+        for field in CelestialBody._meta.concrete_fields:
+            if field.attname not in ("id", "name", "last_updated"):
+                value = getattr(body, field.attname)
+                values[field.attname] = bytes(value) if isinstance(value, memoryview) else value
+        return values
+
+    def test_raw_rows_match_the_orm(self):
+        chunk, table, counts = self.load(MPCORB_LINES)
+        self.assertEqual(counts, (4, 0, 0))
+        self.assertEqual(
+            dict(CelestialBody.objects.values_list("name", "horizons_id")),
+            {"1 Ceres": "2000001", "(2007 TA418)": "DES=2007 TA418;", "(2040 P-L)": "DES=2040 P-L;",
+             "620000 (2019 AB1)": "2620000"},
+        )
+        for name, fields, new_fields in mpcorb_rows(chunk, table):
+            stored = CelestialBody.objects.get(name=name)
+            through_orm = CelestialBody.objects.create(name=f"orm {name}", **fields, **new_fields)
+            through_orm.refresh_from_db()
+            self.assertEqual(self.columns(stored), self.columns(through_orm), name)
+
+    def test_changed_lines_update_and_unchanged_are_skipped(self):
+        self.load(MPCORB_LINES)
+        changed = [mpcorb_line("00001", 3.35, 188.70269, 0.0794013, 0.21424651, 2.7660512, "0000", "(1) Ceres")]
+        _, _, counts = self.load(changed + MPCORB_LINES[1:])
+        self.assertEqual(counts, (0, 1, 3))
+        ceres = CelestialBody.objects.get(name="1 Ceres")
+        self.assertEqual(ceres.absolute_magnitude, 3.35)
+        chunk, table = next(iter_mpcorb_chunks(changed, 1))
+        (_, fields, _), = mpcorb_rows(chunk, table)
+        self.assertEqual({field: getattr(ceres, field) for field in fields if field != "element_table"},
+                         {field: value for field, value in fields.items() if field != "element_table"})
+        self.assertEqual(bytes(ceres.element_table), fields["element_table"])
@@ -0,0 +1,2 @@
+# Moved to horizons_core.fetch; this module keeps the old import path working
+from horizons_core.fetch import *  # noqa: F401,F403
@@ -0,0 +1,307 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import tarfile
+import argparse
+import multiprocessing
+from multiprocessing.connection import wait
+
+from horizons_core import parse_fallback_responses, parse_ingest_data, parse_jpl_horizons_object
+from horizons_core.changes import content_fingerprint
+from horizons_core.elements import load_element_table
+from horizons_core.probe import classify_response
+from horizons_core.stream import TABLE_ROWS, condense_lines
+from horizons_django import lazy_import
+from horizons_pipeline import PARSE_WORKERS, WRITE_BATCH_SIZE
+
+horizons_upsert = lazy_import("horizons_upsert")
+
+# A worker still busy with one document after this many seconds is killed and replaced
+DOCUMENT_TIMEOUT = float(os.environ.get("HORIZONS_DOCUMENT_TIMEOUT", 30))
+
+# "Target body name: Mars (499)"; small bodies print a designation in the parentheses instead
+TARGET_ID = re.compile(r'^Target body name:[^(\n]*\((\d+)\)', re.MULTILINE)
+LEADING_DIGITS = re.compile(r'^(\d+)')
+
+
+def _parse_horizons(body_id, text):
+    parsed_data = parse_jpl_horizons_object(text)
+    parsed_data['horizons_id'] = str(body_id)
+    parsed_data['source_parser'] = "horizons"
+    return parsed_data, content_fingerprint(text, parsed_data)
+
+
+def _parse_populate(body_id, text):
+    return parse_ingest_data(body_id, text, text)
+
+
+def _parse_fallback(body_id, text):
+    return parse_fallback_responses(body_id, [text])
+
+
+PARSERS = {
+    "horizons": _parse_horizons,
+    "populate": _parse_populate,
+    "fallback": _parse_fallback,
+}
+
+
+def iter_documents(path):
+    """``(name, text)`` for every saved response under ``path``: a directory, a tarball or a single file.
+
+    Each file holds the responses of one body. Files are read one at a time,
+    so only the documents the workers are busy with are held in memory.
+    """
+    if os.path.isdir(path):
+        for root, directories, filenames in os.walk(path):
+            directories[:] = sorted(name for name in directories if not name.startswith("."))
+            for filename in sorted(filenames):
+                if not filename.startswith("."):
+                    full_path = os.path.join(root, filename)
+                    with open(full_path, encoding="utf-8", errors="replace") as handle:
+                        yield os.path.relpath(full_path, path), handle.read()
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path, "r:*") as archive:
+            for member in archive:
+                if member.isfile() and not os.path.basename(member.name).startswith("."):
+                    yield member.name, archive.extractfile(member).read().decode("utf-8", errors="replace")
+    else:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            yield os.path.basename(path), handle.read()
+
+
+def document_body_id(name, text):
+    """The Horizons ID of a saved response: the number after the target name, else leading digits of the file name."""
+    match = TARGET_ID.search(text) or LEADING_DIGITS.match(os.path.basename(name))
+    return match.group(1) if match else None
+
+
+def parse_document(parser, name, text):
+    """Parse one saved response; runs in a worker process and returns ``(status, parsed_data, fingerprint, error)``.
+
+    The status is ``parsed``, ``invalid`` when Horizons answered without a
+    unique object, or ``failed`` when the parser raised or found no name.
+    """
+    status = classify_response(text)
+    if status != "valid":
+        return "invalid", None, None, status
+    body_id = document_body_id(name, text)
+    # Condensed like the live ingest, so the fingerprints match those of fetched rows
+    text = condense_lines(text.splitlines(), TABLE_ROWS)
+    try:
+        parsed_data, fingerprint = PARSERS[parser](body_id, text)
+    except Exception as e:
+        return "failed", None, None, f"{type(e).__name__}: {e}"
+    if not parsed_data.get('name'):
+        return "failed", None, None, "No name found in the Horizons response"
+    if body_id is None:
+        parsed_data.pop('horizons_id', None)
+    # A saved file is not the set of profile responses a replay parser expects, so the row names no sources
+    parsed_data.pop('source_responses', None)
+    parsed_data.pop('source_texts', None)
+    return "parsed", parsed_data, fingerprint, None
+
+
+def document_line(parser, name, text):
+    # NDJSON mode serializes in the worker too, so the parent only writes lines
+    status, parsed_data, fingerprint, error = parse_document(parser, name, text)
+    return status, ndjson_line(name, status, parsed_data, fingerprint, error)
+
+
+def ndjson_line(name, status, parsed_data, fingerprint, error):
+    record = {"document": name, "status": status}
+    if error is not None:
+        record["error"] = error
+    if parsed_data is not None:
+        fields = dict(parsed_data)
+        if fields.get('element_table') is not None:
+            fields['element_table'] = table_records(load_element_table(fields['element_table']))
+        if fields.get('observer_ephemeris') is not None:
+            fields['observer_ephemeris'] = table_records(fields['observer_ephemeris'])
+        record["fingerprint"] = fingerprint
+        record["fields"] = {key: _json_value(value) for key, value in fields.items()}
+    return json.dumps(record, default=str)
+
+
+def table_records(table):
+    """A structured NumPy table as a list of ``{column: value}`` dicts, with NaN and NaT as None."""
+    names = table.dtype.names
+    return [{column: _json_value(value) for column, value in zip(names, row)} for row in table.tolist()]
+
+
+def _json_value(value):
+    # JSON has no NaN; NaT already comes out of tolist() as None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _worker_main(connection, handler, parser):
+    # The parsers print a warning for every field they miss; stdout may be carrying the NDJSON
+    sys.stdout = open(os.devnull, "w")
+    while True:
+        document = connection.recv()
+        if document is None:
+            return
+        connection.send(handler(parser, *document))
+
+
+class _Worker:
+    # One process per worker with its own pipe, so the parent knows which document each one holds and since when
+
+    def __init__(self, context, handler, parser):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, handler, parser), daemon=True)
+        self.process.start()
+        child.close()
+        self.name = None
+        self.deadline = None
+
+    def submit(self, name, text, timeout):
+        self.name = name
+        self.deadline = time.monotonic() + timeout
+        self.connection.send((name, text))
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+
+
+def parse_in_workers(documents, handler=parse_document, parser="horizons", workers=PARSE_WORKERS, timeout=DOCUMENT_TIMEOUT):
+    """Yield ``(name, result, failure)`` for each ``(name, text)`` document, in the order they finish.
+
+    ``result`` is ``handler(parser, name, text)`` run in one of ``workers``
+    processes. A worker that runs past ``timeout`` seconds on a document is
+    killed and replaced, and the document comes back with a None result and
+    a ``("timeout", reason)`` failure; one whose worker died gets ``("failed", reason)``.
+    """
+    context = multiprocessing.get_context()
+    pool = [_Worker(context, handler, parser) for _ in range(max(1, workers))]
+    documents = iter(documents)
+    remaining = True
+    try:
+        while True:
+            for worker in pool:
+                if remaining and worker.name is None:
+                    document = next(documents, None)
+                    if document is None:
+                        remaining = False
+                    else:
+                        worker.submit(*document, timeout)
+            busy = [worker for worker in pool if worker.name is not None]
+            if not busy:
+                return
+            ready = wait([worker.connection for worker in busy], max(0.0, min(worker.deadline for worker in busy) - time.monotonic()))
+            for worker in busy:
+                if worker.connection in ready:
+                    try:
+                        result, failure = worker.connection.recv(), None
+                    except EOFError:
+                        result, failure = None, ("failed", f"worker exited with code {worker.process.exitcode}")
+                elif time.monotonic() >= worker.deadline:
+                    result, failure = None, ("timeout", f"no result after {timeout:g}s")
+                else:
+                    continue
+                name = worker.name
+                worker.name = None
+                if failure is not None:
+                    worker.kill()
+                    pool[pool.index(worker)] = _Worker(context, handler, parser)
+                yield name, result, failure
+    finally:
+        for worker in pool:
+            worker.stop()
+
+
+def batch_parse(path, parser="horizons", workers=PARSE_WORKERS, timeout=DOCUMENT_TIMEOUT, output=None,
+                dry_run=False, batch_size=WRITE_BATCH_SIZE):
+    """Parse every saved response under ``path`` in parallel and write NDJSON to ``output`` or load the rows.
+
+    With ``output`` each document becomes one JSON line; otherwise parsed
+    bodies are loaded into ``CelestialBody`` every ``batch_size`` documents.
+    Returns counts by status, plus ``created`` and ``updated`` when loading.
+    """
+    counts = dict.fromkeys(("documents", "parsed", "invalid", "failed", "timeout", "created", "updated"), 0)
+    handler = document_line if output is not None else parse_document
+
+    def written(name, body, status):
+        if status != "unchanged":
+            counts[status] += 1
+
+    def failed(name, error):
+        counts["failed"] += 1
+        print(f"{name}: {error}", file=sys.stderr)
+
+    writer = None
+
+    for name, result, failure in parse_in_workers(iter_documents(path), handler, parser, workers, timeout):
+        counts["documents"] += 1
+        if failure is not None:
+            status, error = failure
+            counts[status] += 1
+            print(f"{name}: {error}", file=sys.stderr)
+            if output is not None:
+                output.write(ndjson_line(name, status, None, None, error) + "\n")
+            continue
+        if output is not None:
+            status, line = result
+            counts[status] += 1
+            output.write(line + "\n")
+            continue
+        status, parsed_data, fingerprint, error = result
+        counts[status] += 1
+        if status == "parsed":
+            if writer is None:
+                # Built for the first row to load, after the workers have started, so NDJSON output never sets up Django
+                writer = horizons_upsert.CelestialBodyWriter(batch_size, written, failed, dry_run)
+            writer.add(name, parsed_data, fingerprint)
+        elif status == "failed":
+            print(f"{name}: {error}", file=sys.stderr)
+    if writer is not None:
+        writer.flush()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parse a directory or tarball of saved Horizons responses across all cores, one body per file."
+    )
+    parser.add_argument("path", help="directory, tarball (.tar, .tar.gz, ...) or single file of saved responses")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default="horizons", help="parser to run on each document")
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS, help="parse processes")
+    parser.add_argument("--timeout", type=float, default=DOCUMENT_TIMEOUT, help="seconds a worker may spend on one document before it is killed")
+    parser.add_argument("--ndjson", help="write one JSON line per document to this file ('-' for stdout) instead of loading the database")
+    parser.add_argument("--batch-size", type=int, default=WRITE_BATCH_SIZE, help="parsed bodies per bulk insert/update")
+    parser.add_argument("--dry-run", action="store_true", help="count the rows that would be created or changed without writing them")
+    args = parser.parse_args()
+
+    if args.ndjson == "-":
+        counts = batch_parse(args.path, args.parser, args.workers, args.timeout, sys.stdout)
+    elif args.ndjson:
+        with open(args.ndjson, "w", encoding="utf-8") as output:
+            counts = batch_parse(args.path, args.parser, args.workers, args.timeout, output)
+    else:
+        counts = batch_parse(args.path, args.parser, args.workers, args.timeout, None, args.dry_run, args.batch_size)
+
+    summary = (f"Parsed {counts['documents']} documents: {counts['parsed']} parsed, {counts['invalid']} without a unique object, "
+               f"{counts['failed']} failed, {counts['timeout']} timed out")
+    if not args.ndjson:
+        summary += f"; {counts['created']} {'would be created' if args.dry_run else 'created'}, {counts['updated']} {'would change' if args.dry_run else 'updated'}"
+    print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
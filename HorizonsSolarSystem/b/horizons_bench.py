@@ -0,0 +1,261 @@
+import os
+import re
+import sys
+import json
+import math
+import argparse
+import contextlib
+from collections import Counter, defaultdict
+from time import perf_counter
+
+from horizons_core import parse_ingest_data, parse_jpl_horizons_object, parse_jpl_horizons_object_fallback
+from horizons_core.cache import source_text
+from horizons_core.client import parse_response_source
+from horizons_core.elements import parse_elements_table
+from horizons_core.fields import FIELDS
+from horizons_core.header import tokenize_header
+from horizons_core.observer import parse_observer_table
+from horizons_debug import parse_celestial_data as parse_debug_data
+from horizons_django import lazy_import
+from horizons_synthetic import synthetic_body, synthetic_corpus
+
+models = lazy_import("a.models")
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+BENCH_REPEAT = int(os.environ.get("HORIZONS_BENCH_REPEAT", 3))
+# A parser counts as slower than its baseline once its throughput drops by more than this fraction
+SPEED_TOLERANCE = float(os.environ.get("HORIZONS_BENCH_SPEED_TOLERANCE", 0.2))
+
+PARSERS = {
+    "horizons": parse_jpl_horizons_object,
+    "populate": lambda text: parse_ingest_data("bench", text, text, "bench")[0],
+    "fallback": parse_jpl_horizons_object_fallback,
+    "debug": parse_debug_data,
+}
+
+# Fixture files are grouped by these broad kinds, whatever the stored body type
+FIXTURE_KINDS = {
+    "terrestrial_planet": "planet", "gas_giant": "planet", "dwarf_planet": "planet",
+    "major_moon": "moon", "moon": "moon",
+    "short_period_comet": "comet", "long_period_comet": "comet",
+    "star": "star", "unknown": "unknown",
+}
+
+# Timed next to the registry fields, since they fill the element and observer columns
+TABLE_PARSERS = {
+    "(elements table)": parse_elements_table,
+    "(observer table)": parse_observer_table,
+}
+
+
+def fixture_documents(directory=FIXTURE_DIR):
+    """``(name, kind, text)`` for each ``.txt`` response in ``directory``; the kind is the file name up to the first dash."""
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(directory, filename), encoding="utf-8") as handle:
+                yield filename, filename.split("-", 1)[0], handle.read()
+
+
+def synthetic_documents(count):
+    """``count`` synthetic bodies, a quarter of them major bodies and the rest asteroids and comets."""
+    majors = count // 4
+    for body_id, text in list(synthetic_corpus(majors, start_id=1)) + list(synthetic_corpus(count - majors, start_id=1000)):
+        kind = synthetic_body(body_id)["kind"]
+        if kind == "major":
+            # Horizons numbers planets x99 and their moons x01-x98
+            kind = "planet" if body_id % 100 == 99 else "moon"
+        yield f"synthetic {body_id}", kind, text
+
+
+def archived_documents(limit):
+    """Up to ``limit`` stored bodies, re-read from the responses recorded in the archive."""
+    rows = (
+        models.CelestialBody.objects.exclude(source_responses__isnull=True).exclude(source_responses="")
+        .order_by("pk").values_list("name", "body_type", "source_responses")[:limit]
+    )
+    for name, body_type, source in rows:
+        texts = [source_text(ref) for _, ref in parse_response_source(source)]
+        if texts and all(text is not None for text in texts):
+            yield name, body_type or "archived", "\n".join(texts)
+
+
+def capture_fixtures(documents, directory=FIXTURE_DIR):
+    """Write archived ``(name, body_type, text)`` documents as ``<kind>-<name>.txt`` fixtures; returns the paths written."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, body_type, text in documents:
+        slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+        path = os.path.join(directory, f"{FIXTURE_KINDS.get(body_type, 'asteroid')}-{slug}.txt")
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            handle.write(text)
+        paths.append(path)
+    return paths
+
+
+def recovered(value):
+    if isinstance(value, float):
+        return not math.isnan(value)
+    if hasattr(value, "__len__"):
+        # Strings, packed tables and NumPy arrays count when they are not empty
+        return len(value) > 0
+    return value is not None
+
+
+def time_calls(function, arguments, repeat):
+    # Best of ``repeat`` passes over the whole corpus; parser warnings are printed to /dev/null
+    best = None
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        for _ in range(repeat):
+            started = perf_counter()
+            results = [function(*argument) for argument in arguments]
+            elapsed = perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def bench_parsers(documents, repeat=BENCH_REPEAT, parsers=PARSERS):
+    """Throughput and recovered-field counts of each whole-document parser."""
+    report = {}
+    arguments = [(text,) for _, _, text in documents]
+    for name, parser in parsers.items():
+        seconds, results = time_calls(_safe(parser), arguments, repeat)
+        fields = Counter()
+        by_kind = defaultdict(list)
+        failed = 0
+        for (_, kind, _), parsed in zip(documents, results):
+            if parsed is None:
+                failed += 1
+                parsed = {}
+            found = [key for key, value in parsed.items() if recovered(value)]
+            fields.update(found)
+            by_kind[kind].append(len(found))
+        report[name] = {
+            "seconds": seconds,
+            "bodies_per_sec": len(documents) / seconds if seconds else 0.0,
+            "failed": failed,
+            "fields": dict(fields),
+            "fields_per_body": {kind: sum(counts) / len(counts) for kind, counts in sorted(by_kind.items())},
+        }
+    return report
+
+
+def bench_fields(documents, repeat=BENCH_REPEAT):
+    """Extraction time and recovered count of every registry field on its own, plus the two table parsers.
+
+    The header is tokenized once per document beforehand, as the shared
+    parsers do, and reported as its own row.
+    """
+    texts = [text for _, _, text in documents]
+    seconds, segments = time_calls(tokenize_header, [(text,) for text in texts], repeat)
+    report = {"(tokenize header)": {"seconds": seconds, "recovered": len(texts)}}
+    for name in FIELDS.names():
+        parser = FIELDS.parser([name])
+        seconds, results = time_calls(parser.parse, list(zip(texts, segments)), repeat)
+        report[name] = {"seconds": seconds, "recovered": sum(1 for parsed, _ in results if any(map(recovered, parsed.values())))}
+    for name, parser in TABLE_PARSERS.items():
+        seconds, results = time_calls(parser, [(text,) for text in texts], repeat)
+        report[name] = {"seconds": seconds, "recovered": sum(1 for table in results if len(table))}
+    return report
+
+
+def _safe(parser):
+    # A parser that raises on one document counts as recovering nothing there instead of ending the run
+    def call(text):
+        try:
+            return parser(text)
+        except Exception:
+            return None
+    return call
+
+
+def compare(result, baseline, tolerance=SPEED_TOLERANCE):
+    """Regressions of ``result`` against a saved ``baseline``: slower parsers and fields recovered less often."""
+    problems = []
+    if result["corpus"] != baseline.get("corpus"):
+        problems.append(f"corpus differs from the baseline ({baseline.get('corpus')}), so counts are not comparable")
+        return problems
+    for name, current in result["parsers"].items():
+        before = baseline["parsers"].get(name)
+        if before is None:
+            continue
+        if current["bodies_per_sec"] < before["bodies_per_sec"] * (1 - tolerance):
+            problems.append(f"{name}: {current['bodies_per_sec']:.1f} bodies/s, baseline {before['bodies_per_sec']:.1f}")
+        for field, count in before["fields"].items():
+            if current["fields"].get(field, 0) < count:
+                problems.append(f"{name}: {field} recovered {current['fields'].get(field, 0)} times, baseline {count}")
+    return problems
+
+
+def print_report(result, show_fields=False):
+    kinds = sorted({kind for report in result["parsers"].values() for kind in report["fields_per_body"]})
+    print(f"Corpus: {result['corpus']}")
+    print(f"{'parser':<10}{'bodies/s':>11}{'failed':>8}  " + "".join(f"{kind:>10}" for kind in kinds) + "   (fields per body)")
+    for name, report in result["parsers"].items():
+        per_kind = "".join(f"{report['fields_per_body'].get(kind, 0):>10.1f}" for kind in kinds)
+        print(f"{name:<10}{report['bodies_per_sec']:>11.1f}{report['failed']:>8}  {per_kind}")
+
+    documents = result["documents"]
+    print(f"\n{'field':<40}{'us/body':>10}{'recovered':>12}")
+    for name, report in sorted(result["fields"].items(), key=lambda item: -item[1]["seconds"]):
+        print(f"{name:<40}{report['seconds'] / documents * 1e6:>10.1f}{report['recovered']:>7} / {documents}")
+
+    if show_fields:
+        names = sorted({field for report in result["parsers"].values() for field in report["fields"]})
+        print(f"\n{'output field':<40}" + "".join(f"{name:>10}" for name in result["parsers"]))
+        for field in names:
+            print(f"{field:<40}" + "".join(f"{report['fields'].get(field, 0):>10}" for report in result["parsers"].values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time every Horizons parser over stored and synthetic responses and count the fields each recovers."
+    )
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="directory of saved responses, one body per .txt file")
+    parser.add_argument("--no-fixtures", action="store_true", help="leave the fixture directory out of the corpus")
+    parser.add_argument("--synthetic", type=int, default=200, help="synthetic bodies to add to the corpus")
+    parser.add_argument("--archive", type=int, default=0, help="stored bodies to add, re-read from the response archive")
+    parser.add_argument("--capture", metavar="DIR", help="write the --archive bodies to DIR as fixtures and exit")
+    parser.add_argument("--repeat", type=int, default=BENCH_REPEAT, help="passes per measurement; the fastest is reported")
+    parser.add_argument("--fields", action="store_true", help="also list how often each parser recovered each output field")
+    parser.add_argument("--save", help="write the results to this JSON file, for use as a baseline")
+    parser.add_argument("--compare", help="baseline JSON file; exits with status 1 on a speed or coverage regression")
+    args = parser.parse_args()
+
+    if args.capture:
+        if not args.archive:
+            parser.error("--capture needs --archive N")
+        for path in capture_fixtures(archived_documents(args.archive), args.capture):
+            print(f"Captured {path}")
+        return
+
+    documents = []
+    if not args.no_fixtures:
+        documents += fixture_documents(args.fixtures)
+    fixtures = len(documents)
+    documents += synthetic_documents(args.synthetic)
+    documents += archived_documents(args.archive) if args.archive else []
+    if not documents:
+        parser.error("the corpus is empty")
+
+    result = {
+        "corpus": f"{fixtures} fixtures, {args.synthetic} synthetic, {len(documents) - fixtures - args.synthetic} archived",
+        "documents": len(documents),
+        "parsers": bench_parsers(documents, args.repeat),
+        "fields": bench_fields(documents, args.repeat),
+    }
+    print_report(result, args.fields)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            problems = compare(result, json.load(handle))
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
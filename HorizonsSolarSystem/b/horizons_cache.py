@@ -0,0 +1,2 @@
+# Moved to horizons_core.cache; this module keeps the old import path working
+from horizons_core.cache import *  # noqa: F401,F403
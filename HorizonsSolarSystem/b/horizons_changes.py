@@ -0,0 +1,2 @@
+# Moved to horizons_core.changes; this module keeps the old import path working
+from horizons_core.changes import *  # noqa: F401,F403
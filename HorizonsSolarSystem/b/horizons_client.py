@@ -0,0 +1,2 @@
+# Moved to horizons_core.client; this module keeps the old import path working
+from horizons_core.client import *  # noqa: F401,F403
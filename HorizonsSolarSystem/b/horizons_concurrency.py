@@ -0,0 +1,2 @@
+# Moved to horizons_core.concurrency; this module keeps the old import path working
+from horizons_core.concurrency import *  # noqa: F401,F403
@@ -0,0 +1,26 @@
+"""Fetching and parsing of Horizons responses, without Django.
+
+Everything here works on response text and plain dicts, so parse workers
+and other tools can import it without configuring Django or loading the
+ORM. The HTTP client, response cache and concurrent fetcher live here
+too (``client``, ``cache``, ``fetch``); the old top-level modules such as
+``horizons_client`` only re-export them. The scripts build on these
+functions and reach the ORM through ``horizons_django.lazy_import()``
+handles, so Django is only set up once a path reads or writes
+``CelestialBody``.
+"""
+
+from horizons_core.client import (
+    HorizonsRequestError, fetch_celestial_data, fetch_oscillating_elements, fetch_profile, fetch_profile_condensed,
+    response_source, select_profiles, source_fields,
+)
+from horizons_core.elements import elements_at, load_element_table, parse_elements_table
+from horizons_core.fallback import FALLBACK_PROFILES, parse_fallback_responses, parse_jpl_horizons_object_fallback
+from horizons_core.mpcorb import (
+    decode_mpcorb, horizons_command, horizons_name, iter_mpcorb_chunks, mpcorb_body_types, mpcorb_elements, mpcorb_lines,
+    unpack_designation, unpack_epoch,
+)
+from horizons_core.ingest import INGEST_PROFILES, parse_celestial_data, parse_ingest_data, parse_oscillating_elements
+from horizons_core.objects import PARSE_PROFILES, parse_body_responses, parse_jpl_horizons_object
+from horizons_core.observer import parse_observer_table
+from horizons_core.probe import classify_response
@@ -0,0 +1,431 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# The cache and the archive live next to the scripts, outside the package
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CACHE_DIR = os.environ.get("HORIZONS_CACHE_DIR", os.path.join(PROJECT_DIR, "horizons_cache"))
+CACHE_TTL = float(os.environ.get("HORIZONS_CACHE_TTL", 7 * 24 * 3600))
+CACHE_MAX_BYTES = int(os.environ.get("HORIZONS_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+CACHE_ENABLED = os.environ.get("HORIZONS_CACHE", "on").lower() not in ("0", "off", "no", "false")
+
+ARCHIVE_NAME = "responses.arc"
+STREAM_CHUNK = 64 * 1024
+INDEX_NAME = "index.sqlite3"
+
+# Responses that stored rows were parsed from; kept apart from the cache because nothing here is evicted
+ARCHIVE_DIR = os.environ.get("HORIZONS_ARCHIVE_DIR", os.path.join(PROJECT_DIR, "horizons_sources"))
+
+
+def payload_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(url, params):
+    # Parameter order and value types must not change the key
+    canonical = json.dumps([url, sorted((str(k), str(v)) for k, v in params.items())])
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Raw Horizons responses stored zlib-compressed in one append-only archive.
+
+    The SQLite index maps request keys to payload digests, and digests to
+    (offset, length) in the archive, so identical payloads are stored once.
+    Entries expire after ``ttl`` seconds; once the archive grows past
+    ``max_bytes`` the least recently used entries are dropped and the
+    archive is compacted.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.archive_path = os.path.join(directory, ARCHIVE_NAME)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, INDEX_NAME), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+            CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                raw_length INTEGER NOT NULL
+            );
+            """
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url, params, ignore_ttl=False):
+        return self.get_by_key(cache_key(url, params), ignore_ttl=ignore_ttl)
+
+    def get_by_key(self, key, ignore_ttl=False):
+        now = time.time()
+        with self._lock:
+            located = self._locate(key, now, ignore_ttl)
+            payload = self._read_blob(*located) if located is not None else None
+            if payload is None:
+                if located is not None:
+                    # Archive was compacted underneath us or is damaged
+                    self._drop_payload(located[0])
+                self.misses += 1
+                return None
+            self.hits += 1
+        return payload.decode("utf-8", errors="replace")
+
+    def iter_lines(self, url, params, ignore_ttl=False):
+        key = cache_key(url, params)
+        with self._lock:
+            located = self._locate(key, time.time(), ignore_ttl)
+            # The blob is read and checked before any line is yielded, so a damaged entry is a miss, not an error mid-stream
+            blob = self._read_verified_blob(*located) if located is not None else None
+            if blob is None:
+                if located is not None:
+                    self._drop_payload(located[0])
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self._iter_blob_lines(blob)
+
+    def put(self, url, params, text):
+        raw = text.encode("utf-8")
+        key = cache_key(url, params)
+        self._store(key, hashlib.sha256(raw).hexdigest(), len(raw), lambda: zlib.compress(raw, 6))
+        return key
+
+    def writer(self, url, params):
+        return CacheWriter(self, cache_key(url, params))
+
+    def _locate(self, key, now, ignore_ttl):
+        row = self._db.execute(
+            "SELECT e.digest, e.created, b.offset, b.length FROM entries e "
+            "JOIN blobs b ON b.digest = e.digest WHERE e.key = ?",
+            (key,),
+        ).fetchone()
+        if row is None or (not ignore_ttl and now - row[1] > self.ttl):
+            return None
+        self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        digest, _, offset, length = row
+        return digest, offset, length
+
+    def _drop_payload(self, digest):
+        # Every entry sharing a bad payload goes with it, and so does the blob row, so the next put appends a fresh copy
+        self._db.execute("DELETE FROM entries WHERE digest = ?", (digest,))
+        self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+
+    def _store(self, key, digest, raw_length, compress):
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                known = self._db.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                if known is None:
+                    offset, length = self._append_blob(compress())
+                    self._db.execute(
+                        "INSERT INTO blobs (digest, offset, length, raw_length) VALUES (?, ?, ?, ?)",
+                        (digest, offset, length, raw_length),
+                    )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, digest, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, digest, now, now),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            if self._archive_size() > self.max_bytes:
+                self._evict(now)
+
+    def evict(self):
+        with self._lock:
+            self._evict(time.time())
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            blobs, live_bytes, raw_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(raw_length), 0) FROM blobs"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "payloads": blobs,
+            "live_bytes": live_bytes,
+            "uncompressed_bytes": raw_bytes,
+            "archive_bytes": self._archive_size(),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _archive_size(self):
+        try:
+            return os.path.getsize(self.archive_path)
+        except FileNotFoundError:
+            return 0
+
+    def _append_blob(self, blob):
+        # O_APPEND keeps concurrent writers from interleaving inside a record
+        fd = os.open(self.archive_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, blob)
+            end = os.lseek(fd, 0, os.SEEK_CUR)
+        finally:
+            os.close(fd)
+        return end - len(blob), len(blob)
+
+    def _read_blob(self, digest, offset, length):
+        try:
+            with open(self.archive_path, "rb") as archive:
+                archive.seek(offset)
+                payload = zlib.decompress(archive.read(length))
+        except (OSError, zlib.error):
+            return None
+        if hashlib.sha256(payload).hexdigest() != digest:
+            return None
+        return payload
+
+    def _read_verified_blob(self, digest, offset, length):
+        # Returns the compressed blob once it inflates to a payload with the expected digest
+        try:
+            with open(self.archive_path, "rb") as archive:
+                archive.seek(offset)
+                blob = archive.read(length)
+            decompressor = zlib.decompressobj()
+            hasher = hashlib.sha256()
+            for start in range(0, len(blob), STREAM_CHUNK):
+                hasher.update(decompressor.decompress(blob[start:start + STREAM_CHUNK]))
+            hasher.update(decompressor.flush())
+        except (OSError, zlib.error):
+            return None
+        if not decompressor.eof or hasher.hexdigest() != digest:
+            return None
+        return blob
+
+    def _iter_blob_lines(self, blob):
+        # Only the compressed blob is held in memory; lines are inflated chunk by chunk
+        decompressor = zlib.decompressobj()
+        pending = b""
+        for start in range(0, len(blob), STREAM_CHUNK):
+            data = decompressor.decompress(blob[start:start + STREAM_CHUNK])
+            *lines, pending = (pending + data).split(b"\n")
+            for line in lines:
+                yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+        pending += decompressor.flush()
+        if pending:
+            yield pending.rstrip(b"\r").decode("utf-8", errors="replace")
+
+    def _evict(self, now):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+            self._drop_orphan_blobs()
+            live = self._db.execute("SELECT COALESCE(SUM(length), 0) FROM blobs").fetchone()[0]
+            # Leave headroom so a full archive does not evict on every put
+            target = int(self.max_bytes * 0.8)
+            if live > target:
+                sizes = dict(self._db.execute("SELECT digest, length FROM blobs"))
+                refs = dict(self._db.execute("SELECT digest, COUNT(*) FROM entries GROUP BY digest"))
+                doomed = []
+                for key, digest in self._db.execute("SELECT key, digest FROM entries ORDER BY accessed").fetchall():
+                    if live <= target:
+                        break
+                    doomed.append((key,))
+                    refs[digest] -= 1
+                    if refs[digest] == 0:
+                        live -= sizes[digest]
+                self._db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+                self._drop_orphan_blobs()
+            self._compact()
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _drop_orphan_blobs(self):
+        self._db.execute("DELETE FROM blobs WHERE digest NOT IN (SELECT digest FROM entries)")
+
+    def _compact(self):
+        rows = self._db.execute("SELECT digest, offset, length FROM blobs ORDER BY offset").fetchall()
+        if sum(length for _, _, length in rows) >= self._archive_size():
+            return
+        tmp_path = self.archive_path + ".compact"
+        moved = []
+        with open(self.archive_path, "rb") as src, open(tmp_path, "wb") as dst:
+            for digest, offset, length in rows:
+                src.seek(offset)
+                moved.append((dst.tell(), digest))
+                dst.write(src.read(length))
+            dst.flush()
+            os.fsync(dst.fileno())
+        self._db.executemany("UPDATE blobs SET offset = ? WHERE digest = ?", moved)
+        os.replace(tmp_path, self.archive_path)
+
+
+class CacheWriter:
+    """Compresses a response body as it streams in and stores it once complete."""
+
+    def __init__(self, cache, key):
+        self.cache = cache
+        self.key = key
+        self._compressor = zlib.compressobj(6)
+        self._hasher = hashlib.sha256()
+        self._chunks = []
+        self._raw_length = 0
+
+    def write(self, data):
+        self._hasher.update(data)
+        self._raw_length += len(data)
+        self._chunks.append(self._compressor.compress(data))
+
+    def commit(self):
+        self._chunks.append(self._compressor.flush())
+        blob = b"".join(self._chunks)
+        self.cache._store(self.key, self._hasher.hexdigest(), self._raw_length, lambda: blob)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    global _default_cache
+    if not CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+    return _default_cache
+
+
+class SourceArchive(ResponseCache):
+    """Responses that stored rows were parsed from, keyed by the digest of their text.
+
+    Nothing here expires or is evicted, unlike the response cache, so the
+    ``source_responses`` of a row can always be replayed.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        super().__init__(directory, ttl=float("inf"), max_bytes=float("inf"))
+
+    def put_text(self, text):
+        raw = text.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        self._store(digest, digest, len(raw), lambda: zlib.compress(raw, 6))
+        return digest
+
+    def get_text(self, digest):
+        return self.get_by_key(digest, ignore_ttl=True)
+
+
+_source_archive = None
+
+
+def get_source_archive():
+    global _source_archive
+    with _default_cache_lock:
+        if _source_archive is None:
+            _source_archive = SourceArchive()
+    return _source_archive
+
+
+def source_text(ref):
+    """Text of one archived response named in ``source_responses``, or None if it is gone."""
+    text = get_source_archive().get_text(ref)
+    cache = get_default_cache()
+    if text is None and cache is not None:
+        # Rows stored before the source archive name response cache keys, which resolve only until the cache evicts them
+        text = cache.get_by_key(ref, ignore_ttl=True)
+    return text
+
+
+
+NEGATIVE_TTL = float(os.environ.get("HORIZONS_NEGATIVE_TTL", 30 * 24 * 3600))
+NEGATIVE_INDEX_NAME = "negative.sqlite3"
+
+
+class NegativeCache:
+    """Body IDs that Horizons answered with no match or an ambiguous match.
+
+    Entries expire after ``ttl`` seconds so IDs that are assigned later
+    (new moons, renumbered small bodies) get another look eventually.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=NEGATIVE_TTL):
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, NEGATIVE_INDEX_NAME), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS negative ("
+            "body_id TEXT PRIMARY KEY, reason TEXT NOT NULL, checked REAL NOT NULL)"
+        )
+
+    def add(self, body_id, reason):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO negative (body_id, reason, checked) VALUES (?, ?, ?)",
+                (str(body_id), reason, time.time()),
+            )
+
+    def discard(self, body_id):
+        with self._lock:
+            self._db.execute("DELETE FROM negative WHERE body_id = ?", (str(body_id),))
+
+    def __contains__(self, body_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM negative WHERE body_id = ? AND checked >= ?", (str(body_id), time.time() - self.ttl)
+            ).fetchone()
+        return row is not None
+
+    def ids(self):
+        with self._lock:
+            rows = self._db.execute("SELECT body_id FROM negative WHERE checked >= ?", (time.time() - self.ttl,))
+            return {body_id for body_id, in rows}
+
+    def filter(self, body_ids):
+        known = self.ids()
+        return (body_id for body_id in body_ids if str(body_id) not in known)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM negative")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_negative_cache = None
+
+
+def get_negative_cache():
+    global _negative_cache
+    with _default_cache_lock:
+        if _negative_cache is None:
+            _negative_cache = NegativeCache()
+    return _negative_cache
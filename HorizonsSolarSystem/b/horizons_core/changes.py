@@ -0,0 +1,70 @@
+import hashlib
+import json
+import re
+from datetime import date
+
+REVISED_PATTERN = re.compile(r"Revised:\s*(\w{3}\s+\d{1,2},\s+\d{4})")
+# Small-body headers carry the orbit solution date instead of a revision date
+SOLUTION_DATE_PATTERN = re.compile(r"Soln\.date:\s*(\S+)")
+
+# Parsed floats are compared at this many significant digits so formatting noise is not a change
+SIGNIFICANT_DIGITS = 12
+
+
+def revised_date(text):
+    match = REVISED_PATTERN.search(text or "") or SOLUTION_DATE_PATTERN.search(text or "")
+    return " ".join(match.group(1).split()) if match else ""
+
+
+def normalize_value(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, float):
+        return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.strip()
+    # Binary fields come back from some database backends as memoryview
+    if isinstance(value, memoryview):
+        return bytes(value)
+    # NumPy tables such as the observer ephemeris are compared by a hash of their raw bytes
+    if hasattr(value, "dtype") and hasattr(value, "tobytes"):
+        return hashlib.sha256(value.tobytes()).hexdigest()
+    return value
+
+
+def content_fingerprint(text, parsed_data):
+    """``<Revised: date>:<hash of the normalized parsed dict>`` for one body."""
+    normalized = {key: normalize_value(value) for key, value in parsed_data.items()}
+    digest = hashlib.sha256(json.dumps(normalized, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{revised_date(text)}:{digest[:32]}"
+
+
+def apply_parsed(instance, parsed_data, fingerprint):
+    """Copy parsed values that differ onto ``instance`` and return the changed field names.
+
+    An empty list means the stored fingerprint matches and nothing needs writing.
+    """
+    if instance.pk is not None and instance.content_fingerprint == fingerprint:
+        return []
+    changed = []
+    fields = {field.attname: field for field in instance._meta.concrete_fields}
+    for key, value in parsed_data.items():
+        field = fields.get(key)
+        if field is None or field.primary_key:
+            continue
+        if not _same_value(field, getattr(instance, key), value):
+            setattr(instance, key, value)
+            changed.append(key)
+    instance.content_fingerprint = fingerprint
+    changed.append("content_fingerprint")
+    return changed
+
+
+def _same_value(field, current, new):
+    try:
+        new = field.to_python(new)
+    except Exception:
+        return False
+    return normalize_value(current) == normalize_value(new)
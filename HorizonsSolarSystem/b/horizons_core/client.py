@@ -0,0 +1,323 @@
+import codecs
+import os
+import random
+import threading
+import time
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from horizons_core.cache import cache_key, get_default_cache, payload_digest
+from horizons_core.concurrency import AdaptiveLimiter, SingleFlight, format_snapshot
+from horizons_core.fetch import DEFAULT_CONCURRENCY
+from horizons_core.stream import condense_lines
+
+JPL_BASE_URL = "https://ssd.jpl.nasa.gov/api/horizons.api"
+# Point every fetch at another server, e.g. the local stand-in in horizons_stub_server.py
+BASE_URL = os.environ.get("HORIZONS_BASE_URL", JPL_BASE_URL)
+
+CONNECT_TIMEOUT = float(os.environ.get("HORIZONS_CONNECT_TIMEOUT", 10))
+READ_TIMEOUT = float(os.environ.get("HORIZONS_READ_TIMEOUT", 120))
+MAX_RETRIES = int(os.environ.get("HORIZONS_MAX_RETRIES", 5))
+ADAPTIVE_CONCURRENCY = os.environ.get("HORIZONS_ADAPTIVE", "on").lower() not in ("0", "off", "no", "false")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+STREAM_CHUNK = 64 * 1024
+
+
+def response_encoding(response):
+    # requests assumes ISO-8859-1 for text without a charset; Horizons answers in UTF-8
+    if "charset" in response.headers.get("Content-Type", "").lower() and response.encoding:
+        return response.encoding
+    return "utf-8"
+
+
+class HorizonsRequestError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class HorizonsClient:
+    """One pooled keep-alive session shared by every Horizons request.
+
+    Transient failures (connection errors, timeouts and the statuses in
+    ``RETRY_STATUSES``) are retried with full-jitter exponential backoff.
+    Successful responses are stored in the response cache when one is
+    configured, and an optional ``limiter`` gates how many requests are in
+    flight across all threads using the client. Concurrent ``get_text`` calls
+    with identical parameters are coalesced into one request.
+    """
+
+    def __init__(self, base_url=BASE_URL, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries=MAX_RETRIES,
+                 backoff=0.5, max_backoff=30.0, pool_size=DEFAULT_CONCURRENCY, cache=None, limiter=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cache = cache
+        self.limiter = limiter
+        self.flight = SingleFlight()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_text(self, params, refresh=False):
+        # Identical requests already in flight share one network call and one response string
+        return self.flight.do((cache_key(self.base_url, params), refresh), self._get_text, params, refresh)
+
+    def _get_text(self, params, refresh=False):
+        # With refresh the cached copy is skipped, and the fresh response replaces it
+        if self.cache is not None and not refresh:
+            text = self.cache.get(self.base_url, params)
+            if text is not None:
+                return text
+        response = self._request(params)
+        text = response.content.decode(response_encoding(response), errors="replace")
+        if self.cache is not None:
+            self.cache.put(self.base_url, params, text)
+        return text
+
+    def iter_lines(self, params, refresh=False):
+        if self.cache is not None and not refresh:
+            lines = self.cache.iter_lines(self.base_url, params)
+            if lines is not None:
+                yield from lines
+                return
+        response = self._request(params, stream=True)
+        writer = self.cache.writer(self.base_url, params) if self.cache is not None else None
+        decoder = codecs.getincrementaldecoder(response_encoding(response))(errors="replace")
+        pending = ""
+        try:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK):
+                text = decoder.decode(chunk)
+                if writer is not None:
+                    # The cache always holds UTF-8, so a hit decodes to the same text as this stream
+                    writer.write(text.encode("utf-8"))
+                *lines, pending = (pending + text).split("\n")
+                for line in lines:
+                    yield line.rstrip("\r")
+            tail = decoder.decode(b"", final=True)
+            if writer is not None and tail:
+                writer.write(tail.encode("utf-8"))
+            pending += tail
+            if pending:
+                yield pending.rstrip("\r")
+        finally:
+            response.close()
+        # Only complete bodies are cached; an abandoned or failed stream leaves no entry
+        if writer is not None:
+            writer.commit()
+
+    def _request(self, params, stream=False):
+        attempt = 0
+        while True:
+            try:
+                response = self._send(params, stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise HorizonsRequestError(f"Request failed after {attempt + 1} attempts: {e}") from e
+                self._sleep(attempt)
+            else:
+                if response.status_code == 200:
+                    return response
+                response.close()
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    raise HorizonsRequestError(
+                        f"Horizons returned HTTP {response.status_code}", status_code=response.status_code
+                    )
+                self._sleep(attempt, response.headers.get("Retry-After"))
+            attempt += 1
+
+    def _send(self, params, stream=False):
+        if self.limiter is None:
+            return self.session.get(self.base_url, params=params, timeout=self.timeout, stream=stream)
+        # For streamed bodies the slot is released once headers arrive
+        started = self.limiter.acquire()
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout, stream=stream)
+        except Exception:
+            self.limiter.release(started, failed=True)
+            raise
+        self.limiter.release(started, status=response.status_code)
+        return response
+
+    def _sleep(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        time.sleep(delay)
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+_condensed_flight = SingleFlight()
+
+
+def get_client():
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            limiter = AdaptiveLimiter() if ADAPTIVE_CONCURRENCY else None
+            _default_client = HorizonsClient(cache=get_default_cache(), limiter=limiter)
+    return _default_client
+
+
+def concurrency_report():
+    limiter = get_client().limiter
+    return format_snapshot(limiter.snapshot()) if limiter is not None else None
+
+
+OBSERVER_PARAMS = {
+    "format": "text",
+    "OBJ_DATA": "'YES'",
+    "MAKE_EPHEM": "'YES'",
+    "EPHEM_TYPE": "'OBSERVER'",
+    "CENTER": "'500@399'",
+    "START_TIME": "'2006-01-01'",
+    "STOP_TIME": "'2006-01-20'",
+    "STEP_SIZE": "'1 d'",
+    "QUANTITIES": "'1,9,20,23,24,29'"
+}
+
+ELEMENTS_PARAMS = {
+    "format": "text",
+    "EPHEM_TYPE": "ELEMENTS",
+    "CENTER": "'500@10'",
+    "START_TIME": "'2023-01-01'",
+    "STOP_TIME": "'2023-02-01'",
+    "STEP_SIZE": "'1 d'",
+    "MAKE_EPHEM": "YES",
+    "OUT_UNITS": "AU-D",
+    "REF_PLANE": "ECLIPTIC",
+    "REF_SYSTEM": "J2000",
+    "TP_TYPE": "ABSOLUTE",
+    "CSV_FORMAT": "NO",
+    "OBJ_DATA": "YES"
+}
+
+# Each profile lists the sections of a Horizons response it contains:
+#   physical          - the object data header (OBJ_DATA)
+#   observer_preamble - target/center geometry, EOP and cut-off lines of an OBSERVER ephemeris
+#   observer_table    - the $$SOE..$$EOE rows of the 20-day OBSERVER ephemeris
+#   elements          - the osculating elements table
+# "cost" is a rough response size in bytes, used to pick the cheapest profiles.
+QUERY_PROFILES = {
+    "header": {
+        "params": {"format": "text", "OBJ_DATA": "'YES'", "MAKE_EPHEM": "'NO'"},
+        "covers": {"physical"},
+        "cost": 3000,
+    },
+    "observer_summary": {
+        "params": dict(OBSERVER_PARAMS, STOP_TIME="'2006-01-02'", QUANTITIES="'1'"),
+        "covers": {"physical", "observer_preamble"},
+        "cost": 5500,
+    },
+    "observer": {
+        "params": OBSERVER_PARAMS,
+        "covers": {"physical", "observer_preamble", "observer_table"},
+        "cost": 9000,
+    },
+    "elements": {
+        "params": dict(ELEMENTS_PARAMS, OBJ_DATA="NO"),
+        "covers": {"elements"},
+        "cost": 9000,
+    },
+    "elements_header": {
+        "params": ELEMENTS_PARAMS,
+        "covers": {"physical", "elements"},
+        "cost": 12000,
+    },
+}
+
+# Latency of an extra round trip, expressed in bytes so it can be added to profile costs
+REQUEST_COST = 4000
+
+
+def profile_params(body_id, profile):
+    return dict(QUERY_PROFILES[profile]["params"], COMMAND=f"'{body_id}'")
+
+
+def response_source(profiles, texts):
+    """``profile:digest`` pairs naming the responses a row is parsed from, as kept in the source archive."""
+    return ",".join(f"{profile}:{payload_digest(text)}" for profile, text in zip(profiles, texts))
+
+
+def source_fields(profiles, texts):
+    """``source_responses``, naming each profile's response by digest, plus ``source_texts``, the responses themselves.
+
+    With ``source_parser`` this lets a row be re-parsed later from the
+    archived responses alone. Callers add these after taking the content
+    fingerprint, since the digests change with every response timestamp.
+    The texts are not a model field: they ride along to the writer, which
+    archives them once the row is written.
+    """
+    return {'source_responses': response_source(profiles, texts), 'source_texts': list(texts)}
+
+
+def parse_response_source(source):
+    return [tuple(pair.split(":", 1)) for pair in (source or "").split(",") if pair]
+
+
+def select_profiles(groups):
+    groups = set(groups)
+    names = list(QUERY_PROFILES)
+    best, best_cost = None, None
+    for mask in range(1, 1 << len(names)):
+        chosen = [name for bit, name in enumerate(names) if mask & (1 << bit)]
+        covered = set().union(*(QUERY_PROFILES[name]["covers"] for name in chosen))
+        if not groups <= covered:
+            continue
+        cost = sum(QUERY_PROFILES[name]["cost"] + REQUEST_COST for name in chosen)
+        if best_cost is None or cost < best_cost:
+            best, best_cost = chosen, cost
+    if best is None:
+        raise ValueError(f"No query profile covers {sorted(groups)}")
+    return tuple(best)
+
+
+def fetch_profile(body_id, profile, refresh=False):
+    return get_client().get_text(profile_params(body_id, profile), refresh)
+
+
+def fetch_profile_condensed(body_id, profile, table_rows=0, refresh=False):
+    # A stream cannot be shared, so coalescing happens on the condensed text
+    return _condensed_flight.do(
+        (str(body_id), profile, table_rows, refresh), _fetch_profile_condensed, body_id, profile, table_rows, refresh
+    )
+
+
+def _fetch_profile_condensed(body_id, profile, table_rows, refresh):
+    lines = get_client().iter_lines(profile_params(body_id, profile), refresh)
+    return condense_lines(lines, table_rows)
+
+
+def profile_fetchers(profiles, table_rows=None, refresh=False):
+    # With table_rows set, responses are streamed and only that many table rows are kept;
+    # with refresh, cached responses are skipped and replaced
+    if table_rows is None:
+        return tuple(partial(fetch_profile, profile=profile, refresh=refresh) for profile in profiles)
+    return tuple(
+        partial(fetch_profile_condensed, profile=profile, table_rows=table_rows, refresh=refresh) for profile in profiles
+    )
+
+
+def texts_covering(profiles, texts, group):
+    return "\n".join(text for profile, text in zip(profiles, texts) if group in QUERY_PROFILES[profile]["covers"])
+
+
+def fetch_celestial_data(body_id):
+    return fetch_profile(body_id, "observer")
+
+
+def fetch_oscillating_elements(body_id):
+    return fetch_profile(body_id, "elements_header")
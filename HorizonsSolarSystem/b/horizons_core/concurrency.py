@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+from collections import deque
+
+THROTTLE_STATUSES = {429, 503}
+
+MIN_CONCURRENCY = int(os.environ.get("HORIZONS_MIN_CONCURRENCY", 1))
+MAX_CONCURRENCY = int(os.environ.get("HORIZONS_MAX_CONCURRENCY", 64))
+INITIAL_CONCURRENCY = int(os.environ.get("HORIZONS_INITIAL_CONCURRENCY", 4))
+
+
+class AdaptiveLimiter:
+    """AIMD limit on the number of Horizons requests in flight.
+
+    Every healthy response grows the limit by ``increase / limit``, i.e. by
+    ``increase`` per full window of requests. A throttling status (429/503),
+    an error rate above ``max_error_rate`` or a smoothed latency above
+    ``latency_tolerance`` times the recent best latency multiplies the limit
+    by ``decrease``. Decreases are spaced at least one smoothed latency
+    apart so a burst of failures from one window only backs off once.
+    """
+
+    def __init__(self, initial=INITIAL_CONCURRENCY, minimum=MIN_CONCURRENCY, maximum=MAX_CONCURRENCY,
+                 increase=1.0, decrease=0.5, latency_tolerance=2.5, max_error_rate=0.2, window=100):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.latency_ewma = None
+        self._recent = deque(maxlen=window)
+        self._latencies = deque(maxlen=window)
+        self._last_decrease = 0.0
+        self._started = time.monotonic()
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, started, status=None, failed=False):
+        now = time.monotonic()
+        latency = now - started
+        with self._condition:
+            self.in_flight -= 1
+            self.requests += 1
+            throttled = status in THROTTLE_STATUSES
+            failed = failed or throttled or (status is not None and status >= 500)
+            self.throttled += throttled
+            self.errors += failed
+            self._recent.append((now, failed))
+            if not failed:
+                self._latencies.append(latency)
+                self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+
+            if throttled or self._error_rate() > self.max_error_rate or self._latency_spike():
+                self._back_off(now)
+            elif not failed:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            self._condition.notify_all()
+
+    def snapshot(self):
+        with self._condition:
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "errors": self.errors,
+                "error_rate": self._error_rate(),
+                "requests_per_second": self._request_rate(elapsed),
+                "latency_ewma": self.latency_ewma,
+                "latency_best": min(self._latencies) if self._latencies else None,
+            }
+
+    def _back_off(self, now):
+        if self.latency_ewma is not None and now - self._last_decrease < self.latency_ewma:
+            return
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self._last_decrease = now
+
+    def _error_rate(self):
+        if not self._recent:
+            return 0.0
+        return sum(failed for _, failed in self._recent) / len(self._recent)
+
+    def _latency_spike(self):
+        # Needs a few samples before the best-seen latency means anything
+        if self.latency_ewma is None or len(self._latencies) < 10:
+            return False
+        return self.latency_ewma > self.latency_tolerance * min(self._latencies)
+
+    def _request_rate(self, elapsed):
+        if len(self._recent) < 2:
+            return self.requests / elapsed
+        span = self._recent[-1][0] - self._recent[0][0]
+        return (len(self._recent) - 1) / span if span > 0 else self.requests / elapsed
+
+
+def format_snapshot(snapshot):
+    latency = snapshot["latency_ewma"]
+    return (
+        f"limit={snapshot['limit']} in_flight={snapshot['in_flight']} "
+        f"rate={snapshot['requests_per_second']:.1f} req/s "
+        f"latency={'n/a' if latency is None else f'{latency:.2f}s'} "
+        f"errors={snapshot['error_rate']:.0%} throttled={snapshot['throttled']}"
+    )
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in
+    flight block and receive the same result object, or the same exception.
+    Nothing is remembered once the call finishes, so a later call runs again.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executed += 1
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn(*args, **kwargs)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
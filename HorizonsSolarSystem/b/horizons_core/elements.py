@@ -0,0 +1,142 @@
+import itertools
+import math
+import re
+
+import numpy as np
+
+from horizons_core.header import table_sections
+
+# One row per epoch of an ELEMENTS table, in the order Horizons prints each record
+ELEMENT_COLUMNS = ('jd', 'ec', 'qr', 'in', 'om', 'w', 'tp', 'n', 'ma', 'ta', 'a', 'ad', 'pr')
+ELEMENT_DTYPE = np.dtype([(column, '<f8') for column in ELEMENT_COLUMNS])
+
+# Whitespace tokens of one record as Horizons prints it: "#" marks a value, None a calendar token
+# that is not read, and anything else a key that must appear at that position in every record
+RECORD_TOKENS = (
+    '#', '=', None, None, None, None,
+    'EC=', '#', 'QR=', '#', 'IN=', '#',
+    'OM=', '#', 'W', '=', '#', 'Tp=', '#',
+    'N', '=', '#', 'MA=', '#', 'TA=', '#',
+    'A', '=', '#', 'AD=', '#', 'PR=', '#',
+)
+VALUE_TOKENS = [position for position, token in enumerate(RECORD_TOKENS) if token == '#']
+KEY_TOKENS = [(position, token) for position, token in enumerate(RECORD_TOKENS) if token not in ('#', None)]
+
+# "2459945.500000000 = A.D. 2023-Jan-01 00:00:00.0000 TDB" starts each record
+RECORD_EPOCH = re.compile(r'^\s*(\d+\.\d*)\s*=', re.MULTILINE)
+ELEMENT_PAIR = re.compile(r'([A-Za-z]+)\s*=\s*(\S+)')
+
+# Newton iterations for Kepler's equation; enough for double precision below e = 0.99
+KEPLER_ITERATIONS = 12
+
+
+def parse_elements_table(text):
+    """Every record of the ``$$SOE``/``$$EOE`` elements tables in ``text`` as an ``ELEMENT_DTYPE`` array.
+
+    The tables are split on whitespace once and every record is checked
+    against the key layout of ``RECORD_TOKENS`` with list slices; the value
+    tokens are then converted by a single ``np.fromstring`` call, column by
+    column. Tables that do not follow the layout (a negative value running
+    into its key, an unexpected key) are parsed record by record instead,
+    with missing values left as NaN.
+    """
+    # Observer tables in the same text are left out; an elements table starts with a JD record
+    table = "\n".join(section for section in table_sections(text) if RECORD_EPOCH.match(section))
+    tokens = table.split()
+    width = len(RECORD_TOKENS)
+    count = len(tokens) // width
+    if not count:
+        return _parse_records(table)
+    if len(tokens) == count * width and all(tokens[position::width] == [token] * count for position, token in KEY_TOKENS):
+        columns = " ".join(itertools.chain.from_iterable(tokens[position::width] for position in VALUE_TOKENS))
+        try:
+            grid = np.fromstring(columns, sep=" ").reshape(len(VALUE_TOKENS), count)
+        except ValueError:
+            pass
+        else:
+            elements = np.empty(count, dtype=ELEMENT_DTYPE)
+            for column, values in zip(ELEMENT_COLUMNS, grid):
+                elements[column] = values
+            return elements
+    return _parse_records(table)
+
+
+def _parse_records(table):
+    # Tolerant path: each record is read on its own and unknown or unreadable values are skipped
+    starts = list(RECORD_EPOCH.finditer(table))
+    elements = np.full(len(starts), np.nan, dtype=ELEMENT_DTYPE)
+    for index, start in enumerate(starts):
+        end = starts[index + 1].start() if index + 1 < len(starts) else len(table)
+        elements['jd'][index] = float(start.group(1))
+        for key, value in ELEMENT_PAIR.findall(table, start.end(), end):
+            column = key.lower()
+            if column in ELEMENT_DTYPE.names and column != 'jd':
+                try:
+                    elements[column][index] = float(value)
+                except ValueError:
+                    pass
+    return elements
+
+
+def pack_element_table(elements):
+    return elements.tobytes() if len(elements) else None
+
+
+def load_element_table(data):
+    if not data:
+        return np.zeros(0, dtype=ELEMENT_DTYPE)
+    return np.frombuffer(bytes(data), dtype=ELEMENT_DTYPE)
+
+
+def element_columns(elements):
+    """Model field columns for an ``ELEMENT_DTYPE`` array; the longitudes are derived from the node, argument and anomaly."""
+    longitude_of_periapsis = elements['om'] + elements['w']
+    return {
+        'epoch': elements['jd'],
+        'eccentricity': elements['ec'],
+        'perihelion_distance': elements['qr'],
+        'inclination': elements['in'],
+        'longitude_of_ascending_node': elements['om'],
+        'argument_of_perihelion': elements['w'],
+        'time_of_perihelion_passage': elements['tp'],
+        'mean_motion': elements['n'],
+        'semi_major_axis': elements['a'],
+        'aphelion_distance': elements['ad'],
+        'orbital_period': elements['pr'] / 365.25,  # Convert days to years
+        'mean_longitude': (elements['ma'] + longitude_of_periapsis) % 360,
+        'longitude_of_periapsis': longitude_of_periapsis % 360,
+    }
+
+
+def element_fields(record):
+    """Model fields for one element record, leaving out the ones that are NaN."""
+    columns = element_columns(np.asarray(record).reshape(1))
+    return {field: float(values[0]) for field, values in columns.items() if not math.isnan(values[0])}
+
+
+def elements_at(elements, jd):
+    """Elements at Julian day(s) ``jd``, propagated from the nearest epoch in ``elements``.
+
+    The nearest osculating record is advanced along its Kepler orbit: the
+    mean anomaly moves by ``n`` degrees per day and the true anomaly is
+    solved from it. Hyperbolic and parabolic records keep the mean anomaly
+    but get a NaN true anomaly. Returns an ``ELEMENT_DTYPE`` array with one
+    row per requested time, whose ``jd`` is the requested time.
+    """
+    if not len(elements):
+        raise ValueError("No element records to propagate from")
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    nearest = np.abs(jd[:, None] - elements['jd'][None, :]).argmin(axis=1)
+    result = elements[nearest].copy()
+    result['ma'] = (result['ma'] + result['n'] * (jd - result['jd'])) % 360
+    result['jd'] = jd
+    elliptic = result['ec'] < 1
+    e = np.where(elliptic, result['ec'], 0.0)
+    mean_anomaly = np.radians(result['ma'])
+    # Kepler's equation M = E - e sin E by Newton's method, started at pi for eccentric orbits
+    eccentric_anomaly = np.where(e > 0.8, np.pi, mean_anomaly)
+    for _ in range(KEPLER_ITERATIONS):
+        eccentric_anomaly = eccentric_anomaly - (eccentric_anomaly - e * np.sin(eccentric_anomaly) - mean_anomaly) / (1 - e * np.cos(eccentric_anomaly))
+    true_anomaly = 2 * np.arctan2(np.sqrt(1 + e) * np.sin(eccentric_anomaly / 2), np.sqrt(1 - e) * np.cos(eccentric_anomaly / 2))
+    result['ta'] = np.where(elliptic, np.degrees(true_anomaly) % 360, np.nan)
+    return result
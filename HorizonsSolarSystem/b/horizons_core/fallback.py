@@ -0,0 +1,37 @@
+from horizons_core.changes import content_fingerprint
+from horizons_core.client import source_fields
+from horizons_core.fields import FIELDS
+from horizons_core.observer import parse_observer_table
+
+# Profiles fetched by fetch_celestial_data and fetch_oscillating_elements, in that order
+FALLBACK_PROFILES = ("observer", "elements_header")
+
+FALLBACK_FIELDS = FIELDS.parser([
+    'name', 'vol_mean_radius', 'density', 'mass', 'flattening', 'volume', 'equatorial_radius', 'sidereal_rot_period',
+    'sid_rot_rate', 'mean_solar_day', 'polar_gravity', 'core_radius', 'equatorial_gravity', 'geometric_albedo',
+])
+
+def parse_jpl_horizons_object_fallback(data):
+    result, served = FALLBACK_FIELDS.parse(data)
+    result['fallback_fields'] = FALLBACK_FIELDS.fallback_fields(served)
+    
+    # Determine body type (this is a simplification, you may need to refine this logic)
+    if 'Mars' in result.get('name', ''):
+        result['body_type'] = 'planet'
+    else:
+        result['body_type'] = 'unknown'
+    
+    return result
+
+def parse_fallback_responses(body_id, responses, source=None):
+    combined_data = "\n".join(responses)
+    parsed_data = parse_jpl_horizons_object_fallback(combined_data)
+    parsed_data['horizons_id'] = str(body_id)
+    parsed_data['source_parser'] = "fallback"
+    # The observer profile's table rows are stored as ObserverEphemeris rows once the body is saved
+    observer_table = parse_observer_table(combined_data)
+    if len(observer_table):
+        parsed_data['observer_ephemeris'] = observer_table
+    fingerprint = content_fingerprint(combined_data, parsed_data)
+    parsed_data.update(source_fields(FALLBACK_PROFILES, responses) if source is None else {'source_responses': source})
+    return parsed_data, fingerprint
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from horizons_core.concurrency import MAX_CONCURRENCY
+
+# Upper bound on workers; the client's adaptive limiter decides how many requests are actually in flight
+DEFAULT_CONCURRENCY = int(os.environ.get("HORIZONS_CONCURRENCY", MAX_CONCURRENCY))
+
+_DONE = object()
+
+
+async def _fetch_bodies(body_ids, fetchers, concurrency, executor, emit, stop):
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Semaphore(concurrency)
+    pending_ids = iter(body_ids)
+
+    async def fetch_one(fetcher, body_id):
+        async with in_flight:
+            return await loop.run_in_executor(executor, fetcher, body_id)
+
+    async def worker():
+        # All workers share one iterator; the event loop thread is the only consumer
+        for body_id in pending_ids:
+            if stop.is_set():
+                return
+            try:
+                results = await asyncio.gather(*(fetch_one(fetcher, body_id) for fetcher in fetchers))
+            except Exception as e:
+                await loop.run_in_executor(None, emit, (body_id, None, e))
+            else:
+                await loop.run_in_executor(None, emit, (body_id, results, None))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def iter_fetch_range(body_ids, fetchers, concurrency=DEFAULT_CONCURRENCY):
+    """Fetch every body with all ``fetchers`` concurrently, yielding as each body completes.
+
+    Yields ``(body_id, results, error)`` where ``results`` holds one response
+    per fetcher in order. The event loop runs in a background thread so the
+    caller stays synchronous and can safely use the Django ORM.
+    """
+    concurrency = max(1, int(concurrency))
+    results = queue.Queue(maxsize=concurrency * 2)
+    stop = threading.Event()
+    failure = []
+
+    def run():
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                asyncio.run(_fetch_bodies(body_ids, fetchers, concurrency, executor, results.put, stop))
+        except Exception as e:
+            failure.append(e)
+        finally:
+            results.put(_DONE)
+
+    thread = threading.Thread(target=run, name="horizons-fetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            yield item
+        if failure:
+            raise failure[0]
+    finally:
+        stop.set()
+        # Unblock workers waiting on a full queue so the thread can exit
+        while thread.is_alive():
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
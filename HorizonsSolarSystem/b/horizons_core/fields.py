@@ -0,0 +1,406 @@
+import re
+from datetime import datetime
+
+from horizons_core.header import HeaderExtractor, as_float, as_floats, as_power_of_ten, as_stripped_text, as_text, tokenize_header
+
+STRICT = "strict"
+FALLBACK = "fallback"
+
+NUMBER = r'([\d.]+)'
+# Small-body headers and the elements table print numbers in E notation
+SCIENTIFIC = r'([-\d.]+(?:E[-+]?\d+)?)'
+# The Moon and some satellites print rates as "2.6617x10^-6"
+SCALED = r'([-\d.]+(?:E[-+]?\d+)?)(?:\s*x\s*10\^([-+]?\d+))?'
+THREE_NUMBERS = r'([-\d.]+),\s+([-\d.]+),\s+([-\d.]+)'
+CUTOFFS = r'Table cut-offs \d+\s*:'
+
+GRAVITATIONAL_CONSTANT = 6.67430e-11  # m^3 kg^-1 s^-2
+
+
+def small_body_key(name):
+    # Short keys such as "W=" or "H=" must not match the end of a longer key
+    return rf'(?<![\w.]){name}='
+
+
+class FieldRegistry:
+    """Every header field the parsers know, each defined once in the model's units.
+
+    A field has up to two tiers of rules, the second tried only for the
+    fields the first left empty:
+
+    ``strict``
+        ``(label, value, convert)`` rules for the layouts Horizons prints
+        today, matched case-sensitively against ``tokenize_header`` segments.
+    ``fallback``
+        Tolerant ``(label, value, convert)`` rules for older or unusual
+        layouts, matched case-insensitively against the same segments.
+
+    ``outputs`` lists the keys a field's converters can produce, so callers
+    can default missing ones to ``None``.
+    """
+
+    def __init__(self):
+        self._fields = {}
+
+    def add(self, name, strict=(), fallback=(), outputs=None):
+        self._fields[name] = (list(strict), list(fallback), tuple(outputs or (name,)))
+
+    def names(self):
+        return list(self._fields)
+
+    def parser(self, names):
+        return FieldParser([(name, *self._fields[name]) for name in names])
+
+
+class FieldParser:
+    """A selection of registry fields with their tiers compiled for repeated use."""
+
+    def __init__(self, fields):
+        self.fields = [name for name, *_ in fields]
+        self.outputs = {name: outputs for name, _, _, outputs in fields}
+        self._strict = HeaderExtractor([(name, strict) for name, strict, _, _ in fields if strict])
+        self._fallback = HeaderExtractor([(name, fallback) for name, _, fallback, _ in fields if fallback], re.IGNORECASE)
+
+    def parse(self, text, segments=None):
+        """``(parsed, served)``: the parsed values and the tier that served each field found."""
+        if segments is None:
+            segments = tokenize_header(text)
+        found = self._strict.extract_fields(segments)
+        served = dict.fromkeys(found, STRICT)
+        missing = [name for name in self.fields if name not in found]
+        # The common layouts fill most fields, so the tolerant rules only look for what is left
+        if missing:
+            for name, converted in self._fallback.extract_fields(segments, set(missing)).items():
+                found[name] = converted
+                served[name] = FALLBACK
+        parsed = {}
+        for name in self.fields:
+            if name in found:
+                parsed.update(found[name])
+        return parsed, served
+
+    def defaults(self, optional=()):
+        """Output keys of every field outside ``optional``, for callers that store missing values as ``None``."""
+        return tuple(key for name in self.fields if name not in optional for key in self.outputs[name])
+
+    def fallback_fields(self, served):
+        return ",".join(name for name in self.fields if served.get(name) == FALLBACK)
+
+
+def parse_date(date_string):
+    date_string = date_string.replace("DATA-BASED ", "").strip()
+    try:
+        date = datetime.strptime(date_string, "%Y-%b-%d")
+        return date.strftime("%Y-%m-%d")
+    except ValueError:
+        try:
+            date = datetime.strptime(date_string, "%Y-%m-%d")
+            return date.strftime("%Y-%m-%d")
+        except ValueError:
+            print(f"Unable to parse date: {date_string}")
+            return None
+
+
+def in_units(factors, default=1.0):
+    # ``<number> <unit>`` values, scaled by the factor for the unit; a missing or unknown unit uses ``default``
+    def convert(field, label_match, value_match):
+        unit = value_match.group(2) if value_match.re.groups > 1 else None
+        return {field: float(value_match.group(1)) * factors.get((unit or "").lower(), default)}
+    return convert
+
+
+HOURS = in_units({'d': 24, 's': 1 / 3600})
+SECONDS = in_units({'d': 86400, 'h': 3600, 'hr': 3600})
+YEARS = in_units({'d': 1 / 365.25})
+DAYS = in_units({'y': 365.25})
+
+
+def _scaled(field, label_match, value_match):
+    exponent = value_match.group(2)
+    return {field: float(value_match.group(1)) * (10 ** int(exponent) if exponent else 1)}
+
+
+def _with_uncertainty(field, label_match, value_match):
+    parsed = {field: float(value_match.group(1))}
+    if value_match.re.groups > 1 and value_match.group(2):
+        parsed[f'{field}_uncertainty'] = float(value_match.group(2))
+    return parsed
+
+
+def _revised_name(field, label_match, value_match):
+    return {field: value_match.group(2).strip()}
+
+
+def _density(field, label_match, value_match):
+    # "3.933(5+-4)" is 3.9335 +- 0.0004: the bracket extends the printed value by one more digit
+    parsed = {field: float(value_match.group(1))}
+    if value_match.group(2):
+        _, _, decimals = value_match.group(1).partition('.')
+        parsed[f'{field}_uncertainty'] = float(value_match.group(3)) * 10**-(len(decimals) + len(value_match.group(2)))
+    return parsed
+
+
+def _mass(field, label_match, value_match):
+    # Stored in 10^23 kg whatever exponent the label gives
+    scale = 10 ** (int(label_match.group(1) or 23) - 23)
+    parsed = {field: float(value_match.group(1)) * scale}
+    if value_match.group(2):
+        parsed[f'{field}_uncertainty'] = float(value_match.group(2)) * scale
+    return parsed
+
+
+def _mass_from_gm(field, label_match, value_match):
+    # GM is in km^3/s^2
+    return {field: float(value_match.group(1)) * 1e9 / GRAVITATIONAL_CONSTANT / 1e23}
+
+
+def _flattening(field, label_match, value_match):
+    flattening = float(value_match.group(1))
+    return {field: 1 / flattening if flattening > 1 else flattening}
+
+
+def _flattening_from_inertia(field, label_match, value_match):
+    moment_of_inertia = float(value_match.group(1))
+    return {field: 1 - (5/2) * (1 - moment_of_inertia / 0.4)}  # Assuming a perfect sphere has I = 0.4MR^2
+
+
+def _volume(field, label_match, value_match):
+    mantissa = float(value_match.group(1))
+    if value_match.group(2):  # If exponent is present, convert to 10^10 km^3
+        return {field: mantissa * (10 ** (int(value_match.group(2)) - 10))}
+    return {field: mantissa}
+
+
+def _eop_coverage(field, label_match, value_match):
+    return {'eop_coverage_start': parse_date(value_match.group(1)), 'eop_coverage_end': parse_date(value_match.group(2))}
+
+
+def _eop_predict(field, label_match, value_match):
+    return {field: parse_date(value_match.group(1))}
+
+
+FIELDS = FieldRegistry()
+
+FIELDS.add('name',
+    strict=[
+        # A numbered body without a name keeps its designation, "4179 (1989 AC)", as horizons_mpcorb names it
+        (r'Target body name:', r'(\d+ \([^)]+\))(?:\s|$)', as_text),
+        (r'Target body name:', r'(.+?) \(', as_text),
+    ],
+    fallback=[
+        (r'Target body name:', r'(.+?)\s*\(.*?\)', as_stripped_text),
+        # Comets and bodies known only by a designation print no "(id)": "1P/Halley  {source: JPL#J863/77}"
+        (r'Target body name:', r'(.+?)\s*(?:\{source:.*)?$', as_stripped_text),
+        (r'Revised:', r'.*?(\w+)\s+\d+,\s+\d+\s+(.*?)\s+(\d+)', _revised_name),
+        (r'Horizons> Designation:', r'(.*)', as_stripped_text),
+    ])
+
+# Physical characteristics
+FIELDS.add('vol_mean_radius',
+    strict=[(r'Vol\. mean radius \(km\)\s*=', r'([\d.]+)(?:\+-?([\d.]+))?', _with_uncertainty)],
+    fallback=[
+        (r'Vol\.\s*Mean\s*Radius\s*\(km\)\s*=', r'([\d.]+)(?:\s*\+-\s*([\d.]+))?', _with_uncertainty),
+        (r'Vol\.\s*mean\s*radius,\s*km\s*=', r'([\d.]+)(?:\s*\+-\s*([\d.]+))?', _with_uncertainty),
+        (r'Target radii\s*:', r'([\d.]+)\s*km', _with_uncertainty),
+        (small_body_key('RAD'), NUMBER, as_float),
+    ],
+    outputs=('vol_mean_radius', 'vol_mean_radius_uncertainty'))
+FIELDS.add('density',
+    strict=[(r'Density \(g/cm\^3\)\s*=', r'([\d.]+)(?:\((\d+)\+-(\d+)\))?', _density)],
+    fallback=[
+        (r'Density\s*\(g\/cm\^3\)\s*=', r'([\d.]+)(?:\((\d+)\+-(\d+)\))?', _density),
+        (r'Density,\s*g\/cm\^3\s*=', NUMBER, as_float),
+        (r'Density\s*\(g\s*cm\^-3\)\s*=', r'([\d.]+)(?:\s*\+-\s*([\d.]+))?', _with_uncertainty),
+    ],
+    outputs=('density', 'density_uncertainty'))
+FIELDS.add('mass',
+    strict=[(r'Mass x10\^(\d+) \(kg\)\s*=', r'([\d.]+)(?:\+-\s*([\d.]+))?', _mass)],
+    fallback=[
+        (r'Mass\s*(?:x\s*10\^(\d+))?\s*\(kg\)\s*=', r'([\d.]+)(?:\s*\+-\s*([\d.]+))?', _mass),
+        (r'Mass\s*\(10\^(\d+)\s*kg\)\s*=', r'([\d.]+)(?:\s*\+-\s*([\d.]+))?', _mass),
+        (r'Mass,\s*x\s*10\^(\d+)\s*kg\s*=', r'([\d.]+)(?:\s*\+-\s*([\d.]+))?', _mass),
+        (small_body_key('GM'), SCIENTIFIC, _mass_from_gm),
+    ],
+    outputs=('mass', 'mass_uncertainty'))
+FIELDS.add('flattening',
+    strict=[(r'Flattening, f\s*=', r'1/([\d.]+)', _flattening)],
+    fallback=[
+        (r'Flattening(?:,\s*f)?\s*=', r'(?:1\/)?([\d.]+)', _flattening),
+        (r'Mom\.\s*of\s*Inertia\s*=', NUMBER, _flattening_from_inertia),
+    ])
+FIELDS.add('volume',
+    strict=[(r'Volume \(x10\^10 km\^3\)\s*=', NUMBER, as_float)],
+    fallback=[(r'Volume(?:,\s*km\^3|(?:\s*\(x10\^(?:\d+)\s*km\^3\)))\s*=', r'([\d.]+)(?:\s*x\s*10\^(\d+))?', _volume)])
+FIELDS.add('equatorial_radius',
+    strict=[(r'Equatorial radius \(km\)\s*=', NUMBER, as_float)],
+    fallback=[
+        (r'Equ\.\s*radius,\s*km\s*=', NUMBER, as_float),
+        (r'Equ(?:atorial|\.)\s*radius,\s*Re\s*(?:\(km\))?\s*=', r'([\d.]+)', as_float),
+        (r'Target radii\s*:', r'([\d.]+)\s*km', as_float),
+    ])
+FIELDS.add('sidereal_rot_period',
+    strict=[(r'Sidereal rot\. period\s*=', r'([\d.]+)\s*(hr|h|d|s)?\b', HOURS)],
+    fallback=[
+        (r'Sid(?:ereal|\.)\s*rot\.\s*period\s*(?:\(hrs\))?\s*=', r'([\d.]+)\s*(hr|h|d|s)?\b', HOURS),
+        (r'Mean\s*sidereal\s*day,\s*hr\s*=', NUMBER, as_float),
+        (small_body_key('ROTPER'), NUMBER, as_float),
+    ])
+FIELDS.add('sid_rot_rate',
+    strict=[(r'Sid\. rot\. rate, rad/s\s*=', SCALED, _scaled)],
+    fallback=[
+        (r'Sid\.\s*rot\.\s*rate,\s*rad\/s\s*=', SCALED, _scaled),
+        (r'Rot\.\s*Rate\s*\(rad\/s\)\s*=', SCALED, _scaled),
+        (r'Sid\.\s*rot\.\s*rate\s*\(rad\/s\)\s*=', SCALED, _scaled),
+    ])
+FIELDS.add('mean_solar_day',
+    strict=[(r'Mean solar day \(sol\)\s*=', r'([\d.]+)\s*(s|d|hr|h)?\b', SECONDS)],
+    fallback=[
+        (r'Mean\s*solar\s*day\s*(?:\d+\.0)?,\s*s\s*=', NUMBER, as_float),
+        (r'Mean\s*solar\s*day\s*\(s\)\s*=', NUMBER, as_float),
+        (r'Mean\s*solar\s*day\s*(?:\(sol\))?\s*=', r'([\d.]+)\s*(s|d|hr|h)?\b', SECONDS),
+    ])
+FIELDS.add('polar_gravity',
+    strict=[(r'Polar gravity m/s\^2\s*=', NUMBER, as_float)],
+    fallback=[
+        (r'Polar\s*gravity\s*m\/?s\^-?2\s*=', NUMBER, as_float),
+        (r'g_p,\s*m\/s\^2\s*\(polar\)\s*=', NUMBER, as_float),
+    ])
+FIELDS.add('core_radius',
+    strict=[(r'Core radius \(km\)\s*=', r'~?([\d.]+)', as_float)],
+    fallback=[(r'(?:Fluid\s*)?Core\s*rad(?:ius)?\s*(?:\(km\))?\s*=', r'(?:~)?([\d.]+)', as_float)])
+FIELDS.add('equatorial_gravity',
+    strict=[(r'Equ\. gravity\s+m/s\^2\s*=', NUMBER, as_float)],
+    fallback=[
+        (r'Equ\.\s*gravity\s*m\/?s\^-?2\s*=', NUMBER, as_float),
+        (r'g_e,\s*m\/s\^2\s*\(equatorial\)\s*=', NUMBER, as_float),
+    ])
+FIELDS.add('geometric_albedo',
+    strict=[(r'Geometric Albedo\s*=', NUMBER, as_float)],
+    fallback=[(r'Geometric\s*Albedo\s*=', NUMBER, as_float), (small_body_key('ALBEDO'), NUMBER, as_float)])
+
+# Gravitational characteristics
+FIELDS.add('gm',
+    strict=[(r'GM \(km\^3/s\^2\)\s*=', NUMBER, as_float)],
+    fallback=[(r'GM[,\s]*\(?km\^3\/s\^2\)?\s*=', NUMBER, as_float)])
+FIELDS.add('gm_uncertainty',
+    strict=[(r'GM 1-sigma \(km\^3/s\^2\)\s*=', r'\+- ([\d.]+)', as_float)],
+    fallback=[(r'GM 1-sigma[,\s]*\(?km\^3\/s\^2\)?\s*=', r'(?:\+-\s*)?([\d.]+)', as_float)])
+FIELDS.add('mass_ratio_to_sun',
+    strict=[(r'Mass ratio \(Sun/[^)]+\)\s*=', NUMBER, as_float)],
+    fallback=[(r'Mass ratio[,\s]*\(Sun\/[^)]+\)\s*=', NUMBER, as_float)])
+
+# Atmospheric characteristics
+FIELDS.add('atmosphere_mass',
+    strict=[(r'Mass of atmosphere, kg=', r'~ ([\d.]+) x 10\^(\d+)', as_power_of_ten)],
+    fallback=[(r'Mass of atmosphere[,\s]*kg\s*=', r'(?:~\s*)?([\d.]+)\s*x\s*10\^(\d+)', as_power_of_ten)])
+FIELDS.add('mean_temperature',
+    strict=[(r'Mean temperature \(K\)\s*=', NUMBER, as_float)],
+    fallback=[
+        (r'Mean (?:surface )?temp(?:erature)?[,\s]*\(?K\)?\s*=', NUMBER, as_float),
+        (r'Mean surface temp.*?:', NUMBER, as_float),
+    ])
+FIELDS.add('surface_pressure',
+    strict=[(r'Atmos\. pressure \(bar\)\s*=', NUMBER, as_float)],
+    fallback=[(r'Atm(?:os)?\.? pressure\s*(?:\(bar\))?\s*=', r'([\d.]+)\s*(bar|atm)?\b', in_units({'atm': 1.01325}))])
+
+# Orbital characteristics
+FIELDS.add('obliquity_to_orbit',
+    strict=[(r'Obliquity to orbit\s*=', NUMBER, as_float)],
+    fallback=[(r'Obliquity to (?:orbit|ecliptic)[,\s]*(?:deg)?\s*=', NUMBER, as_float)])
+FIELDS.add('max_angular_diameter', strict=[(r'Max\. angular diam\.\s*=', NUMBER, as_float)])
+# Horizons prints the orbit period twice, once in years and once in days
+FIELDS.add('mean_sidereal_orbit_period_years',
+    strict=[(r'Mean sidereal orb per\s*=', r'([\d.]+)\s*y', as_float)],
+    fallback=[(r'(?:Mean )?Sidereal orb(?:it)?\.? per(?:iod)?\s*=', r'([\d.]+)\s*([yd])', YEARS)])
+FIELDS.add('mean_sidereal_orbit_period_days',
+    strict=[(r'Mean sidereal orb per\s*=', r'([\d.]+)\s*d', as_float)],
+    fallback=[(r'(?:Mean )?Sidereal orb(?:it)?\.? per(?:iod)?\s*=', r'([\d.]+)\s*([yd])', DAYS)])
+FIELDS.add('visual_magnitude',
+    strict=[(r'Visual mag\. V\(1,0\)\s*=', r'([-\d.]+)', as_float)],
+    fallback=[(r'Vis(?:ual)?\.? mag(?:nitude)?\.? V\(1,0\)\s*=', r'([-\d.]+)', as_float)])
+FIELDS.add('orbital_speed',
+    strict=[(r'Orbital speed,\s+km/s\s*=', NUMBER, as_float)],
+    fallback=[(r'Orbital speed[,\s]*km\/s\s*=', NUMBER, as_float)])
+FIELDS.add('hill_sphere_radius',
+    strict=[(r"Hill's sphere rad\. Rp\s*=", NUMBER, as_float)],
+    fallback=[(r"Hill's sphere rad(?:ius)?\.?(?: Rp)?\s*=", NUMBER, as_float)])
+FIELDS.add('escape_speed',
+    strict=[(r'Escape speed, km/s\s*=', NUMBER, as_float)],
+    fallback=[(r'Escape (?:velocity|speed)[,\s]*(?:km\/s)?\s*=', NUMBER, as_float)])
+# Heliocentric distances in the physical data block, used to estimate the maximum angular diameter
+FIELDS.add('angular_perihelion', strict=[(r'Perihelion, a\.u\.\s*=', NUMBER, as_float)])
+FIELDS.add('angular_aphelion', strict=[(r'Aphelion, a\.u\.\s*=', NUMBER, as_float)])
+
+# Solar interaction
+FIELDS.add('solar_constant',
+    strict=[(r'Solar Constant \(W/m\^2\)', r'([\d.]+)\s+([\d.]+)\s+([\d.]+)',
+             as_floats('solar_constant_perihelion', 'solar_constant_aphelion', 'solar_constant_mean'))],
+    fallback=[(r'Solar Constant \(W\/m\^2\)\s*(?:=|:)',
+               r'([\d.]+)\s*(?:\(mean\))?,?\s*([\d.]+)\s*\(?(?:peri|min)\w*\)?,?\s*([\d.]+)\s*\(?(?:aph|max)\w*\)?',
+               as_floats('solar_constant_mean', 'solar_constant_perihelion', 'solar_constant_aphelion'))],
+    outputs=('solar_constant_perihelion', 'solar_constant_aphelion', 'solar_constant_mean'))
+FIELDS.add('max_planetary_ir',
+    strict=[(r'Maximum Planetary IR \(W/m\^2\)', r'([\d.]+)\s+([\d.]+)\s+([\d.]+)',
+             as_floats('max_planetary_ir_perihelion', 'max_planetary_ir_aphelion', 'max_planetary_ir_mean'))],
+    outputs=('max_planetary_ir_perihelion', 'max_planetary_ir_aphelion', 'max_planetary_ir_mean'))
+FIELDS.add('min_planetary_ir', strict=[(r'Minimum Planetary IR \(W/m\^2\)', NUMBER, as_float)])
+
+# Observer ephemeris preamble
+FIELDS.add('target_pole_equ', strict=[(r'Target pole/equ\s*:', r'(.+)', as_text)])
+FIELDS.add('target_radii',
+    strict=[(r'Target radii\s*:', r'([\d.]+),\s+([\d.]+),\s+([\d.]+)', as_floats('target_radii_a', 'target_radii_b', 'target_radii_c'))],
+    outputs=('target_radii_a', 'target_radii_b', 'target_radii_c'))
+FIELDS.add('center_geodetic',
+    strict=[(r'Center geodetic\s*:', THREE_NUMBERS, as_floats('center_geodetic_lon', 'center_geodetic_lat', 'center_geodetic_alt'))],
+    outputs=('center_geodetic_lon', 'center_geodetic_lat', 'center_geodetic_alt'))
+FIELDS.add('center_cylindric',
+    strict=[(r'Center cylindric:', THREE_NUMBERS, as_floats('center_cylindric_lon', 'center_cylindric_dxy', 'center_cylindric_dz'))],
+    outputs=('center_cylindric_lon', 'center_cylindric_dxy', 'center_cylindric_dz'))
+FIELDS.add('center_pole_equ', strict=[(r'Center pole/equ\s*:', r'(.+)', as_text)])
+FIELDS.add('center_radii',
+    strict=[(r'Center radii\s*:', r'([\d.]+),\s+([\d.]+),\s+([\d.]+)', as_floats('center_radii_a', 'center_radii_b', 'center_radii_c'))],
+    outputs=('center_radii_a', 'center_radii_b', 'center_radii_c'))
+FIELDS.add('target_primary', strict=[(r'Target primary\s*:', r'(.+)', as_text)])
+FIELDS.add('parent_body_name', strict=[(r'Target primary\s*:', r'(.+)', as_stripped_text)])
+FIELDS.add('vis_interferer', strict=[(r'Vis\. interferer\s*:', r'(.+?) \(', as_text)])
+FIELDS.add('vis_interferer_radius', strict=[(r'Vis\. interferer\s*:', r'.+? \(R_eq= ([\d.]+)', as_float)])
+FIELDS.add('rel_light_bend', strict=[(r'Rel\. light bend\s*:', r'(.+)', as_text)])
+FIELDS.add('rel_light_bend_gm', strict=[(r'Rel\. lght bnd GM:', r'([\d.E+]+)', as_float)])
+FIELDS.add('atmos_refraction', strict=[(r'Atmos refraction:', r'(.+)', as_text)])
+FIELDS.add('ra_format', strict=[(r'RA format\s*:', r'(.+)', as_text)])
+FIELDS.add('time_format', strict=[(r'Time format\s*:', r'(.+)', as_text)])
+FIELDS.add('calendar_mode', strict=[(r'Calendar mode\s*:', r'(.+)', as_text)])
+FIELDS.add('eop_file', strict=[(r'EOP file\s*:', r'(.+)', as_text)])
+FIELDS.add('eop_coverage',
+    strict=[(r'EOP coverage\s*:', r'(.+)\s+TO\s+(.+)\.', _eop_coverage)],
+    outputs=('eop_coverage_start', 'eop_coverage_end'))
+FIELDS.add('eop_predict_end', strict=[(r'EOP coverage\s*:', r'.*?EOP PREDICTS-> (.+)', _eop_predict)])
+FIELDS.add('au_km', strict=[(r'Units conversion\s*:', r'.*?1 au= ([\d.]+) km', as_float)])
+FIELDS.add('c_km_s', strict=[(r'Units conversion\s*:', r'.*?c= ([\d.]+) km/s', as_float)])
+FIELDS.add('day_s', strict=[(r'Units conversion\s*:', r'.*?1 day= ([\d.]+) s', as_float)])
+FIELDS.add('elevation_cutoff', strict=[(r'Elevation cut-off\s*:', r'([-\d.]+)', as_float)])
+FIELDS.add('airmass_cutoff', strict=[(CUTOFFS, r'.*?Airmass \(>(\d+\.\d+)=NO\)', as_float)])
+FIELDS.add('solar_elongation_cutoff',
+    strict=[(CUTOFFS, r'.*?Solar elongation \(\s*([\d.]+),\s*([\d.]+)=NO', as_floats('solar_elongation_cutoff_min', 'solar_elongation_cutoff_max'))],
+    outputs=('solar_elongation_cutoff_min', 'solar_elongation_cutoff_max'))
+FIELDS.add('local_hour_angle_cutoff', strict=[(CUTOFFS, r'.*?Local Hour Angle\( ([\d.]+)=NO', as_float)])
+FIELDS.add('ra_dec_angular_rate_cutoff', strict=[(CUTOFFS, r'.*?RA/DEC angular rate \(\s*([\d.]+)=NO', as_float)])
+
+# Asteroid and comet classification
+FIELDS.add('absolute_magnitude',
+    strict=[(r'Absolute mag\. H\s*=', NUMBER, as_float)],
+    fallback=[(small_body_key('H'), r'([-\d.]+)', as_float)])
+FIELDS.add('tisserand_parameter', strict=[(r"Tisserand's parameter\s*=", NUMBER, as_float)])
+
+# Osculating elements as small-body headers print them; the elements table itself is read by horizons_elements
+FIELDS.add('epoch', strict=[(small_body_key('EPOCH'), NUMBER, as_float)])
+FIELDS.add('eccentricity', strict=[(small_body_key('EC'), SCIENTIFIC, as_float)])
+FIELDS.add('perihelion_distance', strict=[(small_body_key('QR'), SCIENTIFIC, as_float)])
+FIELDS.add('inclination', strict=[(small_body_key('IN'), SCIENTIFIC, as_float)])
+FIELDS.add('longitude_of_ascending_node', strict=[(small_body_key('OM'), SCIENTIFIC, as_float)])
+FIELDS.add('argument_of_perihelion', strict=[(small_body_key('W'), SCIENTIFIC, as_float)])
+FIELDS.add('time_of_perihelion_passage', strict=[(small_body_key('TP'), SCIENTIFIC, as_float)])
+FIELDS.add('semi_major_axis', strict=[(small_body_key('A'), SCIENTIFIC, as_float)])
+FIELDS.add('aphelion_distance', strict=[(small_body_key('ADIST'), SCIENTIFIC, as_float)])
+FIELDS.add('orbital_period', strict=[(small_body_key('PER'), SCIENTIFIC, as_float)])
+FIELDS.add('mean_motion', strict=[(small_body_key('N'), SCIENTIFIC, as_float)])
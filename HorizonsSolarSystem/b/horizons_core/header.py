@@ -0,0 +1,182 @@
+import re
+
+TABLE_START = "$$SOE"
+TABLE_END = "$$EOE"
+
+# Side-by-side columns in the object data block are usually separated by at least two spaces;
+# where a value runs into the next key with a single space, the key starts with a capital
+COLUMN_GAP = re.compile(r"\s{2,}")
+KEY_START = re.compile(r"\s(?=[A-Z])")
+
+# Distinct labels seen per extractor before its dispatch table is reset
+DISPATCH_CACHE_SIZE = 4096
+
+
+def header_sections(text):
+    """The parts of ``text`` outside $$SOE/$$EOE ephemeris tables."""
+    start = 0
+    while True:
+        table = text.find(TABLE_START, start)
+        if table == -1:
+            yield text[start:]
+            return
+        yield text[start:table]
+        end = text.find(TABLE_END, table)
+        if end == -1:
+            return
+        start = end + len(TABLE_END)
+
+
+def table_sections(text):
+    """The ephemeris tables between $$SOE and $$EOE markers."""
+    start = 0
+    while True:
+        table = text.find(TABLE_START, start)
+        if table == -1:
+            return
+        end = text.find(TABLE_END, table)
+        yield text[table + len(TABLE_START):end if end != -1 else len(text)]
+        if end == -1:
+            return
+        start = end + len(TABLE_END)
+
+
+def tokenize_header(text):
+    """Split a Horizons response into ``(label, value)`` header segments in a single pass.
+
+    ``label`` is the key with its delimiter and no space before it
+    (``"Vol. mean radius (km)="``, ``"Target body name:"``); rows without a
+    delimiter keep the bare key. ``value`` is the text after the delimiter,
+    up to the next key on the same line. ``key = value`` lines may hold several pairs side by side, ``key : value``
+    lines hold one, and lines with neither are split into a label and the rest
+    at the first column gap, which covers rows such as the solar constant
+    table. Ephemeris tables are cut out before the line loop, so their size
+    does not add to the cost.
+    """
+    segments = []
+    for section in header_sections(text):
+        for line in section.splitlines():
+            line = line.strip()
+            # Blank lines and the rules of asterisks between blocks
+            if not line or line[0] == "*":
+                continue
+            colon = line.find(":")
+            equals = line.find("=")
+            if colon != -1 and (equals == -1 or colon < equals):
+                segments.append((line[:colon].rstrip() + ":", line[colon + 1:].lstrip()))
+            elif equals != -1:
+                _split_pairs(line, segments)
+            else:
+                label, *rest = COLUMN_GAP.split(line, 1)
+                segments.append((label, rest[0] if rest else ""))
+    return segments
+
+
+def _split_pairs(line, segments):
+    # Between two '=' signs sits the previous value and the next key; keys may contain double spaces,
+    # so the split is at the first gap
+    parts = line.split("=")
+    key = parts[0].rstrip()
+    for part in parts[1:-1]:
+        part = part.strip()
+        gap = COLUMN_GAP.search(part) or KEY_START.search(part)
+        if gap is None:
+            value, next_key = part, ""
+        else:
+            value, next_key = part[:gap.start()], part[gap.end():]
+        segments.append((key + "=", value))
+        key = next_key
+    segments.append((key + "=", parts[-1].strip()))
+
+
+class HeaderExtractor:
+    """Precompiled field rules applied to the segments from ``tokenize_header``.
+
+    ``rules`` is a list of ``(field, alternatives)``. Each alternative is
+    ``(label, value, convert)``: ``label`` is a pattern that must match the
+    end of a segment's label, ``value`` must match at the start of its value,
+    and ``convert(field, label_match, value_match)`` returns a dict of parsed
+    values. As with a list of fallback patterns, an earlier alternative wins
+    wherever it appears, and the first segment wins among matches of the same
+    alternative. Which alternatives apply to a label is worked out once per
+    distinct label, so each segment costs a dictionary lookup plus the value
+    patterns of the rules that can use it.
+    """
+
+    def __init__(self, rules, flags=0):
+        self.fields = [field for field, _ in rules]
+        self._alternatives = [
+            (index, priority, re.compile(f"(?:{label})$", flags), re.compile(value, flags), convert)
+            for index, (_, alternatives) in enumerate(rules)
+            for priority, (label, value, convert) in enumerate(alternatives)
+        ]
+        self._dispatch = {}
+
+    def _candidates(self, label):
+        candidates = self._dispatch.get(label)
+        if candidates is None:
+            if len(self._dispatch) >= DISPATCH_CACHE_SIZE:
+                self._dispatch.clear()
+            candidates = []
+            for index, priority, label_pattern, value_pattern, convert in self._alternatives:
+                label_match = label_pattern.search(label)
+                if label_match is not None:
+                    candidates.append((index, priority, label_match, value_pattern, convert))
+            self._dispatch[label] = candidates
+        return candidates
+
+    def extract(self, segments):
+        parsed = {}
+        for converted in self.extract_fields(segments).values():
+            parsed.update(converted)
+        return parsed
+
+    def extract_fields(self, segments, wanted=None):
+        """Converted values keyed by field, limited to the ``wanted`` field names when given."""
+        if wanted is not None:
+            wanted = {index for index, field in enumerate(self.fields) if field in wanted}
+        dispatch = self._dispatch
+        best = {}
+        for label, value in segments:
+            candidates = dispatch.get(label)
+            if candidates is None:
+                candidates = self._candidates(label)
+            for index, priority, label_match, value_pattern, convert in candidates:
+                if wanted is not None and index not in wanted:
+                    continue
+                found = best.get(index)
+                if found is not None and found[0] <= priority:
+                    continue
+                value_match = value_pattern.match(value)
+                if value_match is not None:
+                    best[index] = (priority, label_match, value_match, convert)
+        fields = {}
+        # Only the winning match of each field is converted
+        for index in sorted(best):
+            _, label_match, value_match, convert = best[index]
+            fields[self.fields[index]] = convert(self.fields[index], label_match, value_match)
+        return fields
+
+
+def as_float(field, label_match, value_match):
+    return {field: float(value_match.group(1))}
+
+
+def as_text(field, label_match, value_match):
+    return {field: value_match.group(1)}
+
+
+def as_stripped_text(field, label_match, value_match):
+    return {field: value_match.group(1).strip()}
+
+
+def as_floats(*fields):
+    # For rows that carry several numbers, such as the three solar constant columns
+    def convert(field, label_match, value_match):
+        return {name: float(value) for name, value in zip(fields, value_match.groups())}
+    return convert
+
+
+def as_power_of_ten(field, label_match, value_match):
+    # "<mantissa> x 10^<exponent>"
+    return {field: float(value_match.group(1)) * (10 ** int(value_match.group(2)))}
@@ -0,0 +1,148 @@
+from horizons_core.changes import content_fingerprint
+from horizons_core.client import select_profiles
+from horizons_core.elements import element_fields, pack_element_table, parse_elements_table
+from horizons_core.fields import FIELDS
+from horizons_core.observer import parse_observer_table
+
+# parse_celestial_data reads the object data header and the observer ephemeris preamble,
+# parse_observer_table the observer table rows and parse_oscillating_elements the elements table
+INGEST_PROFILES = select_profiles(("physical", "observer_preamble", "observer_table", "elements"))
+
+CELESTIAL_FIELDS = FIELDS.parser([
+    'name',
+    # Physical characteristics
+    'vol_mean_radius', 'density', 'mass', 'flattening', 'volume', 'equatorial_radius', 'sidereal_rot_period',
+    'sid_rot_rate', 'mean_solar_day', 'polar_gravity', 'core_radius', 'equatorial_gravity', 'geometric_albedo',
+    # Gravitational characteristics
+    'gm', 'gm_uncertainty', 'mass_ratio_to_sun',
+    # Atmospheric characteristics
+    'atmosphere_mass', 'mean_temperature', 'surface_pressure',
+    # Orbital characteristics
+    'obliquity_to_orbit', 'max_angular_diameter', 'mean_sidereal_orbit_period_years', 'mean_sidereal_orbit_period_days',
+    'visual_magnitude', 'orbital_speed', 'hill_sphere_radius', 'escape_speed',
+    # Solar interaction
+    'solar_constant', 'max_planetary_ir', 'min_planetary_ir',
+    # Tertiary Information
+    'target_pole_equ', 'target_radii', 'center_geodetic', 'center_cylindric', 'center_pole_equ', 'center_radii',
+    'target_primary', 'parent_body_name', 'vis_interferer', 'vis_interferer_radius', 'rel_light_bend', 'rel_light_bend_gm',
+    'atmos_refraction', 'ra_format', 'time_format', 'calendar_mode', 'eop_file', 'eop_coverage', 'eop_predict_end',
+    'au_km', 'c_km_s', 'day_s', 'elevation_cutoff', 'airmass_cutoff', 'solar_elongation_cutoff',
+    'local_hour_angle_cutoff', 'ra_dec_angular_rate_cutoff',
+    # Asteroid and comet classification
+    'absolute_magnitude', 'tisserand_parameter',
+])
+
+# Rows that are only reported when present; every other field is None when missing
+OPTIONAL_CELESTIAL_FIELDS = {
+    'atmosphere_mass', 'solar_constant', 'max_planetary_ir', 'target_radii', 'center_geodetic',
+    'center_cylindric', 'center_radii', 'eop_coverage', 'eop_predict_end', 'solar_elongation_cutoff',
+}
+CELESTIAL_DEFAULTS = CELESTIAL_FIELDS.defaults(OPTIONAL_CELESTIAL_FIELDS)
+
+OSCULATING_FIELDS = FIELDS.parser([
+    'epoch', 'eccentricity', 'perihelion_distance', 'inclination', 'longitude_of_ascending_node',
+    'argument_of_perihelion', 'time_of_perihelion_passage', 'semi_major_axis', 'aphelion_distance', 'orbital_period',
+    'mean_motion',
+])
+
+def parse_celestial_data(data):
+    parsed_data = dict.fromkeys(CELESTIAL_DEFAULTS)
+    parsed, served = CELESTIAL_FIELDS.parse(data)
+    parsed_data.update(parsed)
+    parsed_data['fallback_fields'] = CELESTIAL_FIELDS.fallback_fields(served)
+    
+    # parsed_data = {k: v for k, v in parsed_data.items() if v is not None}
+    
+    # New parsing logic for body classification
+    # The parent is attached afterwards: every heliocentric body has the Sun as its primary and is not a moon
+    parent_body_name = parsed_data.pop('parent_body_name')
+    parsed_data['body_type'] = determine_body_type(data, parsed_data)
+    parsed_data['is_planet'] = parsed_data['body_type'] in ['terrestrial_planet', 'gas_giant']
+    parsed_data['is_moon'] = parsed_data['body_type'] in ['major_moon', 'moon']
+    
+    # Parse parent body information
+    parsed_data['parent_body_name'] = parent_body_name
+    parsed_data['albedo'] = parsed_data['geometric_albedo']  # We already parse this as geometric_albedo
+
+    return parsed_data
+
+def determine_body_type(data, parsed_data):
+    name = parsed_data.get('name', '').lower() if parsed_data.get('name') else ''
+    radius = parsed_data.get('vol_mean_radius')
+    
+    if not name and not data:
+        return 'unknown'
+
+    if 'sun' in name:
+        return 'star'
+    elif 'mercury' in name or 'venus' in name or 'earth' in name or 'mars' in name:
+        return 'terrestrial_planet'
+    elif 'jupiter' in name or 'saturn' in name or 'uranus' in name or 'neptune' in name:
+        return 'gas_giant'
+    elif 'pluto' in name or 'eris' in name or 'makemake' in name or 'haumea' in name:
+        return 'dwarf_planet'
+    elif radius and radius > 1000:  # Arbitrary threshold for major moons
+        return 'major_moon'
+    elif 'moon' in name or parsed_data.get('parent_body_name'):
+        return 'moon'
+    
+    # The text is searched for several keywords below, so it is lowercased once
+    text = data.lower()
+    if 'asteroid' in text:
+        if 'neo' in text or 'near-earth' in text:
+            return 'near_earth_asteroid'
+        elif 'main belt' in text:
+            return 'main_belt_asteroid'
+        elif 'trojan' in text:
+            return 'trojan_asteroid'
+        else:
+            return 'main_belt_asteroid'  # Default to main belt if not specified
+    elif 'comet' in text:
+        if 'short-period' in text:
+            return 'short_period_comet'
+        else:
+            return 'long_period_comet'
+    elif 'kuiper belt' in text:
+        return 'kuiper_belt_object'
+    elif 'scattered disc' in text:
+        return 'scattered_disc_object'
+    elif 'centaur' in text:
+        return 'centaur'
+    else:
+        return 'unknown'
+
+def parse_oscillating_elements(data):
+    # The first record of the elements table gives the row's elements and the whole table is stored;
+    # without a table, small-body headers still list the elements at their own epoch
+    parsed_data = dict.fromkeys(OSCULATING_FIELDS.defaults() + ('element_table',))
+    element_table = parse_elements_table(data)
+    if len(element_table):
+        parsed_data.update(element_fields(element_table[0]))
+        parsed_data['element_table'] = pack_element_table(element_table)
+        parsed_data['fallback_fields'] = ""
+        return parsed_data
+
+    parsed, served = OSCULATING_FIELDS.parse(data)
+    parsed_data.update(parsed)
+    parsed_data['fallback_fields'] = OSCULATING_FIELDS.fallback_fields(served)
+    return parsed_data
+
+def parse_ingest_data(body_id, data, oscillating_data, source=None):
+    parsed_data = parse_celestial_data(data)
+    parsed_oscillating_data = parse_oscillating_elements(oscillating_data)
+    fallback_fields = [parsed_data['fallback_fields'], parsed_oscillating_data.pop('fallback_fields')]
+    
+    # Merge the two parsed datasets
+    parsed_data.update(parsed_oscillating_data)
+    parsed_data['fallback_fields'] = ",".join(filter(None, fallback_fields))
+    # Not a CelestialBody field: the rows go to ObserverEphemeris once the body is saved
+    observer_table = parse_observer_table(data)
+    if len(observer_table):
+        parsed_data['observer_ephemeris'] = observer_table
+    parsed_data['horizons_id'] = str(body_id)
+    parsed_data['source_parser'] = "populate"
+    fingerprint = content_fingerprint(data, parsed_data)
+    # Live ingests add it from the per-profile responses instead
+    if source is not None:
+        parsed_data['source_responses'] = source
+    return parsed_data, fingerprint
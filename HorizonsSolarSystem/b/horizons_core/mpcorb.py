@@ -0,0 +1,269 @@
+import gzip
+import re
+
+import numpy as np
+
+from horizons_core.elements import ELEMENT_DTYPE
+
+# Fixed-width record of MPCORB.DAT and its extracts (NEA.txt, ...); columns are 0-based slices
+RECORD_WIDTH = 202
+PACKED_DESIGNATION = (0, 7)
+ABSOLUTE_MAGNITUDE = (8, 13)
+SLOPE = (14, 19)
+PACKED_EPOCH = (20, 25)
+MEAN_ANOMALY = (26, 35)
+ARGUMENT_OF_PERIHELION = (37, 46)
+ASCENDING_NODE = (48, 57)
+INCLINATION = (59, 68)
+ECCENTRICITY = (70, 79)
+MEAN_MOTION = (80, 91)
+SEMI_MAJOR_AXIS = (92, 103)
+FLAGS = (161, 165)
+READABLE_DESIGNATION = (166, 194)
+
+MPCORB_DTYPE = np.dtype([
+    ('number', '<i8'),  # 0 for unnumbered objects
+    ('designation', 'U28'),  # provisional designation, or the name of a named object
+    ('name', 'U48'),  # as Horizons prints it after "Target body name:"
+    ('absolute_magnitude', '<f8'),
+    ('slope', '<f8'),
+    ('epoch', '<f8'),  # Julian day, TT
+    ('mean_anomaly', '<f8'),
+    ('argument_of_perihelion', '<f8'),
+    ('longitude_of_ascending_node', '<f8'),
+    ('inclination', '<f8'),
+    ('eccentricity', '<f8'),
+    ('mean_motion', '<f8'),
+    ('semi_major_axis', '<f8'),
+    ('flags', '<u2'),
+])
+
+# Low six bits of the flags; bit 0x0800 marks near-Earth objects
+ORBIT_TYPE_MASK = 0x3F
+NEO_FLAG = 0x0800
+HILDA, JUPITER_TROJAN, DISTANT_OBJECT = 8, 9, 10
+# Distant objects beyond Neptune are Kuiper belt objects, the rest centaurs
+KUIPER_BELT_AU = 30.1
+
+# Packed forms count with 0-9, A-Z, a-z
+PACKED_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_DIGIT_VALUES = np.full(256, -1, dtype=np.int64)
+_DIGIT_VALUES[np.frombuffer(PACKED_DIGITS.encode("ascii"), dtype=np.uint8)] = np.arange(len(PACKED_DIGITS))
+_HEX_VALUES = np.zeros(256, dtype=np.int64)
+_HEX_VALUES[np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)] = np.arange(16)
+_HEX_VALUES[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+SPACE = ord(" ")
+
+# "K07Tf8A" -> 2007 TA418, "PLS2040" -> 2040 P-L
+PACKED_PROVISIONAL = re.compile(r'^([IJK])(\d\d)([A-HJ-Y])([0-9A-Za-z])(\d)([A-Z])$')
+PACKED_SURVEY = re.compile(r'^(PL|T1|T2|T3)S(\d{4})$')
+SURVEYS = {'PL': 'P-L', 'T1': 'T-1', 'T2': 'T-2', 'T3': 'T-3'}
+# "(1) Ceres" or "(4179) 1989 AC" in the readable designation column
+READABLE_NUMBERED = re.compile(r'^\((\d+)\)\s*(.*)$')
+PROVISIONAL = re.compile(r'^\d{4} (?:[A-Z]{2}\d*|[PT]-[L123])$')
+
+
+def mpcorb_lines(path):
+    """The orbit records of an MPCORB-style file, as bytes; the text header and blank lines are skipped.
+
+    Gzipped files (``MPCORB.DAT.gz``) are read as they are.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as handle:
+        for line in handle:
+            # Records carry a packed epoch ("K25BL") in columns 21-25
+            if len(line) > SEMI_MAJOR_AXIS[1] and line[PACKED_EPOCH[0]] in b"IJK" and line[PACKED_EPOCH[1]] == SPACE:
+                yield line
+
+
+def iter_mpcorb_chunks(lines, chunk_rows):
+    """``(lines, table)`` for every ``chunk_rows`` records, so memory use depends on the chunk size only."""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_rows:
+            yield chunk, decode_mpcorb(chunk)
+            chunk = []
+    if chunk:
+        yield chunk, decode_mpcorb(chunk)
+
+
+def decode_mpcorb(lines):
+    """One chunk of MPCORB records as an ``MPCORB_DTYPE`` array.
+
+    The records are padded into one byte matrix, and each numeric field is
+    a column slice converted by a single NumPy cast; the packed numbers and
+    epochs are decoded with table lookups on the same matrix. Only the
+    names are built record by record. Blank or unreadable values are NaN.
+    """
+    records = np.frombuffer(
+        b"".join(line.rstrip(b"\r\n")[:RECORD_WIDTH].ljust(RECORD_WIDTH) for line in lines), dtype=np.uint8
+    ).reshape(len(lines), RECORD_WIDTH)
+    table = np.zeros(len(lines), dtype=MPCORB_DTYPE)
+    for column, field in (
+        ('absolute_magnitude', ABSOLUTE_MAGNITUDE), ('slope', SLOPE), ('mean_anomaly', MEAN_ANOMALY),
+        ('argument_of_perihelion', ARGUMENT_OF_PERIHELION), ('longitude_of_ascending_node', ASCENDING_NODE),
+        ('inclination', INCLINATION), ('eccentricity', ECCENTRICITY), ('mean_motion', MEAN_MOTION),
+        ('semi_major_axis', SEMI_MAJOR_AXIS),
+    ):
+        table[column] = _floats(records, *field)
+    table['epoch'] = _packed_epochs(records[:, PACKED_EPOCH[0]:PACKED_EPOCH[1]])
+    table['number'] = _packed_numbers(records[:, PACKED_DESIGNATION[0]:PACKED_DESIGNATION[1]])
+    flags = records[:, FLAGS[0]:FLAGS[1]]
+    table['flags'] = _HEX_VALUES[flags] @ np.array([4096, 256, 16, 1])
+
+    numbers = table['number'].tolist()
+    designations = list(map(_designation, _texts(records, *PACKED_DESIGNATION), _texts(records, *READABLE_DESIGNATION)))
+    table['designation'] = designations
+    table['name'] = list(map(horizons_name, numbers, designations))
+    return table
+
+
+def unpack_designation(packed):
+    """``(number, designation)`` of a packed MPC designation; the number is 0 for unnumbered objects.
+
+    Numbered objects get an empty designation. Forms that are not
+    recognised come back unchanged as the designation.
+    """
+    packed = packed.strip()
+    if len(packed) == 5:
+        number = int(_packed_numbers(np.frombuffer(packed.encode("ascii").ljust(7), dtype=np.uint8).reshape(1, 7))[0])
+        if number:
+            return number, ""
+    match = PACKED_PROVISIONAL.match(packed)
+    if match:
+        century, year, half_month, cycle_tens, cycle_units, letter = match.groups()
+        cycle = PACKED_DIGITS.index(cycle_tens) * 10 + int(cycle_units)
+        return 0, f"{PACKED_DIGITS.index(century)}{year} {half_month}{letter}{cycle or ''}"
+    match = PACKED_SURVEY.match(packed)
+    if match:
+        return 0, f"{match.group(2)} {SURVEYS[match.group(1)]}"
+    return 0, packed
+
+
+def unpack_epoch(packed):
+    """Julian day (TT) of a packed epoch such as ``K25BL`` (2025 Nov 21.0)."""
+    return float(_packed_epochs(np.frombuffer(packed.encode("ascii"), dtype=np.uint8).reshape(1, 5))[0])
+
+
+def horizons_name(number, designation):
+    """The body name as Horizons prints it: ``1 Ceres``, ``4179 (1989 AC)`` or ``(2007 TA418)``."""
+    if not number:
+        return f"({designation})"
+    if not designation:
+        return str(number)
+    if PROVISIONAL.match(designation):
+        return f"{number} ({designation})"
+    return f"{number} {designation}"
+
+
+def horizons_command(number, designation):
+    """A Horizons COMMAND that selects the object: its SPK ID when numbered, else its designation."""
+    if number:
+        # Numbered asteroids are 2000000 + number, and 20000000 + number from one million on
+        return str((20000000 if number >= 1000000 else 2000000) + number)
+    return f"DES={designation};"
+
+
+def mpcorb_elements(table):
+    """The records of an ``MPCORB_DTYPE`` array as ``ELEMENT_DTYPE`` rows, for ``element_columns`` and ``elements_at``.
+
+    The perihelion time is the passage nearest the epoch.
+    """
+    elements = np.empty(len(table), dtype=ELEMENT_DTYPE)
+    a = table['semi_major_axis']
+    e = table['eccentricity']
+    n = table['mean_motion']
+    mean_anomaly = table['mean_anomaly']
+    elements['jd'] = table['epoch']
+    elements['ec'] = e
+    elements['qr'] = a * (1 - e)
+    elements['in'] = table['inclination']
+    elements['om'] = table['longitude_of_ascending_node']
+    elements['w'] = table['argument_of_perihelion']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        elements['tp'] = table['epoch'] - np.where(mean_anomaly > 180, mean_anomaly - 360, mean_anomaly) / n
+        elements['pr'] = 360 / n
+    elements['n'] = n
+    elements['ma'] = mean_anomaly
+    elements['ta'] = np.nan
+    elements['a'] = a
+    elements['ad'] = a * (1 + e)
+    return elements
+
+
+def mpcorb_body_types(table):
+    """``CelestialBody.body_type`` of each record, from the MPC orbit type flags and the semi-major axis."""
+    orbit_type = table['flags'] & ORBIT_TYPE_MASK
+    return np.select(
+        [
+            (table['flags'] & NEO_FLAG) > 0,
+            orbit_type == JUPITER_TROJAN,
+            table['semi_major_axis'] >= KUIPER_BELT_AU,
+            orbit_type == DISTANT_OBJECT,
+        ],
+        ['near_earth_asteroid', 'trojan_asteroid', 'kuiper_belt_object', 'centaur'],
+        'main_belt_asteroid',
+    )
+
+
+def _floats(records, start, end):
+    # The field bytes of every record, viewed as one fixed-width string each, are cast to float in one call;
+    # copied, since a one-record slice would otherwise be a view of the read-only line buffer
+    field = records[:, start:end].copy().view(f"S{end - start}").ravel()
+    field[(records[:, start:end] == SPACE).all(axis=1)] = b"nan"
+    try:
+        return field.astype(np.float64)
+    except ValueError:
+        return np.array([_float_or_nan(value) for value in field])
+
+
+def _float_or_nan(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _texts(records, start, end):
+    return [value.decode("latin-1").strip() for value in np.ascontiguousarray(records[:, start:end]).view(f"S{end - start}").ravel().tolist()]
+
+
+def _packed_numbers(designations):
+    # "00001" and "A0001" (100001) are numbered objects, and "~0000" counts on in base 62 from 620000;
+    # provisional designations fill all seven columns
+    first = _DIGIT_VALUES[designations[:, 0]]
+    digits = designations[:, 1:5].astype(np.int64) - ord("0")
+    numbers = first * 10000 + digits @ np.array([1000, 100, 10, 1])
+    numbered = (first >= 0) & ((digits >= 0) & (digits <= 9)).all(axis=1)
+    extended = designations[:, 0] == ord("~")
+    extended_digits = _DIGIT_VALUES[designations[:, 1:5]]
+    numbers = np.where(extended, 620000 + extended_digits @ np.array([62 ** 3, 62 ** 2, 62, 1]), numbers)
+    numbered = (numbered | (extended & (extended_digits >= 0).all(axis=1))) & (designations[:, 5] == SPACE)
+    return np.where(numbered, numbers, 0)
+
+
+def _packed_epochs(epochs):
+    # Century letter (I=18, J=19, K=20), two year digits, then month and day as one packed digit each
+    values = _DIGIT_VALUES[epochs]
+    year = values[:, 0] * 100 + values[:, 1] * 10 + values[:, 2]
+    days = _julian_days(year, values[:, 3], values[:, 4])
+    return np.where((values >= 0).all(axis=1), days, np.nan)
+
+
+def _julian_days(year, month, day):
+    # Gregorian calendar date at 0h to Julian day
+    shift = (14 - month) // 12
+    y = year + 4800 - shift
+    m = month + 12 * shift - 3
+    return day + (153 * m + 2) // 5 + 365 * y + y // 4 - y // 100 + y // 400 - 32045 - 0.5
+
+
+def _designation(packed, readable):
+    # The readable column names the object; files without it fall back to the packed designation
+    match = READABLE_NUMBERED.match(readable)
+    if match:
+        return match.group(2)
+    if readable:
+        return readable
+    return unpack_designation(packed)[1]
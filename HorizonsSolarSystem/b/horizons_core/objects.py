@@ -0,0 +1,105 @@
+import math
+
+from horizons_core.changes import content_fingerprint
+from horizons_core.client import select_profiles, source_fields
+from horizons_core.elements import element_fields, pack_element_table, parse_elements_table
+from horizons_core.fields import FIELDS
+from horizons_core.probe import classify_response
+
+# parse_jpl_horizons_object reads the object data header and the osculating elements
+PARSE_PROFILES = select_profiles(("physical", "elements"))
+
+# Physical characteristics reported as missing when no rule matches
+CHARACTERISTIC_FIELDS = (
+    'name', 'vol_mean_radius', 'density', 'mass', 'flattening', 'volume', 'equatorial_radius', 'sidereal_rot_period',
+    'sid_rot_rate', 'mean_solar_day', 'polar_gravity', 'core_radius', 'equatorial_gravity', 'geometric_albedo',
+)
+HEADER_FIELDS = FIELDS.parser(CHARACTERISTIC_FIELDS + (
+    'gm', 'gm_uncertainty', 'mass_ratio_to_sun', 'atmosphere_mass', 'mean_temperature', 'surface_pressure',
+    'obliquity_to_orbit', 'max_angular_diameter', 'mean_sidereal_orbit_period_years', 'mean_sidereal_orbit_period_days',
+    'visual_magnitude', 'orbital_speed', 'hill_sphere_radius', 'escape_speed', 'angular_perihelion', 'angular_aphelion',
+    'solar_constant', 'max_planetary_ir', 'min_planetary_ir',
+))
+
+
+def parse_jpl_horizons_object(data):
+    parsed_data, served = HEADER_FIELDS.parse(data)
+    parsed_data['fallback_fields'] = HEADER_FIELDS.fallback_fields(served)
+    
+    if 'name' not in parsed_data:
+        print("Error: Unable to extract name")
+    for char in CHARACTERISTIC_FIELDS:
+        if char not in served:
+            print(f"Warning: Unable to extract {char}")
+
+    # Calculate maximum angular diameter when the header does not give it
+    equatorial_radius = parsed_data.get('equatorial_radius')
+    perihelion = parsed_data.pop('angular_perihelion', None)
+    aphelion = parsed_data.pop('angular_aphelion', None)
+    if equatorial_radius is not None and 'max_angular_diameter' not in parsed_data:
+        # For outer solar system objects
+        if perihelion is not None:
+            earth_aphelion = 1.01671388  # Earth's aphelion in AU
+            closest_approach = perihelion - earth_aphelion
+        # For inner solar system objects
+        elif aphelion is not None:
+            earth_perihelion = 0.98329134  # Earth's perihelion in AU
+            closest_approach = earth_perihelion - aphelion
+        else:
+            closest_approach = None
+
+        if closest_approach:
+            # Convert AU to km
+            closest_approach_km = closest_approach * 149597870.7  # 1 AU in km
+            
+            # Calculate maximum angular diameter in arcseconds
+            max_angular_diameter = 2 * math.atan(equatorial_radius / closest_approach_km) * (180 / math.pi) * 3600
+            parsed_data['max_angular_diameter'] = max_angular_diameter
+
+    # Most JPL Horizons headers don't provide Planetary IR values
+    # We can estimate these based on the solar constant and albedo
+    if 'max_planetary_ir_mean' not in parsed_data and 'solar_constant_mean' in parsed_data and 'geometric_albedo' in parsed_data:
+        albedo = parsed_data['geometric_albedo']
+        
+        # Estimate mean maximum planetary IR
+        absorbed_solar_energy = parsed_data['solar_constant_mean'] * (1 - albedo)
+        parsed_data['max_planetary_ir_mean'] = absorbed_solar_energy / 4  # Divide by 4 for day/night and spherical distribution
+
+        # Estimate perihelion and aphelion maximum planetary IR
+        if 'solar_constant_perihelion' in parsed_data:
+            absorbed_solar_energy_perihelion = parsed_data['solar_constant_perihelion'] * (1 - albedo)
+            parsed_data['max_planetary_ir_perihelion'] = absorbed_solar_energy_perihelion / 4
+
+        if 'solar_constant_aphelion' in parsed_data:
+            absorbed_solar_energy_aphelion = parsed_data['solar_constant_aphelion'] * (1 - albedo)
+            parsed_data['max_planetary_ir_aphelion'] = absorbed_solar_energy_aphelion / 4
+
+        # Estimate minimum planetary IR (night-side emission)
+        # This is a very rough estimate and might not be accurate for all bodies
+        parsed_data['min_planetary_ir'] = parsed_data['max_planetary_ir_mean'] * 0.1  # Assume night-side emits about 10% of day-side
+
+    # Osculating orbital elements and additional derived elements; the row fields come from the
+    # first epoch and the whole table is kept for propagation to other dates
+    element_table = parse_elements_table(data)
+
+    if len(element_table):
+        parsed_data.update(element_fields(element_table[0]))
+        parsed_data['element_table'] = pack_element_table(element_table)
+
+    return parsed_data
+
+
+def parse_body_responses(body_id, responses, source=None):
+    # Runs in a parse worker process, so it must not touch the database or the caches
+    status = classify_response(responses[0])
+    if status != "valid":
+        return {"status": status}
+    combined_data = "\n".join(responses)
+    parsed_data = parse_jpl_horizons_object(combined_data)
+    if 'name' not in parsed_data:
+        return {"status": "no_name"}
+    parsed_data['horizons_id'] = str(body_id)
+    parsed_data['source_parser'] = "horizons"
+    fingerprint = content_fingerprint(combined_data, parsed_data)
+    parsed_data.update(source_fields(PARSE_PROFILES, responses) if source is None else {'source_responses': source})
+    return {"status": "valid", "parsed_data": parsed_data, "fingerprint": fingerprint}
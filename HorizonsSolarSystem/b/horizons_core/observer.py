@@ -0,0 +1,190 @@
+import itertools
+
+import numpy as np
+
+from horizons_core.stream import EOE, route_lines
+
+# One row per time step of an OBSERVER table; quantities the table does not carry stay NaN or empty
+OBSERVER_DTYPE = np.dtype([
+    ('time', 'datetime64[s]'),
+    ('ra', '<f8'),
+    ('dec', '<f8'),
+    ('apparent_magnitude', '<f8'),
+    ('nuclear_magnitude', '<f8'),
+    ('surface_brightness', '<f8'),
+    ('delta', '<f8'),
+    ('deldot', '<f8'),
+    ('elongation', '<f8'),
+    ('elongation_flag', 'U1'),
+    ('phase_angle', '<f8'),
+    ('constellation', 'U3'),
+])
+
+# Column header labels of the quantities we request (1,9,20,23,24,29 with HMS angles), with the
+# columns each label fills and the number of whitespace tokens each takes in a row
+HEADER_COLUMNS = {
+    'Date__(UT)__HR:MN': (('time', 2),),
+    'Date__(UT)__HR:MN:SS': (('time', 2),),
+    'Date__(UT)__HR:MN:SC.fff': (('time', 2),),
+    'R.A._____(ICRF)_____DEC': (('ra', 3), ('dec', 3)),
+    'APmag': (('apparent_magnitude', 1),),
+    'T-mag': (('apparent_magnitude', 1),),
+    'N-mag': (('nuclear_magnitude', 1),),
+    'S-brt': (('surface_brightness', 1),),
+    'delta': (('delta', 1),),
+    'deldot': (('deldot', 1),),
+    'S-O-T': (('elongation', 1),),
+    '/r': (('elongation_flag', 1),),
+    'S-T-O': (('phase_angle', 1),),
+    'Cnst': (('constellation', 1),),
+}
+
+MONTHS = {
+    'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04', 'May': '05', 'Jun': '06',
+    'Jul': '07', 'Aug': '08', 'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12',
+}
+
+
+def observer_layout(labels):
+    """``{column: (first token, token count)}`` for a table header, or None if a label is unknown."""
+    layout = {}
+    position = 0
+    for label in labels:
+        columns = HEADER_COLUMNS.get(label)
+        if columns is None:
+            return None
+        for column, width in columns:
+            layout[column] = (position, width)
+            position += width
+    return layout
+
+
+class ObserverTableParser:
+    """Collects the rows of OBSERVER ``$$SOE`` tables line by line, as the consumer of ``route_lines``.
+
+    The column header line printed above each table sets the layout its rows
+    are read with. Rows are only split into tokens as they arrive, and
+    ``table()`` converts them column by column once the stream is done.
+    Rows that do not fit their layout are counted in ``skipped``.
+    """
+
+    def __init__(self):
+        # (layout, width, rows) for each table seen, since responses may carry several
+        self.blocks = []
+        self.skipped = 0
+        self._block = None
+
+    def header(self, line):
+        line = line.strip()
+        if line.startswith("Date__"):
+            layout = observer_layout(line.split())
+            self._block = (layout, sum(width for _, width in layout.values()), []) if layout else None
+            if self._block is not None:
+                self.blocks.append(self._block)
+        elif line == EOE:
+            # Tables of other ephemeris types may follow in the same text
+            self._block = None
+
+    def row(self, line):
+        if self._block is None:
+            return
+        _, width, rows = self._block
+        tokens = line.split()
+        if len(tokens) == width + 1:
+            # Solar and lunar presence flags ("*m", "C") sit between the time and the first quantity
+            del tokens[2]
+        if len(tokens) == width:
+            rows.append(tokens)
+        else:
+            self.skipped += 1
+
+    def table(self):
+        tables = [_block_table(*block) for block in self.blocks if block[2]]
+        return np.concatenate(tables) if tables else _empty_table(0)
+
+
+def parse_observer_lines(lines):
+    """The OBSERVER table rows of a response, given as any iterable of lines, as an ``OBSERVER_DTYPE`` array."""
+    parser = ObserverTableParser()
+    route_lines(lines, parser.header, parser.row)
+    return parser.table()
+
+
+def parse_observer_table(text):
+    return parse_observer_lines(text.splitlines())
+
+
+def _empty_table(count):
+    table = np.zeros(count, dtype=OBSERVER_DTYPE)
+    for column in OBSERVER_DTYPE.names:
+        if OBSERVER_DTYPE[column].kind == 'f':
+            table[column] = np.nan
+    table['time'] = np.datetime64('NaT')
+    return table
+
+
+def _block_table(layout, width, rows):
+    table = _empty_table(len(rows))
+    # Every row of a block has the same width, so each token position is one slice of the flat list
+    tokens = list(itertools.chain.from_iterable(rows))
+    for column, (start, count) in layout.items():
+        parts = [tokens[start + offset::width] for offset in range(count)]
+        table[column] = COLUMN_CONVERTERS.get(column, _floats)(*parts)
+    return table
+
+
+def _floats(tokens):
+    # One C-level conversion for the common case; "n.a." and other placeholders fall back to NaN one by one
+    try:
+        values = np.fromstring(" ".join(tokens), sep=" ")
+    except ValueError:
+        values = None
+    if values is None or values.size != len(tokens):
+        values = np.array([_float_or_nan(token) for token in tokens])
+    return values
+
+
+def _float_or_nan(token):
+    try:
+        return float(token)
+    except ValueError:
+        return np.nan
+
+
+def _times(dates, times):
+    # "2006-Jan-01" "00:00" -> ISO 8601, which NumPy parses natively
+    iso = [f"{date[:-6]}{MONTHS.get(date[-6:-3], '??')}{date[-3:]}T{time}" for date, time in zip(dates, times)]
+    try:
+        return np.array(iso, dtype='datetime64[s]')
+    except ValueError:
+        return np.array([_time_or_nat(value) for value in iso], dtype='datetime64[s]')
+
+
+def _time_or_nat(value):
+    try:
+        return np.datetime64(value, 's')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+def _right_ascension(hours, minutes, seconds):
+    return 15 * (_floats(hours) + _floats(minutes) / 60 + _floats(seconds) / 3600)
+
+
+def _declination(degrees, minutes, seconds):
+    # The sign belongs to the whole angle and is printed even when the degrees are zero ("-00")
+    sign = np.where([token.startswith('-') for token in degrees], -1.0, 1.0)
+    return sign * (np.abs(_floats(degrees)) + _floats(minutes) / 60 + _floats(seconds) / 3600)
+
+
+def _elongation_flags(tokens):
+    return [token.lstrip('/')[:1] for token in tokens]
+
+
+COLUMN_CONVERTERS = {
+    'time': _times,
+    'ra': _right_ascension,
+    'dec': _declination,
+    'elongation_flag': _elongation_flags,
+    'constellation': list,
+}
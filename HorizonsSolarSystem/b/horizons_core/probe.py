@@ -0,0 +1,86 @@
+import argparse
+import re
+
+from horizons_core.cache import get_negative_cache
+from horizons_core.client import profile_fetchers
+from horizons_core.fetch import DEFAULT_CONCURRENCY, iter_fetch_range
+
+# Horizons reports lookup failures in the first few lines, before any object data
+CLASSIFY_PREFIX = 4096
+
+NEGATIVE_MARKERS = [
+    ("no_match", re.compile(r"No matches found|No such (?:record|object)|Unknown target|Cannot interpret", re.I)),
+    ("ambiguous", re.compile(r"Multiple major-bodies match|Matching small-bodies|Number of matches\s*=", re.I)),
+    ("no_ephemeris", re.compile(r"No ephemeris for target", re.I)),
+]
+# Answers from Horizons that it has no unique object for an ID; an "empty" response is a failed fetch instead
+LOOKUP_FAILURES = frozenset(reason for reason, _ in NEGATIVE_MARKERS)
+
+
+def classify_response(text):
+    if not text or not text.strip():
+        return "empty"
+    head = text[:CLASSIFY_PREFIX]
+    for reason, marker in NEGATIVE_MARKERS:
+        if marker.search(head):
+            return reason
+    return "valid"
+
+
+def check_response(body_id, text, negative_cache=None):
+    """The ``classify_response`` status of ``text``; lookup failures put ``body_id`` in the negative cache.
+
+    An empty response is not cached: a truncated body or a proxy error
+    would otherwise hide a real object until the entry expires.
+    """
+    status = classify_response(text)
+    if status in LOOKUP_FAILURES:
+        (negative_cache or get_negative_cache()).add(body_id, status)
+    return status
+
+
+def probe_range(start_id, end_id, concurrency=DEFAULT_CONCURRENCY, recheck=False):
+    """Fetch only the object data header for every ID and return the populated sub-ranges."""
+    negative_cache = get_negative_cache()
+    body_ids = range(start_id, end_id + 1)
+    if not recheck:
+        body_ids = negative_cache.filter(body_ids)
+
+    valid = set()
+    for body_id, responses, error in iter_fetch_range(body_ids, profile_fetchers(("header",)), concurrency):
+        if error is not None:
+            print(f"Error probing body ID {body_id}: {str(error)}")
+            continue
+        if check_response(body_id, responses[0], negative_cache) == "valid":
+            valid.add(body_id)
+            if recheck:
+                negative_cache.discard(body_id)
+    return to_ranges(valid)
+
+
+def to_ranges(body_ids):
+    ranges = []
+    for body_id in sorted(body_ids):
+        if ranges and body_id == ranges[-1][1] + 1:
+            ranges[-1][1] = body_id
+        else:
+            ranges.append([body_id, body_id])
+    return [tuple(r) for r in ranges]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map which Horizons body IDs in a range exist.")
+    parser.add_argument("start_id", type=int)
+    parser.add_argument("end_id", type=int)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--recheck", action="store_true", help="probe IDs already in the negative cache again")
+    args = parser.parse_args()
+
+    ranges = probe_range(min(args.start_id, args.end_id), max(args.start_id, args.end_id), args.concurrency, args.recheck)
+    for start, end in ranges:
+        print(f"{start}-{end}" if start != end else str(start))
+    print(f"{sum(end - start + 1 for start, end in ranges)} populated IDs in {len(ranges)} ranges")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+
+SOE = "$$SOE"
+EOE = "$$EOE"
+
+# An ELEMENTS table record is the JD/date line followed by four lines of elements
+ELEMENT_RECORD_LINES = 5
+
+# Table rows kept when a response is condensed: every record of the month of daily elements, with room to spare
+TABLE_ROWS = int(os.environ.get("HORIZONS_TABLE_ROWS", 400 * ELEMENT_RECORD_LINES))
+
+
+class SectionRouter:
+    """Sends each line of a Horizons response to the consumer for its section.
+
+    Lines outside ``$$SOE``/``$$EOE`` (object data, ephemeris preamble,
+    footer and the markers themselves) go to ``header``; rows between the
+    markers go to ``table``.
+    """
+
+    def __init__(self, header, table):
+        self.header = header
+        self.table = table
+        self.in_table = False
+
+    def feed(self, line):
+        marker = line.strip()
+        if marker == SOE:
+            self.in_table = True
+            self.header(line)
+        elif marker == EOE:
+            self.in_table = False
+            self.header(line)
+        elif self.in_table:
+            self.table(line)
+        else:
+            self.header(line)
+
+
+def route_lines(lines, header, table):
+    router = SectionRouter(header, table)
+    for line in lines:
+        router.feed(line)
+
+
+def condense_lines(lines, table_rows=0):
+    """Return the response text with only its first ``table_rows`` table rows.
+
+    Memory use depends on the header size, not on the ephemeris length.
+    """
+    kept = []
+    rows = 0
+
+    def keep_row(line):
+        nonlocal rows
+        if rows < table_rows:
+            kept.append(line)
+            rows += 1
+
+    route_lines(lines, kept.append, keep_row)
+    return "\n".join(kept)
@@ -1,33 +1,6 @@
-import os
-import django
-import requests
 import re
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "b.settings")
-django.setup()
-
-BASE_URL = "https://ssd.jpl.nasa.gov/api/horizons.api"
-
-def fetch_celestial_data(body_id):
-    params = {
-        "format": "text",
-        "COMMAND": f"'{body_id}'",
-        "OBJ_DATA": "'YES'",
-        "MAKE_EPHEM": "'YES'",
-        "EPHEM_TYPE": "'OBSERVER'",
-        "CENTER": "'500@399'",
-        "START_TIME": "'2006-01-01'",
-        "STOP_TIME": "'2006-01-20'",
-        "STEP_SIZE": "'1 d'",
-        "QUANTITIES": "'1,9,20,23,24,29'"
-    }
-    
-    response = requests.get(BASE_URL, params=params)
-    if response.status_code == 200:
-        return response.text
-    else:
-        print(f"Failed to fetch data for body ID {body_id}")
-        return None
+from horizons_core.client import HorizonsRequestError, fetch_celestial_data
 
 def parse_celestial_data(data):
     parsed_data = {}
@@ -38,7 +11,8 @@ def parse_celestial_data(data):
         return float(match.group(1)) if match else None
 
     # Extract name
-    name_match = re.search(r'Target body name: (.+?) \(', data)
+    # Comets print no "(id)" after the name, only the "{source: ...}" note
+    name_match = re.search(r'Target body name: (.+?)(?: \(|\s+\{source:|\s*$)', data, re.MULTILINE)
     parsed_data['name'] = name_match.group(1) if name_match else None
 
     # Extract physical data
@@ -165,7 +139,11 @@ def print_parsed_data(parsed_data):
 def main():
     body_id = 499  # Mars
     print(f"Fetching data for body ID {body_id} (Mars)")
-    data = fetch_celestial_data(body_id)
+    try:
+        data = fetch_celestial_data(body_id)
+    except HorizonsRequestError as e:
+        print(f"Failed to fetch data: {str(e)}")
+        return
     if data:
         parsed_data = parse_celestial_data(data)
         print_parsed_data(parsed_data)
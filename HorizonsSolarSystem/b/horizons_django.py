@@ -0,0 +1,57 @@
+import importlib
+import os
+import threading
+
+_configured = False
+_lock = threading.Lock()
+
+
+def setup_django():
+    """Configure Django the first time a code path needs the ORM; later calls return at once.
+
+    Import ``a.models`` only after calling it; ``lazy_import`` handles do
+    both on first use.
+    """
+    global _configured
+    if _configured:
+        return
+    with _lock:
+        if _configured:
+            return
+        import django
+        from django.apps import apps
+        # A script that configured Django itself has already loaded the apps
+        if not apps.ready:
+            os.environ.setdefault("DJANGO_SETTINGS_MODULE", "b.settings")
+            django.setup()
+        _configured = True
+
+
+class LazyModule:
+    """Stand-in for a module that needs Django, imported on first attribute access after ``setup_django()``."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            setup_django()
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+
+def lazy_import(name):
+    """A module-level handle on ``name`` (``a.models``, ``horizons_upsert``, ...) that sets Django up on first use.
+
+    The scripts bind everything that needs the ORM this way instead of
+    calling ``django.setup()`` at import, so importing a script, or
+    re-importing it in a spawned parse worker, does not configure Django.
+    Any attribute access counts as use, including building a writer or
+    reading a constant, so a path that must stay Django-free, such as
+    NDJSON output or the parse workers, must not touch a handle at all.
+    """
+    return LazyModule(name)
@@ -0,0 +1,2 @@
+# Moved to horizons_core.elements; this module keeps the old import path working
+from horizons_core.elements import *  # noqa: F401,F403
@@ -0,0 +1,54 @@
+import math
+import os
+from datetime import timezone as dt_timezone
+
+from django.db import transaction
+
+from a.models import ObserverEphemeris
+from horizons_core.observer import OBSERVER_DTYPE
+
+EPHEMERIS_BATCH_SIZE = int(os.environ.get("HORIZONS_EPHEMERIS_BATCH_SIZE", 1000))
+
+
+def ephemeris_rows(body, table):
+    """Unsaved ``ObserverEphemeris`` rows for an ``OBSERVER_DTYPE`` table; rows without a readable time are dropped."""
+    # Converting each column once with tolist() is much cheaper than reading the structured rows one by one
+    columns = {column: table[column].tolist() for column in OBSERVER_DTYPE.names}
+    rows = []
+    for values in zip(*columns.values()):
+        fields = dict(zip(columns, values))
+        if fields['time'] is None:
+            continue
+        fields['time'] = fields['time'].replace(tzinfo=dt_timezone.utc)
+        for column, value in fields.items():
+            if isinstance(value, float) and math.isnan(value):
+                fields[column] = None
+        rows.append(ObserverEphemeris(body=body, **fields))
+    return rows
+
+
+def save_observer_ephemeris(tables, batch_size=EPHEMERIS_BATCH_SIZE):
+    """Replace the stored observer table of each ``(body, table)`` pair; returns the number of rows written.
+
+    The old rows of every body go in one DELETE and the new ones in one
+    ``bulk_create``, so a whole chunk of bodies costs two statements plus
+    one per ``batch_size`` rows.
+    """
+    tables = [(body, table) for body, table in tables if table is not None]
+    if not tables:
+        return 0
+    rows = [row for body, table in tables for row in ephemeris_rows(body, table)]
+    with transaction.atomic():
+        ObserverEphemeris.objects.filter(body__in=[body for body, _ in tables]).delete()
+        ObserverEphemeris.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def observation_at(body, moment):
+    """The stored observer row nearest ``moment``, or None if ``moment`` is outside the stored window."""
+    rows = ObserverEphemeris.objects.filter(body=body)
+    before = rows.filter(time__lte=moment).order_by('-time').first()
+    after = rows.filter(time__gte=moment).order_by('time').first()
+    if before is None or after is None:
+        return None
+    return before if moment - before.time <= after.time - moment else after
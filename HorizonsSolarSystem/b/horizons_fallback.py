@@ -1,53 +1,12 @@
-import os
-import django
-import requests
-import re
 import argparse
-from django.db import transaction
 from datetime import datetime
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "b.settings")
-django.setup()
+from horizons_core import parse_fallback_responses, parse_jpl_horizons_object_fallback
+from horizons_core.client import fetch_celestial_data, fetch_oscillating_elements
+from horizons_django import lazy_import
 
-from a.models import CelestialBody
-
-BASE_URL = "https://ssd.jpl.nasa.gov/api/horizons.api"
-
-def fetch_celestial_data(body_id):
-    params = {
-        "format": "text",
-        "COMMAND": f"'{body_id}'",
-        "OBJ_DATA": "'YES'",
-        "MAKE_EPHEM": "'YES'",
-        "EPHEM_TYPE": "'OBSERVER'",
-        "CENTER": "'500@399'",
-        "START_TIME": "'2006-01-01'",
-        "STOP_TIME": "'2006-01-20'",
-        "STEP_SIZE": "'1 d'",
-        "QUANTITIES": "'1,9,20,23,24,29'"
-    }
-    response = requests.get(BASE_URL, params=params)
-    return response.text
-
-def fetch_oscillating_elements(body_id):
-    params = {
-        "format": "text",
-        "COMMAND": f"'{body_id}'",
-        "EPHEM_TYPE": "ELEMENTS",
-        "CENTER": "'500@10'",
-        "START_TIME": "'2023-01-01'",
-        "STOP_TIME": "'2023-02-01'",
-        "STEP_SIZE": "'1 d'",
-        "MAKE_EPHEM": "YES",
-        "OUT_UNITS": "AU-D",
-        "REF_PLANE": "ECLIPTIC",
-        "REF_SYSTEM": "J2000",
-        "TP_TYPE": "ABSOLUTE",
-        "CSV_FORMAT": "NO",
-        "OBJ_DATA": "YES"
-    }
-    response = requests.get(BASE_URL, params=params)
-    return response.text
+models = lazy_import("a.models")
+horizons_upsert = lazy_import("horizons_upsert")
 
 def query_object():
     body_id = input("Enter the body ID to query: ")
@@ -80,55 +39,6 @@ def query_object():
     else:
         print("Invalid choice. Returning to main menu.")
 
-def parse_jpl_horizons_object_fallback(data):
-    result = {}
-    
-    # Extract name
-    name_match = re.search(r'Target body name: (.+?)\s+\(', data)
-    if name_match:
-        result['name'] = name_match.group(1).strip()
-    
-    # Extract physical characteristics
-    characteristics = {
-        'vol_mean_radius': r'Vol. Mean Radius \(km\)\s*=\s*([\d.]+)',
-        'density': r'Density \(g cm\^-3\)\s*=\s*([\d.]+)',
-        'mass': r'Mass \(10\^23 kg\)\s*=\s*([\d.]+)',
-        'flattening': r'Flattening, f\s*=\s*([\d.]+)',
-        'volume': r'Volume \(x10\^10 km\^3\)\s*=\s*([\d.]+)',
-        'equatorial_radius': r'Equ. radius, Re \(km\)\s*=\s*([\d.]+)',
-        'sidereal_rot_period': r'Sid. rot. period \(hrs\)\s*=\s*([\d.]+)',
-        'sid_rot_rate': r'Sid. rot. rate \(rad/s\)\s*=\s*([\d.]+)',
-        'mean_solar_day': r'Mean solar day \(s\)\s*=\s*([\d.]+)',
-        'polar_gravity': r'Polar gravity ms\^-2\s*=\s*([\d.]+)',
-        'core_radius': r'Core radius \(km\)\s*=\s*([\d.]+)',
-        'equatorial_gravity': r'Equ. gravity  ms\^-2\s*=\s*([\d.]+)',
-        'geometric_albedo': r'Geometric Albedo\s*=\s*([\d.]+)',
-    }
-    
-    for key, pattern in characteristics.items():
-        match = re.search(pattern, data)
-        if match:
-            result[key] = float(match.group(1))
-    
-    # Extract uncertainties
-    uncertainties = {
-        'vol_mean_radius_uncertainty': r'Vol. Mean Radius \(km\)\s*=\s*[\d.]+\s*\+-\s*([\d.]+)',
-        'density_uncertainty': r'Density \(g cm\^-3\)\s*=\s*[\d.]+\s*\+-\s*([\d.]+)',
-    }
-    
-    for key, pattern in uncertainties.items():
-        match = re.search(pattern, data)
-        if match:
-            result[key] = float(match.group(1))
-    
-    # Determine body type (this is a simplification, you may need to refine this logic)
-    if 'Mars' in result.get('name', ''):
-        result['body_type'] = 'planet'
-    else:
-        result['body_type'] = 'unknown'
-    
-    return result
-
 def parse_jpl_horizons_menu():
     print("\nParse JPL Horizons Object")
     print("1. Parse from file")
@@ -173,59 +83,54 @@ def update_celestial_body():
     if start_id > end_id:
         start_id, end_id = end_id, start_id
 
-    for body_id in range(start_id, end_id + 1):
-        print(f"\nProcessing body ID: {body_id}")
-        
-        # Fetch data from JPL Horizons
-        try:
-            celestial_data = fetch_celestial_data(str(body_id))
-            oscillating_elements = fetch_oscillating_elements(str(body_id))
-            combined_data = celestial_data + "\n" + oscillating_elements
-        except Exception as e:
-            print(f"Error fetching data for body ID {body_id}: {str(e)}")
-            continue
-        
-        # Parse the data
-        parsed_data = parse_jpl_horizons_object_fallback(combined_data)
-        
-        if 'name' not in parsed_data:
-            print(f"Could not parse name for body ID {body_id}. Skipping.")
-            continue
-        
-        # Check if the celestial body exists in the database
-        celestial_body, created = CelestialBody.objects.get_or_create(name=parsed_data['name'])
-        
-        if created:
-            print(f"Created new entry for {parsed_data['name']}")
+    def written(body_id, celestial_body, status):
+        if status == "unchanged":
+            print(f"No changes for {celestial_body.name}. Skipping.")
         else:
-            print(f"Updating existing entry for {parsed_data['name']}")
-        
-        # Update the celestial body with parsed data
-        for key, value in parsed_data.items():
-            if hasattr(celestial_body, key):
-                setattr(celestial_body, key, value)
-        
-        # Save the updated or new celestial body
-        celestial_body.save()
-        print(f"Successfully updated/created entry for {celestial_body.name}")
+            print(f"Successfully {status} entry for {celestial_body.name}")
+
+    def failed(body_id, error):
+        print(f"Error saving entry for body ID {body_id}: {str(error)}")
+
+    # Parsed bodies are buffered and written a batch at a time, in one transaction per batch
+    with horizons_upsert.CelestialBodyWriter(on_written=written, on_failed=failed) as writer:
+        for body_id in range(start_id, end_id + 1):
+            print(f"\nProcessing body ID: {body_id}")
+            
+            # Fetch data from JPL Horizons
+            try:
+                celestial_data = fetch_celestial_data(str(body_id))
+                oscillating_elements = fetch_oscillating_elements(str(body_id))
+            except Exception as e:
+                print(f"Error fetching data for body ID {body_id}: {str(e)}")
+                continue
+            
+            # Parse the data
+            parsed_data, fingerprint = parse_fallback_responses(body_id, [celestial_data, oscillating_elements])
+            
+            if 'name' not in parsed_data:
+                print(f"Could not parse name for body ID {body_id}. Skipping.")
+                continue
+            
+            writer.add(body_id, parsed_data, fingerprint)
 
 def view_celestial_body():
     print("\nView Celestial Body")
     body_name = input("Enter the name of the celestial body to view: ")
     
     try:
-        celestial_body = CelestialBody.objects.get(name=body_name)
+        celestial_body = models.CelestialBody.objects.get(name=body_name)
         print(f"\nData for {celestial_body.name}:")
         
         # Get all fields of the model
-        fields = CelestialBody._meta.fields
+        fields = models.CelestialBody._meta.fields
         
         for field in fields:
             value = getattr(celestial_body, field.name)
             if value is not None:
                 print(f"{field.verbose_name}: {value}")
         
-    except CelestialBody.DoesNotExist:
+    except models.CelestialBody.DoesNotExist:
         print(f"No entry found for {body_name}")
 
 def main_menu():
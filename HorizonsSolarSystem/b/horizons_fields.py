@@ -0,0 +1,2 @@
+# Moved to horizons_core.fields; this module keeps the old import path working
+from horizons_core.fields import *  # noqa: F401,F403
@@ -0,0 +1,2 @@
+# Moved to horizons_core.header; this module keeps the old import path working
+from horizons_core.header import *  # noqa: F401,F403
@@ -0,0 +1,70 @@
+import os
+
+from django.db import transaction
+from django.db.models import Count
+
+from a.models import IngestRun, IngestRunEntry
+
+JOURNAL_BATCH_SIZE = int(os.environ.get("HORIZONS_JOURNAL_BATCH_SIZE", 200))
+
+
+class IngestJournal:
+    """Batched record of which body IDs an ingest run has finished, and how.
+
+    Entries are buffered and written ``batch_size`` at a time. A crash loses
+    at most the last unflushed batch; resuming re-ingests those IDs, which is
+    safe because the body writes are keyed by name and skip unchanged rows.
+    ``ignore_conflicts`` makes replaying an already flushed batch a no-op.
+    """
+
+    def __init__(self, run, batch_size=JOURNAL_BATCH_SIZE):
+        self.run = run
+        self.batch_size = batch_size
+        self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def record(self, body_id, status):
+        self._pending.append(IngestRunEntry(run=self.run, body_id=int(body_id), status=status))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with transaction.atomic():
+            IngestRunEntry.objects.bulk_create(self._pending, ignore_conflicts=True)
+            # Touch the run so its updated_at shows when progress was last made
+            self.run.save(update_fields=["updated_at"])
+        self._pending = []
+
+    def complete(self):
+        self.flush()
+        self.run.status = "completed"
+        self.run.save(update_fields=["status", "updated_at"])
+
+
+def start_run(start_id, end_id):
+    return IngestRun.objects.create(start_id=start_id, end_id=end_id)
+
+
+def remaining_ids(run):
+    """IDs of the run's range with no journal entry, in order."""
+    journaled = set(run.entries.values_list("body_id", flat=True))
+    return [body_id for body_id in range(run.start_id, run.end_id + 1) if body_id not in journaled]
+
+
+def incomplete_runs():
+    # Runs of leased shards are resumed by whichever worker reclaims the shard
+    return IngestRun.objects.filter(status="running", shards__isnull=True).order_by("-updated_at")
+
+
+def run_progress(run):
+    counts = dict.fromkeys(("done", "absent", "failed"), 0)
+    counts.update(run.entries.values_list("status").annotate(count=Count("id")))
+    counts["total"] = run.end_id - run.start_id + 1
+    return counts
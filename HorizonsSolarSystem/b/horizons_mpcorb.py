@@ -0,0 +1,154 @@
+import os
+import hashlib
+import argparse
+import itertools
+from time import perf_counter
+
+from horizons_core.elements import ELEMENT_DTYPE, element_columns
+from horizons_core.mpcorb import horizons_command, iter_mpcorb_chunks, mpcorb_body_types, mpcorb_elements, mpcorb_lines
+from horizons_django import lazy_import
+
+db = lazy_import("django.db")
+models = lazy_import("a.models")
+timezone = lazy_import("django.utils.timezone")
+transaction = lazy_import("django.db.transaction")
+
+MPCORB_CHUNK_ROWS = int(os.environ.get("HORIZONS_MPCORB_CHUNK_ROWS", 10000))
+
+# Written on every new or changed row
+MPCORB_FIELDS = (
+    'epoch', 'eccentricity', 'perihelion_distance', 'inclination', 'longitude_of_ascending_node',
+    'argument_of_perihelion', 'time_of_perihelion_passage', 'mean_motion', 'semi_major_axis', 'aphelion_distance',
+    'orbital_period', 'mean_longitude', 'longitude_of_periapsis', 'absolute_magnitude', 'element_table',
+    'content_fingerprint',
+)
+MPCORB_NEW_FIELDS = ('body_type', 'horizons_id', 'source_parser')
+
+
+def mpcorb_rows(lines, table):
+    """``(name, fields, new_fields)`` for each record of one decoded chunk.
+
+    ``fields`` holds the ``MPCORB_FIELDS`` values, with NaN as None and
+    the record packed as a one-row element table so ``elements_at`` can
+    propagate it; ``new_fields`` is only used when the row is created.
+    """
+    elements = mpcorb_elements(table)
+    columns = {field: values.tolist() for field, values in element_columns(elements).items()}
+    columns['absolute_magnitude'] = table['absolute_magnitude'].tolist()
+    packed = elements.tobytes()
+    size = ELEMENT_DTYPE.itemsize
+    columns['element_table'] = [packed[offset:offset + size] for offset in range(0, len(packed), size)]
+    # The record line itself is the fingerprint, so an unchanged line costs one comparison
+    columns['content_fingerprint'] = [f"mpcorb:{hashlib.md5(line.rstrip()).hexdigest()}" for line in lines]
+    body_types = mpcorb_body_types(table).tolist()
+    rows = []
+    for name, number, designation, body_type, *values in zip(
+        table['name'].tolist(), table['number'].tolist(), table['designation'].tolist(), body_types,
+        *(columns[field] for field in MPCORB_FIELDS)
+    ):
+        fields = {field: None if value != value else value for field, value in zip(MPCORB_FIELDS, values)}
+        new_fields = {'body_type': body_type, 'horizons_id': horizons_command(number, designation), 'source_parser': "mpcorb"}
+        rows.append((name, fields, new_fields))
+    return rows
+
+
+def load_mpcorb_chunk(lines, table, dry_run=False):
+    """Insert or update the ``CelestialBody`` rows of one chunk; returns ``(created, updated, unchanged)``.
+
+    Existing rows are matched by name with one query, which also reads
+    their fingerprints, so unchanged records are skipped without loading
+    the rows. New and changed rows are written with one ``executemany``
+    each, inside one transaction: going through model instances and
+    ``bulk_create``/``bulk_update`` builds every one of the model's
+    columns for each row, which costs milliseconds per row.
+    """
+    rows = mpcorb_rows(lines, table)
+    existing = {}
+    # The lowest id wins among duplicate names
+    for pk, name, fingerprint in (
+        models.CelestialBody.objects.filter(name__in=[name for name, _, _ in rows]).order_by('-pk')
+        .values_list('pk', 'name', 'content_fingerprint')
+    ):
+        existing[name] = (pk, fingerprint)
+    # bulk writes skip auto_now, so last_updated is set by hand
+    now = models.CelestialBody._meta.get_field('last_updated').get_db_prep_save(timezone.now(), db.connection)
+    insert_columns, defaults = _insert_columns()
+    inserts, updates, seen = [], [], set()
+    for name, fields, new_fields in rows:
+        if name in seen:
+            continue
+        seen.add(name)
+        values = [fields[field] for field in MPCORB_FIELDS]
+        if name not in existing:
+            inserts.append([name, now, *values, *(new_fields[field] for field in MPCORB_NEW_FIELDS), *defaults])
+        elif existing[name][1] != fields['content_fingerprint']:
+            updates.append([now, *values, existing[name][0]])
+    if not dry_run:
+        quote = db.connection.ops.quote_name
+        table_name = quote(models.CelestialBody._meta.db_table)
+        with transaction.atomic(), db.connection.cursor() as cursor:
+            if inserts:
+                cursor.executemany(
+                    f"INSERT INTO {table_name} ({', '.join(map(quote, insert_columns))}) "
+                    f"VALUES ({', '.join(['%s'] * len(insert_columns))})",
+                    inserts,
+                )
+            if updates:
+                assignments = ", ".join(f"{quote(column)} = %s" for column in _columns(('last_updated',) + MPCORB_FIELDS))
+                cursor.executemany(f"UPDATE {table_name} SET {assignments} WHERE {quote(models.CelestialBody._meta.pk.column)} = %s", updates)
+    return len(inserts), len(updates), len(seen) - len(inserts) - len(updates)
+
+
+def _columns(fields):
+    return [models.CelestialBody._meta.get_field(field).column for field in fields]
+
+
+def _insert_columns():
+    # Columns the file fills, then every other NOT NULL column with its model default, as the ORM would insert it
+    written = ('name', 'last_updated') + MPCORB_FIELDS + MPCORB_NEW_FIELDS
+    columns, defaults = _columns(written), []
+    for field in models.CelestialBody._meta.concrete_fields:
+        if not field.primary_key and not field.null and field.attname not in written:
+            columns.append(field.column)
+            defaults.append(field.get_db_prep_save(field.get_default(), db.connection))
+    return columns, defaults
+
+
+def ingest_mpcorb(path, chunk_rows=MPCORB_CHUNK_ROWS, limit=None, dry_run=False):
+    """Stream an MPCORB-style file into ``CelestialBody``, ``chunk_rows`` records at a time.
+
+    Only one chunk of lines, its decoded table and its row values are
+    held at once, whatever the file size. Returns counts of the records
+    read and the rows created, updated and left unchanged.
+    """
+    counts = dict.fromkeys(("records", "created", "updated", "unchanged"), 0)
+    started = perf_counter()
+    for lines, table in iter_mpcorb_chunks(itertools.islice(mpcorb_lines(path), limit), chunk_rows):
+        created, updated, unchanged = load_mpcorb_chunk(lines, table, dry_run)
+        counts["records"] += len(lines)
+        counts["created"] += created
+        counts["updated"] += updated
+        counts["unchanged"] += unchanged
+        elapsed = perf_counter() - started
+        print(f"{counts['records']} records in {elapsed:.0f}s ({counts['records'] / elapsed:.0f}/s): "
+              f"{counts['created']} created, {counts['updated']} updated, {counts['unchanged']} unchanged")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load the orbits of an MPCORB-style catalog (MPCORB.DAT, NEA.txt, optionally gzipped) into CelestialBody."
+    )
+    parser.add_argument("path", help="orbit catalog in the MPCORB fixed-width format")
+    parser.add_argument("--chunk-rows", type=int, default=MPCORB_CHUNK_ROWS, help="records decoded and written per transaction")
+    parser.add_argument("--limit", type=int, help="stop after this many records")
+    parser.add_argument("--dry-run", action="store_true", help="count the rows that would be created or changed without writing them")
+    args = parser.parse_args()
+
+    counts = ingest_mpcorb(args.path, args.chunk_rows, args.limit, args.dry_run)
+    print(f"Read {counts['records']} records: {counts['created']} {'would be created' if args.dry_run else 'created'}, "
+          f"{counts['updated']} {'would change' if args.dry_run else 'updated'}, {counts['unchanged']} unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Moved to horizons_core.observer; this module keeps the old import path working
+from horizons_core.observer import *  # noqa: F401,F403
@@ -0,0 +1,182 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from horizons_core.fetch import DEFAULT_CONCURRENCY, iter_fetch_range
+
+PARSE_WORKERS = int(os.environ.get("HORIZONS_PARSE_WORKERS", os.cpu_count() or 1))
+WRITE_BATCH_SIZE = int(os.environ.get("HORIZONS_WRITE_BATCH_SIZE", 100))
+REPORT_SECONDS = float(os.environ.get("HORIZONS_PIPELINE_REPORT", 10))
+
+_DONE = object()
+
+
+class StageStats:
+    """Occupancy counters for one pipeline stage.
+
+    ``busy`` is time spent doing the stage's own work, ``blocked`` is time
+    spent waiting for room in the next stage's queue. A stage that is busy
+    most of the time while the stages before it are blocked is the one
+    limiting throughput.
+    """
+
+    def __init__(self, name, workers=1):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, busy=0.0, blocked=0.0, items=0):
+        with self._lock:
+            self.busy += busy
+            self.blocked += blocked
+            self.items += items
+
+    def snapshot(self):
+        with self._lock:
+            capacity = max(time.monotonic() - self.started, 1e-9) * self.workers
+            return {
+                "stage": self.name,
+                "items": self.items,
+                "busy": self.busy / capacity,
+                "blocked": self.blocked / capacity,
+            }
+
+
+def format_stats(stats, queues):
+    parts = []
+    for stage in stats:
+        snapshot = stage.snapshot()
+        depth = queues.get(stage.name)
+        parts.append(
+            f"{snapshot['stage']}: {snapshot['items']} items, busy {snapshot['busy']:.0%}, "
+            f"blocked {snapshot['blocked']:.0%}" + (f", queued {depth.qsize()}" if depth is not None else "")
+        )
+    return " | ".join(parts)
+
+
+def _timed_call(parse, body_id, responses):
+    started = time.perf_counter()
+    result = parse(body_id, responses)
+    return result, time.perf_counter() - started
+
+
+def _put(target, item, stats):
+    started = time.monotonic()
+    target.put(item)
+    stats.add(blocked=time.monotonic() - started)
+
+
+def run_pipeline(body_ids, fetchers, parse, write_batch, concurrency=DEFAULT_CONCURRENCY,
+                 parse_workers=PARSE_WORKERS, batch_size=WRITE_BATCH_SIZE, report_seconds=REPORT_SECONDS):
+    """Fetch, parse and store bodies in three overlapping stages.
+
+    I/O-bound fetches run in the async engine. ``parse(body_id, responses)``
+    runs in a pool of ``parse_workers`` processes, so it must be a picklable
+    module-level function that does not touch the database.
+    ``write_batch(items)`` runs on the calling thread only and receives lists
+    of ``(body_id, result, error, stage)`` of up to ``batch_size`` items.
+    Queues between stages are bounded, so a slow stage holds back the ones
+    before it instead of buffering the whole range in memory.
+    """
+    parse_workers = max(1, parse_workers)
+    fetch_stats = StageStats("fetch")
+    parse_stats = StageStats("parse", parse_workers)
+    write_stats = StageStats("write")
+    stats = (fetch_stats, parse_stats, write_stats)
+    # The parse queue holds futures in submission order, so its bound is also the number of parses in flight
+    parse_queue = queue.Queue(maxsize=parse_workers * 2)
+    write_queue = queue.Queue(maxsize=batch_size * 2)
+    queues = {"parse": parse_queue, "write": write_queue}
+    failure = []
+    stop = threading.Event()
+
+    def fetch_stage(executor):
+        fetched = iter_fetch_range(body_ids, fetchers, concurrency)
+        try:
+            waited = time.monotonic()
+            for body_id, responses, error in fetched:
+                if stop.is_set():
+                    break
+                fetch_stats.add(busy=time.monotonic() - waited, items=1)
+                if error is not None:
+                    future = Future()
+                    future.set_exception(error)
+                    _put(parse_queue, (body_id, "fetch", future), fetch_stats)
+                else:
+                    _put(parse_queue, (body_id, "parse", executor.submit(_timed_call, parse, body_id, responses)), fetch_stats)
+                waited = time.monotonic()
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            fetched.close()
+            parse_queue.put(_DONE)
+
+    def collect_stage():
+        try:
+            while True:
+                item = parse_queue.get()
+                if item is _DONE:
+                    break
+                body_id, stage, future = item
+                if stop.is_set():
+                    continue
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    _put(write_queue, (body_id, None, e, stage), parse_stats)
+                else:
+                    parse_stats.add(busy=seconds, items=1)
+                    _put(write_queue, (body_id, result, None, stage), parse_stats)
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            write_queue.put(_DONE)
+
+    last_report = time.monotonic()
+    with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        threads = [
+            threading.Thread(target=fetch_stage, args=(executor,), name="horizons-pipeline-fetch", daemon=True),
+            threading.Thread(target=collect_stage, name="horizons-pipeline-collect", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        batch = []
+        finished = False
+        try:
+            while not finished:
+                try:
+                    # Flush a partial batch when the upstream stages go quiet
+                    item = write_queue.get(timeout=0.5 if batch else None)
+                except queue.Empty:
+                    item = None
+                if item is _DONE:
+                    finished = True
+                elif item is not None:
+                    batch.append(item)
+                if batch and (finished or item is None or len(batch) >= batch_size):
+                    started = time.monotonic()
+                    write_batch(batch)
+                    write_stats.add(busy=time.monotonic() - started, items=len(batch))
+                    batch = []
+                if report_seconds and time.monotonic() - last_report >= report_seconds:
+                    print(f"Pipeline: {format_stats(stats, queues)}")
+                    last_report = time.monotonic()
+        finally:
+            # On a writer error, keep draining so the upstream threads can see the stop flag and exit
+            stop.set()
+            while any(thread.is_alive() for thread in threads):
+                try:
+                    write_queue.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+    if failure:
+        raise failure[0]
+    print(f"Pipeline finished: {format_stats(stats, queues)}")
+    return [stage.snapshot() for stage in stats]
@@ -0,0 +1,6 @@
+# Moved to horizons_core.probe; this module keeps the old import path working
+from horizons_core.probe import *  # noqa: F401,F403
+from horizons_core.probe import main
+
+if __name__ == "__main__":
+    main()
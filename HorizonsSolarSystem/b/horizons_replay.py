@@ -0,0 +1,169 @@
+import os
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from horizons_core import parse_body_responses, parse_fallback_responses, parse_ingest_data
+from horizons_core.cache import source_text
+from horizons_core.changes import apply_parsed
+from horizons_core.client import parse_response_source, texts_covering
+from horizons_core.stream import TABLE_ROWS, condense_lines
+from horizons_django import lazy_import
+from horizons_pipeline import PARSE_WORKERS
+
+models = lazy_import("a.models")
+horizons_ephemeris = lazy_import("horizons_ephemeris")
+horizons_upsert = lazy_import("horizons_upsert")
+transaction = lazy_import("django.db.transaction")
+
+REPLAY_CHUNK_SIZE = int(os.environ.get("HORIZONS_REPLAY_CHUNK_SIZE", 500))
+
+def _parse_horizons(body_id, profiles, texts, source):
+    # The live path parses condensed streams, so the archived bodies are condensed the same way
+    texts = [condense_lines(text.splitlines(), TABLE_ROWS) for text in texts]
+    result = parse_body_responses(body_id, texts, source)
+    if result["status"] != "valid":
+        return None, None
+    return result["parsed_data"], result["fingerprint"]
+
+
+def _parse_populate(body_id, profiles, texts, source):
+    texts = [condense_lines(text.splitlines(), TABLE_ROWS) for text in texts]
+    data = texts_covering(profiles, texts, "observer_preamble")
+    oscillating_data = texts_covering(profiles, texts, "elements")
+    return parse_ingest_data(body_id, data, oscillating_data, source)
+
+
+def _parse_fallback(body_id, profiles, texts, source):
+    return parse_fallback_responses(body_id, texts, source)
+
+
+PARSERS = {
+    "horizons": _parse_horizons,
+    "populate": _parse_populate,
+    "fallback": _parse_fallback,
+}
+
+
+def replay_chunk(rows):
+    """Re-parse ``(pk, horizons_id, source_parser, source_responses)`` rows from the archive.
+
+    Runs in a parse worker process and returns ``(pk, status, parsed_data, fingerprint)``
+    tuples, where status is ``parsed``, ``missing`` or ``failed``.
+    """
+    # The source archive is opened lazily in each parse worker; the parent process never touches it
+    results = []
+    for pk, horizons_id, parser, source in rows:
+        pairs = parse_response_source(source)
+        texts = [source_text(ref) for _, ref in pairs]
+        if not pairs or parser not in PARSERS or any(text is None for text in texts):
+            results.append((pk, "missing", None, None))
+            continue
+        try:
+            parsed_data, fingerprint = PARSERS[parser](horizons_id, [profile for profile, _ in pairs], texts, source)
+        except Exception:
+            parsed_data = None
+        if not parsed_data or not parsed_data.get('name'):
+            results.append((pk, "failed", None, None))
+        else:
+            results.append((pk, "parsed", parsed_data, fingerprint))
+    return results
+
+
+def replayable_chunks(chunk_size=REPLAY_CHUNK_SIZE):
+    # Paged by primary key so the writer can update rows between reads
+    last_pk = 0
+    while True:
+        rows = list(
+            models.CelestialBody.objects.filter(pk__gt=last_pk, source_responses__isnull=False)
+            .exclude(source_responses="")
+            .order_by("pk")
+            .values_list("pk", "horizons_id", "source_parser", "source_responses")[:chunk_size]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield rows
+
+
+def write_replayed(results, dry_run=False, force=False):
+    """Apply one chunk of replay results with a single upsert; returns the number of rows changed.
+
+    The observer tables of the changed rows are replaced in the same transaction with one bulk insert.
+    With ``force``, stored fingerprints are ignored and every field is compared with the re-parsed value.
+    """
+    parsed = [(pk, parsed_data, fingerprint) for pk, status, parsed_data, fingerprint in results if status == "parsed"]
+    bodies = models.CelestialBody.objects.in_bulk([pk for pk, _, _ in parsed])
+    # Parents are only linked to rows that already exist; replay never creates bodies
+    parent_names = {parsed_data.get('parent_body_name') for _, parsed_data, _ in parsed} - {None, ""}
+    parents = dict(models.CelestialBody.objects.filter(name__in=parent_names).values_list("name", "pk"))
+    changed_bodies, fields, ephemerides = [], set(), []
+    for pk, parsed_data, fingerprint in parsed:
+        body = bodies.get(pk)
+        if body is None:
+            continue
+        if parsed_data.get('parent_body_name') in parents:
+            parsed_data['parent_body_id'] = parents[parsed_data['parent_body_name']]
+        stored_fingerprint = body.content_fingerprint
+        if force:
+            body.content_fingerprint = None
+        changed = apply_parsed(body, parsed_data, fingerprint)
+        if changed == ["content_fingerprint"] and fingerprint == stored_fingerprint:
+            changed = []
+        if changed:
+            fields.update(changed)
+            changed_bodies.append(body)
+            ephemerides.append((body, parsed_data.get('observer_ephemeris')))
+    if changed_bodies and not dry_run:
+        with transaction.atomic():
+            horizons_upsert.upsert_bodies(changed_bodies, fields, REPLAY_CHUNK_SIZE)
+            horizons_ephemeris.save_observer_ephemeris(ephemerides)
+    return len(changed_bodies)
+
+
+def replay_catalog(workers=PARSE_WORKERS, chunk_size=REPLAY_CHUNK_SIZE, dry_run=False, force=False):
+    """Re-parse every row with recorded sources from the response archive, without network access.
+
+    Chunks are parsed in a process pool with at most two chunks per worker in
+    flight, and written back in the order they were read.
+    """
+    counts = dict.fromkeys(("rows", "changed", "missing", "failed"), 0)
+    workers = max(1, workers)
+    in_flight = deque()
+
+    def collect():
+        results = in_flight.popleft().result()
+        counts["rows"] += len(results)
+        for _, status, _, _ in results:
+            if status != "parsed":
+                counts[status] += 1
+        counts["changed"] += write_replayed(results, dry_run, force)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for rows in replayable_chunks(chunk_size):
+            in_flight.append(executor.submit(replay_chunk, rows))
+            if len(in_flight) >= workers * 2:
+                collect()
+        while in_flight:
+            collect()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-parse stored bodies from their archived Horizons responses, without network access."
+    )
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS, help="parse processes")
+    parser.add_argument("--chunk-size", type=int, default=REPLAY_CHUNK_SIZE, help="rows per parse task and bulk update")
+    parser.add_argument("--dry-run", action="store_true", help="count the rows that would change without writing them")
+    parser.add_argument("--force", action="store_true",
+                        help="rewrite stored values that differ from the re-parse even where the fingerprint matches")
+    args = parser.parse_args()
+
+    counts = replay_catalog(args.workers, args.chunk_size, args.dry_run, args.force)
+    print(f"Replayed {counts['rows']} bodies: {counts['changed']} {'would change' if args.dry_run else 'changed'}, "
+          f"{counts['missing']} missing from the archive, {counts['failed']} failed to parse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from a.models import FailedBody
+
+RETRY_BASE_DELAY = float(os.environ.get("HORIZONS_RETRY_BASE_DELAY", 5 * 60))
+RETRY_MAX_DELAY = float(os.environ.get("HORIZONS_RETRY_MAX_DELAY", 24 * 3600))
+# A body is quarantined once it has failed this many times in a row
+QUARANTINE_AFTER = int(os.environ.get("HORIZONS_QUARANTINE_AFTER", 5))
+
+def retry_delay(attempts):
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** max(attempts - 1, 0)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def record_failure(body_id, stage, reason):
+    body_id = str(body_id)
+    now = timezone.now()
+    with transaction.atomic():
+        entry, _ = FailedBody.objects.select_for_update().get_or_create(
+            body_id=body_id, defaults={"stage": stage, "reason": "", "last_failed": now, "next_attempt": now}
+        )
+        entry.stage = stage
+        entry.reason = str(reason)
+        entry.attempts += 1
+        entry.last_failed = now
+        entry.next_attempt = now + timedelta(seconds=retry_delay(entry.attempts))
+        entry.quarantined = entry.attempts >= QUARANTINE_AFTER
+        entry.save()
+    if entry.quarantined:
+        print(f"Body ID {body_id} quarantined after {entry.attempts} failed attempts")
+    return entry
+
+
+def record_success(body_id):
+    # Always asks the table: a sharded worker or the scheduler may have queued the body from another process
+    FailedBody.objects.filter(body_id=str(body_id)).delete()
+
+
+def has_failed(body_id):
+    return FailedBody.objects.filter(body_id=str(body_id)).exists()
+
+
+def due_body_ids(limit=None):
+    entries = FailedBody.objects.filter(quarantined=False, next_attempt__lte=timezone.now()).order_by("next_attempt")
+    body_ids = entries.values_list("body_id", flat=True)
+    return list(body_ids[:limit] if limit else body_ids)
+
+
+def quarantined_ids():
+    return set(FailedBody.objects.filter(quarantined=True).values_list("body_id", flat=True))
+
+
+def queued_ids():
+    # Pending and quarantined alike
+    return set(FailedBody.objects.values_list("body_id", flat=True))
+
+
+def skip_quarantined(body_ids):
+    quarantined = quarantined_ids()
+    return [body_id for body_id in body_ids if str(body_id) not in quarantined]
+
+
+def release(body_id):
+    """Move a quarantined body back into the retry queue with a fresh attempt count."""
+    return FailedBody.objects.filter(body_id=str(body_id)).update(
+        quarantined=False, attempts=0, next_attempt=timezone.now()
+    )
+
+
+def queue_summary():
+    entries = FailedBody.objects.all()
+    return {
+        "pending": entries.filter(quarantined=False).count(),
+        "due": entries.filter(quarantined=False, next_attempt__lte=timezone.now()).count(),
+        "quarantined": entries.filter(quarantined=True).count(),
+    }
@@ -0,0 +1,184 @@
+import os
+import argparse
+import heapq
+import math
+import time
+
+from horizons_core.cache import get_negative_cache
+from horizons_core.fetch import DEFAULT_CONCURRENCY
+from horizons_django import lazy_import
+from populate_celestial_bodies import INGEST_PROFILES, ingest_body_ids
+
+models = lazy_import("a.models")
+horizons_retry = lazy_import("horizons_retry")
+timezone = lazy_import("django.utils.timezone")
+
+REQUESTS_PER_HOUR = int(os.environ.get("HORIZONS_REQUESTS_PER_HOUR", 600))
+TICK_SECONDS = float(os.environ.get("HORIZONS_SCHEDULER_TICK", 60))
+
+# Each refresh issues one request per ingest profile
+REQUESTS_PER_REFRESH = len(INGEST_PROFILES)
+
+# Fraction of the osculating epoch's age that counts as staleness on top of the time since the last check
+EPOCH_AGE_WEIGHT = 0.05
+# One unit of refresh_priority is worth this many days of staleness
+PRIORITY_WEIGHT = 30.0
+
+# Planet semi-major axes (AU) and how strongly an orbit reaching them is perturbed
+PLANETS = [
+    ("Mercury", 0.387, 1.0),
+    ("Venus", 0.723, 1.5),
+    ("Earth", 1.000, 1.5),
+    ("Mars", 1.524, 1.0),
+    ("Jupiter", 5.203, 4.0),
+    ("Saturn", 9.537, 2.5),
+    ("Uranus", 19.19, 1.5),
+    ("Neptune", 30.07, 1.5),
+]
+
+SCORE_FIELDS = (
+    "pk", "name", "horizons_id", "last_checked", "last_updated", "epoch", "refresh_priority",
+    "mean_motion", "orbital_period", "semi_major_axis", "eccentricity", "perihelion_distance", "aphelion_distance",
+)
+
+
+def julian_day_now():
+    return time.time() / 86400.0 + 2440587.5
+
+
+def mean_motion(body):
+    # Degrees per day, from whichever orbital element the parsers managed to fill in
+    if body["mean_motion"]:
+        return abs(body["mean_motion"])
+    if body["orbital_period"]:
+        return 360.0 / (abs(body["orbital_period"]) * 365.25)
+    if body["semi_major_axis"] and body["semi_major_axis"] > 0:
+        return 0.9856076686 / body["semi_major_axis"] ** 1.5
+    return 0.0
+
+
+def planet_proximity(body):
+    """Sum of the weights of planets whose orbit lies within the body's perihelion-aphelion band."""
+    a = body["semi_major_axis"]
+    e = body["eccentricity"] or 0.0
+    perihelion = body["perihelion_distance"] or (a * (1 - e) if a else None)
+    aphelion = body["aphelion_distance"] or (a * (1 + e) if a and e < 1 else None)
+    if perihelion is None:
+        return 0.0
+    aphelion = aphelion or math.inf
+    return sum(weight for _, planet_a, weight in PLANETS if perihelion * 0.9 <= planet_a <= aphelion * 1.1)
+
+
+def drift_rate(body):
+    """Relative speed at which the body's stored elements go out of date."""
+    e = min(abs(body["eccentricity"] or 0.0), 1.0)
+    return (1.0 + mean_motion(body)) * (1.0 + e) * (1.0 + planet_proximity(body))
+
+
+def staleness_days(body, now, jd_now):
+    checked = max(filter(None, (body["last_checked"], body["last_updated"])), default=None)
+    days = (now - checked).total_seconds() / 86400.0 if checked else 365.0
+    if body["epoch"]:
+        days += EPOCH_AGE_WEIGHT * abs(jd_now - body["epoch"])
+    return max(days, 0.0)
+
+
+def refresh_score(body, now=None, jd_now=None):
+    now = now or timezone.now()
+    jd_now = jd_now or julian_day_now()
+    return staleness_days(body, now, jd_now) * drift_rate(body) + PRIORITY_WEIGHT * body["refresh_priority"]
+
+
+def rank_bodies(limit):
+    now, jd_now = timezone.now(), julian_day_now()
+    bodies = models.CelestialBody.objects.exclude(horizons_id__isnull=True).exclude(horizons_id="").values(*SCORE_FIELDS)
+    return heapq.nlargest(limit, bodies.iterator(), key=lambda body: refresh_score(body, now, jd_now))
+
+
+def refresh_most_stale(count, concurrency=DEFAULT_CONCURRENCY):
+    # Ask for extra candidates so skipped IDs do not shrink the batch
+    candidates = rank_bodies(count * 2)
+    # Failed bodies wait for the retry pass and its backoff, and IDs Horizons no longer resolves wait for the
+    # negative cache to expire; otherwise they would stay on top of the ranking and be fetched every round
+    skipped = horizons_retry.queued_ids() | get_negative_cache().ids()
+    horizons_ids = [body["horizons_id"] for body in candidates if body["horizons_id"] not in skipped][:count]
+    if not horizons_ids:
+        return 0
+    # The most stale bodies are the likeliest to still have a cached response, so the cache is bypassed
+    stored = ingest_body_ids(horizons_ids, concurrency, refresh=True)
+    # ingest_body_ids stamped last_checked on the stored bodies; only they drop down the ranking
+    models.CelestialBody.objects.filter(horizons_id__in=stored).update(refresh_priority=0)
+    return len(horizons_ids)
+
+
+def bump_priority(identifier, amount=1.0):
+    from django.db.models import F, Q
+
+    # Horizons IDs and database IDs are both numeric, so the first kind that matches wins
+    lookups = [Q(horizons_id=identifier), Q(name__iexact=identifier)]
+    if identifier.isdigit():
+        lookups.append(Q(pk=int(identifier)))
+    for lookup in lookups:
+        updated = models.CelestialBody.objects.filter(lookup).update(refresh_priority=F("refresh_priority") + amount)
+        if updated:
+            return updated
+    return 0
+
+
+def run_scheduler(requests_per_hour=REQUESTS_PER_HOUR, tick=TICK_SECONDS, concurrency=DEFAULT_CONCURRENCY):
+    """Refresh the highest-scoring bodies forever, spending at most ``requests_per_hour``."""
+    allowance = 0.0
+    last = time.monotonic()
+    while True:
+        now = time.monotonic()
+        # Unspent budget carries over for at most one hour
+        allowance = min(allowance + (now - last) * requests_per_hour / 3600.0, float(requests_per_hour))
+        last = now
+        count = int(allowance // REQUESTS_PER_REFRESH)
+        if count:
+            refreshed = refresh_most_stale(count, concurrency)
+            allowance -= refreshed * REQUESTS_PER_REFRESH
+            if refreshed:
+                print(f"Refreshed {refreshed} bodies; {allowance:.0f} requests of budget left")
+        time.sleep(tick)
+
+
+def print_ranking(limit):
+    now, jd_now = timezone.now(), julian_day_now()
+    for body in rank_bodies(limit):
+        print(f"{body['horizons_id']:>10}  {body['name']:<30} score={refresh_score(body, now, jd_now):10.1f} "
+              f"stale={staleness_days(body, now, jd_now):7.1f}d drift={drift_rate(body):6.2f} "
+              f"priority={body['refresh_priority']:g}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continuously refresh the most out-of-date celestial bodies.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="refresh bodies forever within a request budget")
+    run.add_argument("--requests-per-hour", type=int, default=REQUESTS_PER_HOUR)
+    run.add_argument("--tick", type=float, default=TICK_SECONDS, help="seconds between scheduling rounds")
+    run.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+
+    top = commands.add_parser("top", help="show the bodies that would be refreshed next")
+    top.add_argument("-n", type=int, default=20)
+
+    bump = commands.add_parser("bump", help="raise a body's refresh priority")
+    bump.add_argument("identifier", help="database ID, Horizons ID or name")
+    bump.add_argument("--amount", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        try:
+            run_scheduler(args.requests_per_hour, args.tick, args.concurrency)
+        except KeyboardInterrupt:
+            print("Scheduler stopped.")
+    elif args.command == "top":
+        print_ranking(args.n)
+    elif args.command == "bump":
+        updated = bump_priority(args.identifier, args.amount)
+        print(f"Raised refresh priority for {updated} bodies" if updated else f"No body matches {args.identifier}")
+
+
+if __name__ == "__main__":
+    main()
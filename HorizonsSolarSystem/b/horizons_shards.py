@@ -0,0 +1,180 @@
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from a.models import IngestShard
+from horizons_journal import start_run
+
+SHARD_SIZE = int(os.environ.get("HORIZONS_SHARD_SIZE", 1000))
+LEASE_SECONDS = float(os.environ.get("HORIZONS_LEASE_SECONDS", 300))
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def plan_shards(start_id, end_id, shard_size=SHARD_SIZE):
+    """Split ``start_id..end_id`` into shards; ranges already in the table are left as they are."""
+    shards = [
+        IngestShard(start_id=first, end_id=min(first + shard_size - 1, end_id))
+        for first in range(start_id, end_id + 1, shard_size)
+    ]
+    IngestShard.objects.bulk_create(shards, ignore_conflicts=True)
+    return len(shards)
+
+
+def _claimable(now):
+    return Q(status="pending") | Q(status="leased", lease_expires__lt=now)
+
+
+def claim_shard(owner, lease_seconds=LEASE_SECONDS):
+    """Lease the next free or expired shard to ``owner``, or return None when none is left.
+
+    The claim is a conditional UPDATE, so two workers racing for the same
+    shard cannot both win, on any database backend.
+    """
+    while True:
+        now = timezone.now()
+        candidate = IngestShard.objects.filter(_claimable(now)).order_by("start_id").values_list("pk", "claims").first()
+        if candidate is None:
+            return None
+        pk, claims = candidate
+        claimed = IngestShard.objects.filter(_claimable(now), pk=pk, claims=claims).update(
+            status="leased", owner=owner, lease_expires=now + timedelta(seconds=lease_seconds), claims=claims + 1
+        )
+        if claimed:
+            return IngestShard.objects.get(pk=pk)
+
+
+def shard_run(shard, owner):
+    """The shard's ``IngestRun``, started on its first claim; None if the lease was lost meanwhile.
+
+    The run is kept on the shard row, so a worker that reclaims an expired
+    shard continues the crashed worker's journal instead of fetching the
+    whole shard again.
+    """
+    if shard.run_id is not None:
+        return shard.run
+    with transaction.atomic():
+        run = start_run(shard.start_id, shard.end_id)
+        attached = IngestShard.objects.filter(
+            pk=shard.pk, owner=owner, status="leased", claims=shard.claims, run__isnull=True
+        ).update(run=run)
+        if not attached:
+            transaction.set_rollback(True)
+            return None
+    shard.run = run
+    return run
+
+
+def heartbeat(shard, owner, lease_seconds=LEASE_SECONDS):
+    """Extend the lease; False means it expired and another worker may have taken the shard."""
+    return bool(
+        IngestShard.objects.filter(pk=shard.pk, owner=owner, status="leased", claims=shard.claims).update(
+            lease_expires=timezone.now() + timedelta(seconds=lease_seconds)
+        )
+    )
+
+
+def complete_shard(shard, owner):
+    return bool(
+        IngestShard.objects.filter(pk=shard.pk, owner=owner, status="leased", claims=shard.claims).update(
+            status="done", lease_expires=None, completed_at=timezone.now()
+        )
+    )
+
+
+def release_shard(shard, owner):
+    return bool(
+        IngestShard.objects.filter(pk=shard.pk, owner=owner, status="leased", claims=shard.claims).update(
+            status="pending", owner=None, lease_expires=None
+        )
+    )
+
+
+def shard_summary():
+    now = timezone.now()
+    shards = IngestShard.objects.all()
+    return {
+        "pending": shards.filter(status="pending").count(),
+        "leased": shards.filter(status="leased", lease_expires__gte=now).count(),
+        "expired": shards.filter(status="leased", lease_expires__lt=now).count(),
+        "done": shards.filter(status="done").count(),
+    }
+
+
+class ShardLease:
+    """Keeps a claimed shard's lease alive from a background thread.
+
+    Heartbeats run every third of the lease. If one fails the lease is
+    treated as lost and ``guard`` stops handing out body IDs, so the shard
+    is not fetched twice once another worker has picked it up.
+    """
+
+    def __init__(self, shard, owner, lease_seconds=LEASE_SECONDS):
+        self.shard = shard
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name="horizons-lease", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+    def guard(self, body_ids):
+        for body_id in body_ids:
+            if self.lost.is_set():
+                return
+            yield body_id
+
+    def _beat(self):
+        try:
+            while not self._stop.wait(self.lease_seconds / 3):
+                if not heartbeat(self.shard, self.owner, self.lease_seconds):
+                    self.lost.set()
+                    return
+        finally:
+            # The heartbeat thread has its own database connection
+            connection.close()
+
+
+def run_worker(ingest_range, owner=None, lease_seconds=LEASE_SECONDS, max_shards=None):
+    """Claim shards until none are left, calling ``ingest_range(start_id, end_id, guard, run)`` for each.
+
+    ``run`` is the shard's ``IngestRun``; ``ingest_range`` should fetch only
+    its remaining IDs, which are all of them unless the shard was reclaimed.
+    """
+    owner = owner or worker_name()
+    processed = 0
+    while max_shards is None or processed < max_shards:
+        shard = claim_shard(owner, lease_seconds)
+        if shard is None:
+            break
+        print(f"{owner} claimed shard {shard.start_id}-{shard.end_id}")
+        run = shard_run(shard, owner)
+        if run is None:
+            print(f"{owner} lost the lease on shard {shard.start_id}-{shard.end_id}")
+            continue
+        try:
+            with ShardLease(shard, owner, lease_seconds) as lease:
+                ingest_range(shard.start_id, shard.end_id, lease.guard, run)
+        except BaseException:
+            release_shard(shard, owner)
+            raise
+        if lease.lost.is_set():
+            print(f"{owner} lost the lease on shard {shard.start_id}-{shard.end_id}")
+        elif complete_shard(shard, owner):
+            processed += 1
+    return processed
@@ -0,0 +1,2 @@
+# Moved to horizons_core.stream; this module keeps the old import path working
+from horizons_core.stream import *  # noqa: F401,F403
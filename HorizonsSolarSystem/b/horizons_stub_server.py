@@ -0,0 +1,212 @@
+import argparse
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from horizons_core.cache import ResponseCache
+from horizons_core.client import JPL_BASE_URL
+from horizons_synthetic import DEFAULT_DENSITY, no_match_response, strip_quotes, synthetic_response
+
+DEFAULT_PORT = 8765
+API_PATH = "/api/horizons.api"
+
+
+def parse_latency(spec):
+    """Build a delay function from ``fixed:S``, ``uniform:LO,HI`` or ``lognormal:MEDIAN,SIGMA`` (seconds)."""
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda rng: values[0] if values else 0.0
+    if kind == "uniform":
+        low, high = values
+        return lambda rng: rng.uniform(low, high)
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda rng: median * rng.lognormvariate(0, sigma)
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class ResponseSource:
+    """Finds the body for a query: recorded files, then the response cache, then synthetic output.
+
+    Recorded files are looked up as ``<COMMAND>.<EPHEM_TYPE>.txt`` and then
+    ``<COMMAND>.txt`` in ``directory``. Cached responses are matched on the
+    exact query as it was sent to the real API.
+    """
+
+    def __init__(self, directory=None, cache_dir=None, synthetic=True, density=DEFAULT_DENSITY):
+        self.directory = directory
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.synthetic = synthetic
+        self.density = density
+
+    def lookup(self, params):
+        command = strip_quotes(params.get("COMMAND"))
+        if self.directory:
+            ephem_type = strip_quotes(params.get("EPHEM_TYPE", "OBSERVER")).lower()
+            for name in (f"{command}.{ephem_type}.txt", f"{command}.txt"):
+                path = os.path.join(self.directory, name)
+                if os.path.isfile(path):
+                    with open(path, encoding="utf-8", errors="replace") as f:
+                        return f.read()
+        if self.cache is not None:
+            text = self.cache.get(JPL_BASE_URL, params, ignore_ttl=True)
+            if text is not None:
+                return text
+        if self.synthetic:
+            return synthetic_response(params, self.density)
+        return no_match_response(command)
+
+
+class StubStats:
+    def __init__(self):
+        self.counts = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def count(self, outcome):
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+
+    def report(self):
+        with self._lock:
+            total = sum(self.counts.values())
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            outcomes = " ".join(f"{k}={v}" for k, v in sorted(self.counts.items()))
+        return f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s) {outcomes}"
+
+
+class HorizonsStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, source, latency=None, error_rate=0.0, truncate_rate=0.0, throttle_rate=0.0,
+                 max_rps=None, seed=None, quiet=True):
+        super().__init__(address, HorizonsStubHandler)
+        self.source = source
+        self.latency = latency or parse_latency("fixed:0")
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.throttle_rate = throttle_rate
+        self.bucket = TokenBucket(max_rps) if max_rps else None
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.quiet = quiet
+        self.stats = StubStats()
+
+    def draw(self):
+        # One lock-protected draw per request keeps runs reproducible for a given seed
+        with self.random_lock:
+            return self.random.random(), self.latency(self.random), self.random.choice((500, 502, 503, 504))
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is routine under load
+        if not self.quiet:
+            super().handle_error(request, client_address)
+
+
+class HorizonsStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path != API_PATH:
+            return self._reply(404, "Not found\n", "not_found")
+        params = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+
+        if server.bucket is not None and not server.bucket.take():
+            return self._reply(429, "Too many requests\n", "rate_limited", {"Retry-After": "1"})
+        roll, delay, error_status = server.draw()
+        time.sleep(delay)
+
+        if roll < server.throttle_rate:
+            return self._reply(429, "Too many requests\n", "throttled", {"Retry-After": "1"})
+        roll -= server.throttle_rate
+        if roll < server.error_rate:
+            return self._reply(error_status, "Injected server error\n", f"http_{error_status}")
+        roll -= server.error_rate
+        text = server.source.lookup(params)
+        if roll < server.truncate_rate:
+            return self._reply(200, text, "truncated", truncate=True)
+        self._reply(200, text, "ok")
+
+    def _reply(self, status, text, outcome, headers=None, truncate=False):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if truncate:
+            # Advertise the full length, send part of it and drop the connection
+            self.send_header("Connection", "close")
+            self.close_connection = True
+            body = body[:len(body) // 2]
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.stats.count(outcome)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve Horizons API responses locally. Point the ingesters at it with "
+                    f"HORIZONS_BASE_URL=http://127.0.0.1:{DEFAULT_PORT}{API_PATH}"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--responses", help="directory of recorded responses named <COMMAND>[.<EPHEM_TYPE>].txt")
+    parser.add_argument("--cache-dir", help="replay responses from a Horizons response cache directory")
+    parser.add_argument("--no-synthetic", action="store_true", help="answer 'No matches found' instead of synthesizing")
+    parser.add_argument("--density", type=float, default=DEFAULT_DENSITY, help="share of IDs that resolve when synthesizing")
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 5xx")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="share of bodies cut off mid-response")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument("--max-rps", type=float, help="answer 429 above this many requests per second")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    source = ResponseSource(args.responses, args.cache_dir, not args.no_synthetic, args.density)
+    server = HorizonsStubServer(
+        (args.host, args.port), source, parse_latency(args.latency), args.error_rate, args.truncate_rate,
+        args.throttle_rate, args.max_rps, args.seed, quiet=not args.verbose,
+    )
+    print(f"Serving Horizons stub on http://{args.host}:{server.server_port}{API_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(server.stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+# Roughly the share of integer IDs that resolve to an object in a sparse range
+DEFAULT_DENSITY = 0.35
+
+API_PREAMBLE = "API VERSION: 1.2\nAPI SOURCE: NASA/JPL Horizons API\n\n"
+RULE = "*" * 79
+
+CONSTELLATIONS = ["Ari", "Tau", "Gem", "Cnc", "Leo", "Vir", "Lib", "Sco", "Sgr", "Cap", "Aqr", "Psc"]
+
+
+def julian_day(moment):
+    return moment.toordinal() + 1721424.5 + (moment.hour * 3600 + moment.minute * 60 + moment.second) / 86400.0
+
+
+def strip_quotes(value):
+    return str(value or "").strip().strip("'").strip()
+
+
+def synthetic_body(body_id, density=DEFAULT_DENSITY):
+    """Deterministic made-up object for ``body_id``, or None if the ID should not resolve."""
+    body_id = int(body_id)
+    rng = random.Random(body_id)
+    if rng.random() > density:
+        return None
+    kind = "major" if body_id < 1000 else ("comet" if rng.random() < 0.1 else "asteroid")
+    a = rng.uniform(0.4, 45.0) if kind != "asteroid" else rng.uniform(1.8, 3.6)
+    e = rng.uniform(0.55, 0.98) if kind == "comet" else rng.uniform(0.0, 0.3)
+    return {
+        "id": body_id,
+        "kind": kind,
+        "name": f"Synthetic {body_id}",
+        "radius": rng.uniform(1000, 70000) if kind == "major" else rng.uniform(0.5, 300),
+        "density": rng.uniform(0.8, 5.5),
+        "mass": rng.uniform(0.1, 20000),
+        "gm": rng.uniform(0.01, 1.3e8),
+        "albedo": rng.uniform(0.03, 0.7),
+        "rotation": rng.uniform(2, 1000),
+        "temperature": rng.uniform(40, 700),
+        "H": rng.uniform(3, 22),
+        "a": a,
+        "e": e,
+        "i": rng.uniform(0, 35) if kind != "comet" else rng.uniform(0, 170),
+        "node": rng.uniform(0, 360),
+        "peri": rng.uniform(0, 360),
+        "ma": rng.uniform(0, 360),
+    }
+
+
+def _physical_block(body):
+    if body["kind"] == "major":
+        return "\n".join([
+            RULE,
+            f" Revised: Jan 01, 2020             {body['name']:<36}{body['id']:>5}",
+            "",
+            " PHYSICAL DATA:",
+            f"  Vol. mean radius (km) = {body['radius']:.2f}+-0.04   Density (g/cm^3)      =  {body['density']:.3f}",
+            f"  Mass x10^23 (kg)      =    {body['mass']:.4f}       Flattening, f         =  1/{300 * body['albedo']:.3f}",
+            f"  Volume (x10^10 km^3)  =   {body['radius'] ** 3 * 4.18879e-10:.3f}        Equatorial radius (km)=  {body['radius'] * 1.002:.2f}",
+            f"  Sidereal rot. period  =   {body['rotation']:.6f} hr  Sid. rot. rate, rad/s =  {2 * math.pi / (body['rotation'] * 3600):.10f}",
+            f"  Mean solar day (sol)  =   {body['rotation'] * 3600:.5f} s Polar gravity m/s^2   =  {body['density']:.3f}",
+            f"  Core radius (km)      =  ~{body['radius'] / 2:.0f}          Equ. gravity  m/s^2   =  {body['density'] * 0.98:.2f}",
+            f"  Geometric Albedo      =    {body['albedo']:.3f}",
+            "",
+            f"  GM (km^3/s^2)         = {body['gm']:.6f}    Mass ratio (Sun/{body['name']}) = {1.327e11 / body['gm']:.2f}",
+            "  GM 1-sigma (km^3/s^2) = +- 0.00028      Mass of atmosphere, kg= ~ 2.5 x 10^16",
+            f"  Mean temperature (K)  =  {body['temperature']:.0f}            Atmos. pressure (bar) =    0.0056",
+            f"  Obliquity to orbit    =   {body['i']:.2f} deg     Max. angular diam.    =  25.6\"",
+            f"  Mean sidereal orb per =    {body['a'] ** 1.5:.8f} y Visual mag. V(1,0)    =   {-body['H'] / 10:.2f}",
+            f"  Mean sidereal orb per =  {body['a'] ** 1.5 * 365.25:.2f} d       Orbital speed,  km/s  =  {29.78 / math.sqrt(body['a']):.2f}",
+            f"  Hill's sphere rad. Rp =  {body['a'] * 200:.1f}          Escape speed, km/s    =   {body['density'] * 1.3:.3f}",
+            "                                 Perihelion  Aphelion    Mean",
+            f"  Solar Constant (W/m^2)         {1361 / (body['a'] * (1 - body['e'])) ** 2:.0f}         "
+            f"{1361 / (body['a'] * (1 + body['e'])) ** 2:.0f}         {1361 / body['a'] ** 2:.0f}",
+            "  Maximum Planetary IR (W/m^2)   470         315         390",
+            "  Minimum Planetary IR (W/m^2)    30          30          30",
+            RULE,
+        ])
+    label = "ASTEROID" if body["kind"] == "asteroid" else "COMET"
+    q = body["a"] * (1 - body["e"])
+    return "\n".join([
+        RULE,
+        f"JPL/HORIZONS                      {body['name']:<28}2024-Sep-19 09:15:44",
+        f"Rec #:{body['id']:>9} (+COV) Soln.date: 2024-Jun-25_11:43:38   # obs: 9130 (1893-2024)",
+        "",
+        "IAU76/J2000 helio. ecliptic osc. elements (au, days, deg., period=Julian yrs):",
+        "",
+        "  EPOCH=  2460400.5 ! 2024-Mar-31.00 (TDB)         Residual RMS= .28644",
+        f"   EC= {body['e']:.16f}   QR= {q:.15f}   TP= 2460112.9999045366",
+        f"   OM= {body['node']:.13f}   W=  {body['peri']:.13f}   IN= {body['i']:.14f}",
+        f"   A= {body['a']:.15f}    MA= {body['ma']:.13f}   ADIST= {body['a'] * (1 + body['e']):.15f}",
+        f"   PER= {body['a'] ** 1.5:.7f}          N= {0.9856076686 / body['a'] ** 1.5:.9f}           ANGMOM= .017515653",
+        "",
+        f"{label.title()} physical parameters (km, seconds, rotational period in hours):",
+        f"   GM= {body['gm'] * 1e-9:.3E}            RAD= {body['radius']:.2f}               ROTPER= {body['rotation']:.2f}",
+        f"   H= {body['H']:.2f}                G= .150",
+        f"                           ALBEDO= {body['albedo']:.3f}",
+        "",
+        f"{label} comments: ",
+        "1: soln ref.= JPL#659, OCC=0",
+        RULE,
+    ])
+
+
+def _window(params):
+    start = datetime.strptime(strip_quotes(params.get("START_TIME")) or "2023-01-01", "%Y-%m-%d")
+    stop = datetime.strptime(strip_quotes(params.get("STOP_TIME")) or "2023-01-02", "%Y-%m-%d")
+    step = strip_quotes(params.get("STEP_SIZE")) or "1 d"
+    count, _, unit = step.partition(" ")
+    days = float(count) * {"d": 1, "h": 1 / 24, "m": 1 / 1440}.get(unit[:1] or "d", 1)
+    moment = start
+    while moment <= stop:
+        yield moment
+        moment += timedelta(days=days)
+
+
+def _ephemeris_preamble(body, center, start, stop, extra):
+    # As in Horizons, comets are named without their record number
+    target = body['name'] if body['kind'] == "comet" else f"{body['name']} ({body['id']})"
+    lines = [
+        RULE,
+        "Ephemeris / API_USER Thu Sep 19 09:12:30 2024 Pasadena, USA      / Horizons",
+        RULE,
+        f"Target body name: {target}              {{source: synthetic}}",
+        f"Center body name: {center}",
+        "Center-site name: BODY CENTER",
+        RULE,
+        f"Start time      : A.D. {start:%Y-%b-%d} 00:00:00.0000 TDB",
+        f"Stop  time      : A.D. {stop:%Y-%b-%d} 00:00:00.0000 TDB",
+        "Step-size       : 1440 minutes",
+        RULE,
+    ]
+    return lines + extra + [RULE]
+
+
+def _elements_table(body, moments):
+    rng = random.Random(body["id"] * 7919)
+    n = 0.9856076686 / body["a"] ** 1.5
+    q = body["a"] * (1 - body["e"])
+    first = julian_day(moments[0]) if moments else 0
+    for moment in moments:
+        jd = julian_day(moment)
+        ma = (body["ma"] + n * (jd - first)) % 360
+        e = body["e"] + rng.gauss(0, 1e-7)
+        yield f"{jd:.9f} = A.D. {moment:%Y-%b-%d %H:%M:%S}.0000 TDB "
+        yield f" EC= {e:.15E} QR= {q:.15E} IN= {body['i']:.15E}"
+        yield f" OM= {body['node']:.15E} W = {body['peri']:.15E} Tp=  2459751.232546025049"
+        yield f" N = {n:.15E} MA= {ma:.15E} TA= {(ma + 2 * e * 57.3) % 360:.15E}"
+        yield f" A = {body['a']:.15E} AD= {body['a'] * (1 + body['e']):.15E} PR= {360 / n:.15E}"
+
+
+def _observer_table(body, moments):
+    rng = random.Random(body["id"] * 104729)
+    ra = rng.uniform(0, 24)
+    dec = rng.uniform(-30, 30)
+    for index, moment in enumerate(moments):
+        ra_now = (ra + index * 0.01) % 24
+        ra_h, ra_m = int(ra_now), (ra_now % 1) * 60
+        dec_sign = "+" if dec >= 0 else "-"
+        dec_d, dec_m = int(abs(dec)), (abs(dec) % 1) * 60
+        delta = body["a"] + rng.uniform(-0.5, 0.5)
+        yield (
+            f" {moment:%Y-%b-%d %H:%M}     {ra_h:02d} {int(ra_m):02d} {(ra_m % 1) * 60:05.2f} "
+            f"{dec_sign}{dec_d:02d} {int(dec_m):02d} {(dec_m % 1) * 60:04.1f}"
+            f"  {body['H'] / 2 - 1:6.2f}  {rng.uniform(3, 8):6.3f} {delta:17.14f} {rng.uniform(-20, 20):11.7f}"
+            f"  {rng.uniform(0, 180):8.4f} /{'TL'[index % 2]} {rng.uniform(0, 60):8.4f}   "
+            f"{CONSTELLATIONS[int(ra_now / 2) % 12]}"
+        )
+
+
+def no_match_response(command):
+    return API_PREAMBLE + f"\n Horizons> {command}\n\n No matches found.\n"
+
+
+def synthetic_response(params, density=DEFAULT_DENSITY):
+    command = strip_quotes(params.get("COMMAND"))
+    try:
+        body = synthetic_body(command, density)
+    except ValueError:
+        body = None
+    if body is None:
+        return no_match_response(command)
+
+    parts = [API_PREAMBLE]
+    if strip_quotes(params.get("OBJ_DATA", "YES")).upper() == "YES":
+        parts.append(_physical_block(body))
+    if strip_quotes(params.get("MAKE_EPHEM", "YES")).upper() != "YES":
+        return "\n".join(parts) + "\n"
+
+    moments = list(_window(params))
+    start, stop = moments[0], moments[-1]
+    if strip_quotes(params.get("EPHEM_TYPE")).upper() == "ELEMENTS":
+        extra = [
+            "Keplerian GM    : 1.3271248287031293E+11 km^3/s^2",
+            "Output units    : AU-D, deg, Julian Day Number (Tp)",
+            "Calendar mode   : Mixed Julian/Gregorian",
+            "Output type     : GEOMETRIC osculating elements",
+            "Output format   : 10",
+            "Reference frame : Ecliptic of J2000.0",
+        ]
+        parts.extend(_ephemeris_preamble(body, "Sun (10)", start, stop, extra))
+        parts.extend(["JDTDB", "   EC    QR   IN", "   OM    W    Tp", "   N     MA   TA", "   A     AD   PR", RULE])
+        table = _elements_table(body, moments)
+    else:
+        extra = [
+            "Target pole/equ : IAU_SYNTHETIC                   {East-longitude positive}",
+            f"Target radii    : {body['radius']:.2f}, {body['radius']:.2f}, {body['radius'] * 0.99:.2f} km     {{Equator_a, b, pole_c}}",
+            "Center geodetic : 0.0, 0.0, -6378.137             {E-lon(deg),Lat(deg),Alt(km)}",
+            "Center cylindric: 0.0, 0.0, 0.0                   {E-lon(deg),Dxy(km),Dz(km)}",
+            "Center pole/equ : ITRF93                          {East-longitude positive}",
+            "Center radii    : 6378.137, 6378.137, 6356.752 km {Equator, meridian, pole}",
+            "Target primary  : Sun",
+            "Vis. interferer : MOON (R_eq= 1737.400) km        {source: synthetic}",
+            "Rel. light bend : Sun                             {source: synthetic}",
+            "Rel. lght bnd GM: 1.3271E+11 km^3/s^2",
+            "Atmos refraction: NO (AIRLESS)",
+            "RA format       : HMS",
+            "Time format     : CAL",
+            "Calendar mode   : Mixed Julian/Gregorian",
+            "EOP file        : eop.240918.p241215",
+            "EOP coverage    : DATA-BASED 1962-JAN-20 TO 2024-SEP-18. PREDICTS-> 2024-DEC-14",
+            "Units conversion: 1 au= 149597870.700 km, c= 299792.458 km/s, 1 day= 86400.0 s",
+            "Table cut-offs 1: Elevation (-90.0deg=NO ),Airmass (>38.000=NO), Daylight (NO )",
+            "Table cut-offs 2: Solar elongation (  0.0,180.0=NO ),Local Hour Angle( 0.0=NO )",
+            "Table cut-offs 3: RA/DEC angular rate (     0.0=NO )",
+        ]
+        parts.extend(_ephemeris_preamble(body, "Earth (399)", start, stop, extra))
+        parts.append(
+            " Date__(UT)__HR:MN     R.A._____(ICRF)_____DEC    APmag   S-brt             delta      deldot"
+            "     S-O-T /r     S-T-O Cnst"
+        )
+        parts.append(RULE)
+        table = _observer_table(body, moments)
+    parts.append("$$SOE")
+    parts.extend(table)
+    parts.extend(["$$EOE", RULE, ""])
+    return "\n".join(parts)
+
+
+def synthetic_corpus(count, start_id=1, density=DEFAULT_DENSITY, **window):
+    """Yield (body_id, text) for ``count`` resolvable IDs, combining observer and elements responses."""
+    body_id = start_id
+    produced = 0
+    while produced < count:
+        if synthetic_body(body_id, density) is not None:
+            common = {"COMMAND": f"'{body_id}'", "START_TIME": window.get("start", "2023-01-01"),
+                      "STOP_TIME": window.get("stop", "2023-02-01"), "STEP_SIZE": window.get("step", "1 d")}
+            observer = synthetic_response(dict(common, EPHEM_TYPE="OBSERVER"), density)
+            elements = synthetic_response(dict(common, EPHEM_TYPE="ELEMENTS", OBJ_DATA="NO"), density)
+            yield body_id, observer + "\n" + elements
+            produced += 1
+        body_id += 1
@@ -0,0 +1,155 @@
+from django.db import transaction
+
+from a.models import CelestialBody
+from horizons_core.cache import get_source_archive
+from horizons_core.changes import apply_parsed
+from horizons_ephemeris import save_observer_ephemeris
+from horizons_pipeline import WRITE_BATCH_SIZE
+
+
+def upsert_bodies(bodies, fields, batch_size=WRITE_BATCH_SIZE):
+    """Write new and changed ``CelestialBody`` instances with one ``INSERT ... ON CONFLICT (id) DO UPDATE``.
+
+    New instances are inserted whole; instances that already have an id
+    only overwrite ``fields``. ``last_updated`` is always written, since
+    the insert runs its ``auto_now``.
+    """
+    if not bodies:
+        return
+    pk_name = CelestialBody._meta.pk.name
+    CelestialBody.objects.bulk_create(
+        bodies, batch_size=batch_size, update_conflicts=True, unique_fields=[pk_name],
+        update_fields=sorted(set(fields) | {"last_updated"}),
+    )
+
+
+def upsert_parsed(parsed, dry_run=False, batch_size=WRITE_BATCH_SIZE, create_parents=False):
+    """Insert or update ``CelestialBody`` rows for ``(parsed_data, fingerprint)`` pairs; returns ``{name: (body, status)}``.
+
+    Existing rows are read with one query and matched by name, then every
+    new or changed row goes through one ``upsert_bodies`` and the observer
+    tables are replaced, all in one transaction. ``status`` is
+    ``"created"``, ``"updated"`` or ``"unchanged"``. Parents missing from
+    the table are linked once a row of that name exists in the same batch,
+    or created as bare rows with ``create_parents``.
+    """
+    # A later entry for the same name wins; the lowest id wins among duplicate stored rows
+    latest = {parsed_data['name']: (parsed_data, fingerprint) for parsed_data, fingerprint in parsed}
+    existing = {}
+    for body in CelestialBody.objects.filter(name__in=latest).order_by('-pk'):
+        existing[body.name] = body
+    parent_names = {parsed_data.get('parent_body_name') for parsed_data, _ in latest.values()} - {None, ""}
+    parents = dict(CelestialBody.objects.filter(name__in=parent_names).values_list("name", "pk"))
+    results, written, fields, ephemerides, orphans, sources = {}, [], set(), [], [], []
+    for name, (parsed_data, fingerprint) in latest.items():
+        body = existing.get(name) or CelestialBody(name=name)
+        created = body.pk is None
+        parent_name = parsed_data.get('parent_body_name')
+        if parent_name in parents:
+            parsed_data['parent_body_id'] = parents[parent_name]
+        elif parent_name:
+            orphans.append((body, parent_name))
+        changed = apply_parsed(body, parsed_data, fingerprint)
+        if not changed:
+            results[name] = (body, "unchanged")
+            continue
+        if not created:
+            fields.update(changed)
+        written.append(body)
+        ephemerides.append((body, parsed_data.get('observer_ephemeris')))
+        sources.extend(parsed_data.get('source_texts', ()))
+        results[name] = (body, "created" if created else "updated")
+    if dry_run:
+        return results
+    # The responses a written row names in source_responses are archived before the row lands
+    archive = get_source_archive()
+    for text in sources:
+        archive.put_text(text)
+    with transaction.atomic():
+        if create_parents:
+            missing = {parent_name for _, parent_name in orphans} - set(latest)
+            parents.update((body.name, body.pk) for body in CelestialBody.objects.bulk_create(
+                [CelestialBody(name=parent_name) for parent_name in sorted(missing)], batch_size=batch_size
+            ))
+            for body, parent_name in orphans:
+                if parent_name in parents:
+                    body.parent_body_id = parents[parent_name]
+                    fields.add("parent_body_id")
+        upsert_bodies(written, fields, batch_size)
+        # Parents written in this same batch only have an id now
+        parents.update((body.name, body.pk) for body in written)
+        linked = []
+        for body, parent_name in orphans:
+            if body.parent_body_id is None and parent_name in parents:
+                body.parent_body_id = parents[parent_name]
+                linked.append(body)
+        if linked:
+            CelestialBody.objects.bulk_update(linked, ["parent_body"], batch_size=batch_size)
+        save_observer_ephemeris(ephemerides)
+    return results
+
+
+class CelestialBodyWriter:
+    """Buffer of parsed bodies written to ``CelestialBody`` ``batch_size`` at a time.
+
+    Replaces a lookup, a ``save()`` and a commit per body with one read and
+    one upsert per batch. Each entry carries a key, usually the Horizons
+    ID; ``on_written(key, body, status)`` and ``on_failed(key, error)`` run
+    once the batch's own transaction has ended. Inside a caller's
+    ``transaction.atomic()``, as in ``horizons.write_parsed_bodies``, that is
+    only a savepoint and the callbacks run before anything is committed, so
+    records they write belong in the same transaction and roll back with it.
+    If a batch fails, its entries are retried one at a time so one bad row
+    does not lose the others.
+    """
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE, on_written=None, on_failed=None, dry_run=False, create_parents=False):
+        self.batch_size = batch_size
+        self.on_written = on_written
+        self.on_failed = on_failed
+        self.dry_run = dry_run
+        self.create_parents = create_parents
+        self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def add(self, key, parsed_data, fingerprint):
+        self._pending.append((key, parsed_data, fingerprint))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered entries; returns ``(key, body, status)`` for each entry that was stored."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return []
+        try:
+            outcomes = self._write(pending)
+        except Exception:
+            outcomes = []
+            for entry in pending:
+                try:
+                    outcomes.extend(self._write([entry]))
+                except Exception as e:
+                    outcomes.append((entry[0], None, e))
+        stored = []
+        for key, body, outcome in outcomes:
+            if body is None:
+                if self.on_failed is not None:
+                    self.on_failed(key, outcome)
+                continue
+            stored.append((key, body, outcome))
+            if self.on_written is not None:
+                self.on_written(key, body, outcome)
+        return stored
+
+    def _write(self, pending):
+        results = upsert_parsed(
+            [(parsed_data, fingerprint) for _, parsed_data, fingerprint in pending],
+            self.dry_run, self.batch_size, self.create_parents,
+        )
+        return [(key, *results[parsed_data['name']]) for key, parsed_data, _ in pending]
@@ -0,0 +1,48 @@
+import argparse
+
+from horizons_core.fetch import DEFAULT_CONCURRENCY
+from horizons_django import lazy_import
+from populate_celestial_bodies import populate_celestial
+
+horizons_shards = lazy_import("horizons_shards")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Split Horizons ID ranges into leased shards and ingest them from any number of workers."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan = commands.add_parser("plan", help="add shards covering an ID range to the lease table")
+    plan.add_argument("start_id", type=int)
+    plan.add_argument("end_id", type=int)
+    plan.add_argument("--shard-size", type=int, default=horizons_shards.SHARD_SIZE)
+
+    run = commands.add_parser("run", help="claim and ingest shards until none are left")
+    run.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    run.add_argument("--lease-seconds", type=float, default=horizons_shards.LEASE_SECONDS)
+    run.add_argument("--max-shards", type=int)
+    run.add_argument("--owner", default=None, help="worker name recorded on leases (default host:pid:random)")
+
+    commands.add_parser("status", help="count shards by state")
+    args = parser.parse_args()
+
+    if args.command == "plan":
+        start_id, end_id = min(args.start_id, args.end_id), max(args.start_id, args.end_id)
+        print(f"Planned {horizons_shards.plan_shards(start_id, end_id, args.shard_size)} shards for {start_id}-{end_id}")
+    elif args.command == "run":
+        owner = args.owner or horizons_shards.worker_name()
+
+        def ingest_shard(start_id, end_id, guard, run):
+            populate_celestial(start_id, end_id, args.concurrency, guard=guard, run=run)
+
+        completed = horizons_shards.run_worker(ingest_shard, owner, args.lease_seconds, args.max_shards)
+        print(f"{owner} completed {completed} shards")
+
+    summary = horizons_shards.shard_summary()
+    print(f"Shards: {summary['pending']} pending, {summary['leased']} leased, "
+          f"{summary['expired']} expired, {summary['done']} done")
+
+
+if __name__ == "__main__":
+    main()